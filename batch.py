@@ -0,0 +1,330 @@
+"""
+résolution par lots de programmes linéaires de même taille
+
+les générateurs d'exercices produisent des milliers de petits problèmes de même structure : résolus
+un par un, le coût est celui de la boucle python de chaque pivot (pricing, test du rapport, mise à
+jour de la solution), pas celui du calcul. Ici les tableaux (moteur TableauLinProg) des problèmes de
+même taille sont empilés en tableaux numpy à trois dimensions et chaque itération du simplexe est
+menée en même temps sur tous les problèmes qui ne sont pas encore terminés.
+
+Les pivots sont exactement ceux de solver.solve avec les règles dantzig et bland (y compris le
+passage à la règle de Bland après degenerate_limit pivots dégénérés) ; les autres moteurs et les
+autres règles sont résolus un par un. La trace des pivots de chaque problème permet d'en refaire la
+correction (lin_prog_solve) sans recalculer le pricing, voir TracePricing.
+"""
+
+import numpy
+
+from pricing import Pricing, BlandPricing
+from solver import prepare, solution_summary, solve
+from tableau import TableauLinProg
+
+# règles de pricing menées en parallèle
+BATCH_PRICINGS = (Pricing, BlandPricing)
+
+
+def batchable(lin_prog):
+    """
+    le programme peut-il être résolu par lots : moteur tableau (fraction ou float), règle dantzig ou bland,
+    sans variables bornées ni entières et pas déjà déclaré non réalisable par la pré-résolution
+    """
+    if lin_prog.upper or lin_prog.integer or (lin_prog.presolve is not None and lin_prog.presolve.status == "infeasible"):
+        return False
+    return type(lin_prog) is TableauLinProg and type(lin_prog.pricing) in BATCH_PRICINGS
+
+
+class TableauBatch:
+    """
+    tableaux empilés de programmes de même taille (m lignes, n colonnes), pivotés simultanément
+
+    l'état de chaque programme (tableau, base, ordre des variables dans base et out, état de la
+    règle de pricing) est lu à la construction et recopié dans le programme par write_back
+    """
+
+    def __init__(self, lin_progs):
+        self.lin_progs = lin_progs
+        self.tolerance = lin_progs[0].tolerance
+        size = len(lin_progs)
+
+        self.A = numpy.stack([lin_prog.A for lin_prog in lin_progs])
+        self.b = numpy.stack([lin_prog.b for lin_prog in lin_progs])
+        self.c = numpy.stack([lin_prog.c for lin_prog in lin_progs])
+        self.z0 = numpy.array([lin_prog.z0 for lin_prog in lin_progs], dtype=self.b.dtype)
+        _, self.m, self.n = self.A.shape
+        self.row_base = numpy.array([lin_prog.row_base for lin_prog in lin_progs], dtype=numpy.intp).reshape(size, self.m)
+
+        # rang de chaque variable dans lin_prog.out et lin_prog.base, -1 si elle n'y est pas :
+        # les égalités de la règle de Dantzig sont départagées par l'ordre de out
+        self.out_rank = numpy.full((size, self.n), -1, dtype=numpy.intp)
+        self.base_rank = numpy.full((size, self.n), -1, dtype=numpy.intp)
+        for k, lin_prog in enumerate(lin_progs):
+            index = {var: j for j, var in enumerate(lin_prog.variables)}
+            self.out_rank[k, [index[var] for var in lin_prog.out]] = numpy.arange(len(lin_prog.out))
+            self.base_rank[k, [index[var] for var in lin_prog.base]] = numpy.arange(len(lin_prog.base))
+
+        pricings = [lin_prog.pricing for lin_prog in lin_progs]
+        self.bland = numpy.array([type(pricing) is BlandPricing for pricing in pricings], dtype=bool)
+        self.anti_cycling = numpy.array([pricing.anti_cycling for pricing in pricings], dtype=bool)
+        self.degenerate = numpy.array([pricing._degenerate for pricing in pricings], dtype=numpy.intp)
+        self.degenerate_limit = numpy.array([pricing.degenerate_limit for pricing in pricings], dtype=numpy.intp)
+        self.has_last = numpy.array([pricing._last_value is not None for pricing in pricings], dtype=bool)
+        self.last = self.z0.copy()
+        self.last[self.has_last] = [pricing._last_value for pricing in pricings if pricing._last_value is not None]
+        self.pivots = numpy.array([pricing.pivots for pricing in pricings], dtype=numpy.intp)
+        self.degenerate_pivots = numpy.array([pricing.degenerate_pivots for pricing in pricings], dtype=numpy.intp)
+        self.bland_pivots = numpy.array([pricing.bland_pivots for pricing in pricings], dtype=numpy.intp)
+
+        self.nb_iter = numpy.zeros(size, dtype=numpy.intp)
+        self.bounded = numpy.ones(size, dtype=bool)
+        self.traces = [[] for _ in lin_progs]
+
+    def _select(self, active):
+        """
+        variable entrante (indice de colonne) des programmes active, -1 si la solution est optimale
+        même règle que Pricing.select
+        """
+        value = self.z0[active]
+        improved = self.has_last[active] & (value > self.last[active] + self.tolerance)
+        stalled = self.has_last[active] & ~improved
+        degenerate = numpy.where(improved, 0, self.degenerate[active] + stalled)
+        self.degenerate[active] = degenerate
+        self.degenerate_pivots[active] += stalled
+        self.anti_cycling[active] = (self.anti_cycling[active] & ~improved) | (stalled & (degenerate >= self.degenerate_limit[active]))
+        self.last[active] = value
+        self.has_last[active] = True
+
+        c = self.c[active]
+        out_rank = self.out_rank[active]
+        candidate = (out_rank >= 0) & (c > self.tolerance)
+
+        # dantzig : plus grand coût réduit, le premier dans l'ordre de out en cas d'égalité
+        masked = numpy.where(candidate, c, -numpy.inf)
+        best = masked.max(axis=1) if self.n else numpy.full(len(active), -numpy.inf)
+        ties = candidate & (masked == best[:, None])
+        dantzig = numpy.where(ties, out_rank, self.n).argmin(axis=1) if self.n else numpy.zeros(len(active), dtype=numpy.intp)
+        # bland : plus petit indice
+        bland = candidate.argmax(axis=1) if self.n else dantzig
+
+        entering = numpy.where(self.bland[active] | self.anti_cycling[active], bland, dantzig)
+        return numpy.where(candidate.any(axis=1), entering, -1)
+
+    def _pivot_rows(self, active, entering):
+        """
+        ligne pivot de chaque programme, -1 si aucune contrainte ne limite la variable entrante
+        même règle que TableauLinProg.get_pivot_line
+        """
+        if self.m == 0:
+            return numpy.full(len(active), -1, dtype=numpy.intp)
+
+        column = self.A[active, :, entering]
+        rhs = self.b[active]
+        positive = column > self.tolerance
+        ratios = numpy.full(rhs.shape, numpy.inf, dtype=rhs.dtype)
+        ratios[positive] = rhs[positive] / column[positive]
+        rows = ratios.argmin(axis=1)
+
+        # anti-cyclage : parmi les lignes de rapport minimal, la variable de base de plus petit indice
+        anti_cycling = self.anti_cycling[active]
+        if anti_cycling.any():
+            best = ratios[numpy.arange(len(active)), rows]
+            ties = ratios <= best[:, None] + self.tolerance
+            bland = numpy.where(ties, self.row_base[active], self.n).argmin(axis=1)
+            rows = numpy.where(anti_cycling, bland, rows)
+
+        return numpy.where(positive.any(axis=1), rows, -1)
+
+    def _pivot(self, active, entering, rows):
+        """
+        set_in_base puis apply_subs sur chaque programme de active
+        """
+        span = numpy.arange(len(active))
+        A, b, c, z0 = self.A[active], self.b[active], self.c[active], self.z0[active]
+
+        pivot = A[span, rows, entering]
+        A[span, rows] = A[span, rows] / pivot[:, None]
+        b[span, rows] = b[span, rows] / pivot
+
+        factors = A[span, :, entering]
+        factors[span, rows] = 0
+        pivot_rows = A[span, rows]
+        pivot_rhs = b[span, rows]
+        A -= factors[:, :, None] * pivot_rows[:, None, :]
+        b -= factors * pivot_rhs[:, None]
+        factor = c[span, entering]
+        z0 += factor * pivot_rhs
+        c = c - factor[:, None] * pivot_rows
+
+        self.A[active], self.b[active], self.c[active], self.z0[active] = A, b, c, z0
+
+        # out.remove(entrante), out.append(sortante), base.append(entrante), base.remove(sortante)
+        leaving = self.row_base[active, rows]
+        out_rank = self.out_rank[active]
+        out_rank -= out_rank > out_rank[span, entering][:, None]
+        out_rank[span, entering] = -1
+        out_rank[span, leaving] = self.n - self.m - 1
+        self.out_rank[active] = out_rank
+
+        base_rank = self.base_rank[active]
+        base_rank[span, entering] = self.m
+        base_rank -= base_rank > base_rank[span, leaving][:, None]
+        base_rank[span, leaving] = -1
+        self.base_rank[active] = base_rank
+
+        self.row_base[active, rows] = entering
+
+    def iterate(self):
+        """
+        itérations du simplexe sur tous les programmes, jusqu'à l'optimum ou jusqu'à ce qu'un
+        programme se révèle non borné ; équivalent de solver.iterate
+        """
+        active = numpy.arange(len(self.lin_progs))
+        while len(active):
+            entering = self._select(active)
+            keep = entering >= 0
+            active, entering = active[keep], entering[keep]
+
+            rows = self._pivot_rows(active, entering)
+            unbounded = rows < 0
+            self.bounded[active[unbounded]] = False
+            for k, column, anti in zip(active[unbounded].tolist(), entering[unbounded].tolist(), self.anti_cycling[active[unbounded]].tolist()):
+                self.traces[k].append((column, -1, anti))
+            keep = rows >= 0
+            active, entering, rows = active[keep], entering[keep], rows[keep]
+            if not len(active):
+                break
+
+            anti_cycling = self.anti_cycling[active]
+            self.nb_iter[active] += 1
+            self.pivots[active] += 1
+            self.bland_pivots[active] += anti_cycling
+            for k, column, row, anti in zip(active.tolist(), entering.tolist(), rows.tolist(), anti_cycling.tolist()):
+                self.traces[k].append((column, row, anti))
+
+            self._pivot(active, entering, rows)
+
+    def write_back(self):
+        """
+        recopie l'état final dans chaque programme, renvoie pour chacun (pivots, borné, trace)
+        la trace est la liste des (variable entrante, ligne pivot, anti-cyclage) de chaque pivot,
+        terminée par (variable entrante, -1, anti-cyclage) si le programme n'est pas borné
+        """
+        # les rangs -1 (variables absentes de out ou de base) viennent en tête
+        out_order = numpy.argsort(self.out_rank, axis=1, kind="stable")[:, self.m:].tolist()
+        base_order = numpy.argsort(self.base_rank, axis=1, kind="stable")[:, self.n - self.m:].tolist()
+        row_base = self.row_base.tolist()
+
+        results = []
+        for k, lin_prog in enumerate(self.lin_progs):
+            lin_prog.A, lin_prog.b, lin_prog.c = self.A[k].copy(), self.b[k].copy(), self.c[k].copy()
+            lin_prog.z0 = self.z0[k]
+            lin_prog.row_base = row_base[k]
+            lin_prog.pending = None
+            lin_prog.out = [lin_prog.variables[j] for j in out_order[k]]
+            lin_prog.base = [lin_prog.variables[j] for j in base_order[k]]
+
+            pricing = lin_prog.pricing
+            pricing.anti_cycling = bool(self.anti_cycling[k])
+            pricing._degenerate = int(self.degenerate[k])
+            pricing._last_value = self.last[k] if self.has_last[k] else None
+            pricing.pivots = int(self.pivots[k])
+            pricing.degenerate_pivots = int(self.degenerate_pivots[k])
+            pricing.bland_pivots = int(self.bland_pivots[k])
+
+            lin_prog.update_solution()
+            trace = [(lin_prog.variables[column], row, anti) for column, row, anti in self.traces[k]]
+            results.append((int(self.nb_iter[k]), bool(self.bounded[k]), trace))
+        return results
+
+
+def iterate_batch(lin_progs):
+    """
+    solver.iterate sur chaque programme de lin_progs (moteur tableau, voir batchable), les
+    programmes de même taille et de même arithmétique étant pivotés ensemble
+    renvoie pour chacun (nombre de pivots, borné, trace)
+    """
+    groups = {}
+    for idx, lin_prog in enumerate(lin_progs):
+        groups.setdefault((lin_prog.A.shape, lin_prog.arithmetic), []).append(idx)
+
+    results = [None] * len(lin_progs)
+    for members in groups.values():
+        batch = TableauBatch([lin_progs[idx] for idx in members])
+        batch.iterate()
+        for idx, result in zip(members, batch.write_back()):
+            results[idx] = result
+    return results
+
+
+def solve_batch(pl_list, sensitivity=False):
+    """
+    résout les programmes comme solver.solve_all, ceux qui s'y prêtent (batchable) par lots
+    renvoie les résumés et les traces {"phase_one": [...], "phase_two": [...]} des pivots (None
+    pour les programmes résolus un par un)
+    """
+    results = [None] * len(pl_list)
+    traces = [None] * len(pl_list)
+
+    ready = []
+    for idx, lin_prog in enumerate(pl_list):
+        try:
+            if not batchable(lin_prog):
+                results[idx] = solve(lin_prog, sensitivity=sensitivity)
+                continue
+            prepare(lin_prog)
+        except NotImplementedError as error:
+            results[idx] = {"title" : lin_prog.title, "status" : "error", "error" : str(error)}
+            continue
+        ready.append(idx)
+        traces[idx] = {"phase_one" : [], "phase_two" : []}
+
+    nb_iter = dict.fromkeys(ready, 0)
+
+    # simplexe dual un programme à la fois, la phase 2 se fait ensuite par lots
+    for idx in ready:
+        if pl_list[idx].dual_simplex:
+            nb_iter[idx], feasible = pl_list[idx].dual_iterations()
+            if not feasible:
+                results[idx] = solution_summary(pl_list[idx], nb_iter[idx], status="infeasible")
+
+    phase_one = [idx for idx in ready if pl_list[idx].artificials]
+    for idx in phase_one:
+        pl_list[idx].start_phase_one()
+    for idx, (pivots, _, trace) in zip(phase_one, iterate_batch([pl_list[idx] for idx in phase_one])):
+        nb_iter[idx] = pivots
+        traces[idx]["phase_one"] = trace
+        if not pl_list[idx].end_phase_one():
+            results[idx] = solution_summary(pl_list[idx], pivots, status="infeasible")
+
+    phase_two = [idx for idx in ready if results[idx] is None]
+    for idx, (pivots, bounded, trace) in zip(phase_two, iterate_batch([pl_list[idx] for idx in phase_two])):
+        nb_iter[idx] += pivots
+        traces[idx]["phase_two"] = trace
+        results[idx] = solution_summary(pl_list[idx], nb_iter[idx], status="optimal" if bounded else "unbounded", sensitivity=sensitivity)
+
+    return results, traces
+
+
+class TracePricing(Pricing):
+    """
+    rejoue une trace de solve_batch : la variable entrante (et le choix de la ligne pivot en cas
+    d'anti-cyclage) de chaque itération est lue dans la trace, par exemple pour construire la
+    correction d'un problème résolu par lots
+
+        lin_prog.pricing = TracePricing(traces[idx])
+        lin_prog_solve(lin_prog)
+    """
+
+    name = "trace"
+
+    def __init__(self, trace, degenerate_limit=20):
+        super().__init__(degenerate_limit)
+        self.trace = trace
+        self._steps = {"w" : iter(trace["phase_one"]), "z" : iter(trace["phase_two"])}
+
+    def select(self, lin_prog):
+        step = next(self._steps[lin_prog.objective_name], None)
+        if step is None:
+            self.anti_cycling = False
+            return None
+        variable, _, self.anti_cycling = step
+        return variable
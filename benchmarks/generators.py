@@ -0,0 +1,155 @@
+"""
+familles de programmes linéaires paramétrées par leur taille, au format json de load_from_json
+
+chaque générateur prend une taille et une graine et renvoie un problème (dictionnaire) ; la même
+taille et la même graine donnent toujours le même problème, les résultats de deux versions du code
+sont donc comparables.
+
+    dense           m contraintes <= pleines sur n = m variables
+    sparse          idem, environ 3 coefficients non nuls par contrainte
+    klee_minty      cube de Klee-Minty en dimension n : 2^n - 1 pivots avec la règle de Dantzig
+    degenerate      seconds membres nuls pour la moitié des contraintes (pivots dégénérés)
+    transportation  n fournisseurs, n clients, offres <= et demandes >= (phase 1)
+    assignment      affectation n x n, égalités (phase 1, très dégénéré)
+"""
+
+import random
+
+
+def _variables(n, prefix="x"):
+    return [f"{prefix}{j}" for j in range(1, n + 1)]
+
+
+def _expression(coefficients, variables):
+    terms = [f"{coeff}*{var}" for coeff, var in zip(coefficients, variables) if coeff != 0]
+    return " + ".join(terms) or "0"
+
+
+def dense(size, seed=0):
+    rng = random.Random(seed)
+    variables = _variables(size)
+    return {
+        "title" : f"dense {size}x{size}",
+        "variables" : variables,
+        "utility" : _expression([rng.randint(1, 20) for _ in variables], variables),
+        "optimizer" : "max",
+        "constraints" : [
+            f"{_expression([rng.randint(1, 9) for _ in variables], variables)} <= {rng.randint(10 * size, 100 * size)}"
+            for _ in range(size)
+            ],
+        }
+
+
+def sparse(size, seed=0, per_row=3):
+    rng = random.Random(seed)
+    variables = _variables(size)
+    constraints = []
+    for idx in range(size):
+        # chaque variable apparaît au moins une fois : le problème reste borné
+        columns = {idx} | set(rng.sample(range(size), min(per_row, size) - 1))
+        coefficients = [rng.randint(1, 9) if j in columns else 0 for j in range(size)]
+        constraints.append(f"{_expression(coefficients, variables)} <= {rng.randint(10, 100)}")
+    return {
+        "title" : f"sparse {size}x{size}",
+        "variables" : variables,
+        "utility" : _expression([rng.randint(1, 20) for _ in variables], variables),
+        "optimizer" : "max",
+        "constraints" : constraints,
+        }
+
+
+def klee_minty(size, seed=0):
+    """
+    max sum 2^(n-j) x_j  sc  sum_{j<i} 2^(i-j+1) x_j + x_i <= 5^i
+    """
+    variables = _variables(size)
+    constraints = []
+    for i in range(1, size + 1):
+        coefficients = [2 ** (i - j + 1) for j in range(1, i)] + [1] + [0] * (size - i)
+        constraints.append(f"{_expression(coefficients, variables)} <= {5 ** i}")
+    return {
+        "title" : f"klee-minty {size}",
+        "variables" : variables,
+        "utility" : _expression([2 ** (size - j) for j in range(1, size + 1)], variables),
+        "optimizer" : "max",
+        "constraints" : constraints,
+        }
+
+
+def degenerate(size, seed=0):
+    rng = random.Random(seed)
+    variables = _variables(size)
+    constraints = []
+    for idx in range(size):
+        coefficients = [rng.randint(-3, 9) for _ in variables]
+        rhs = 0 if idx % 2 == 0 else rng.randint(10, 50)
+        constraints.append(f"{_expression(coefficients, variables)} <= {rhs}")
+    # borne sur la somme : le problème reste borné
+    constraints.append(f"{_expression([1] * size, variables)} <= {10 * size}")
+    return {
+        "title" : f"degenerate {size}x{size}",
+        "variables" : variables,
+        "utility" : _expression([rng.randint(1, 20) for _ in variables], variables),
+        "optimizer" : "max",
+        "constraints" : constraints,
+        }
+
+
+def transportation(size, seed=0):
+    rng = random.Random(seed)
+    variables = [f"x{i}_{j}" for i in range(1, size + 1) for j in range(1, size + 1)]
+    demand = [rng.randint(10, 50) for _ in range(size)]
+    supply = [rng.randint(10, 50) for _ in range(size)]
+    # offre totale suffisante
+    supply[0] += max(0, sum(demand) - sum(supply))
+    constraints = []
+    for i in range(size):
+        row = [f"x{i + 1}_{j}" for j in range(1, size + 1)]
+        constraints.append(f"{_expression([1] * size, row)} <= {supply[i]}")
+    for j in range(size):
+        column = [f"x{i}_{j + 1}" for i in range(1, size + 1)]
+        constraints.append(f"{_expression([1] * size, column)} >= {demand[j]}")
+    return {
+        "title" : f"transportation {size}x{size}",
+        "variables" : variables,
+        "utility" : _expression([rng.randint(1, 20) for _ in variables], variables),
+        "optimizer" : "min",
+        "constraints" : constraints,
+        }
+
+
+def assignment(size, seed=0):
+    rng = random.Random(seed)
+    variables = [f"x{i}_{j}" for i in range(1, size + 1) for j in range(1, size + 1)]
+    constraints = []
+    for i in range(1, size + 1):
+        constraints.append(f"{_expression([1] * size, [f'x{i}_{j}' for j in range(1, size + 1)])} = 1")
+    for j in range(1, size + 1):
+        constraints.append(f"{_expression([1] * size, [f'x{i}_{j}' for i in range(1, size + 1)])} = 1")
+    return {
+        "title" : f"assignment {size}x{size}",
+        "variables" : variables,
+        "utility" : _expression([rng.randint(1, 20) for _ in variables], variables),
+        "optimizer" : "min",
+        "constraints" : constraints,
+        }
+
+
+FAMILIES = {
+    "dense" : dense,
+    "sparse" : sparse,
+    "klee_minty" : klee_minty,
+    "degenerate" : degenerate,
+    "transportation" : transportation,
+    "assignment" : assignment,
+    }
+
+# tailles par défaut : quelques secondes par famille avec le moteur fraction
+DEFAULT_SIZES = {
+    "dense" : (5, 10, 20, 40),
+    "sparse" : (5, 10, 20, 40),
+    "klee_minty" : (3, 5, 7, 9),
+    "degenerate" : (5, 10, 20),
+    "transportation" : (3, 5, 8),
+    "assignment" : (3, 5, 8),
+    }
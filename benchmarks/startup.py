@@ -0,0 +1,59 @@
+"""
+temps de démarrage à froid de la ligne de commande
+
+lance plusieurs fois `pysimplexpdf.py --help` dans un nouveau processus et vérifie qu'aucune
+dépendance lourde (sympy, pylatex, numpy) n'est importée au chargement du module. Le script
+se termine avec le code 1 si le temps médian dépasse --max-seconds ou si une dépendance lourde
+est chargée : il peut servir de garde dans une chaîne d'intégration.
+
+    python benchmarks/startup.py --runs 20 --max-seconds 0.5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, "pysimplexpdf.py")
+HEAVY_MODULES = ("sympy", "pylatex", "numpy")
+
+parser = argparse.ArgumentParser(description="Mesure le temps de démarrage de pysimplexpdf.py.")
+parser.add_argument("--runs", "-n", help="nombre de lancements", type=int, default=10)
+parser.add_argument("--max-seconds", help="temps médian maximal accepté", type=float, default=0.5)
+
+
+def startup_times(runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        # lancé hors du dossier du dépôt, comme depuis un job
+        subprocess.run([sys.executable, CLI, "--help"], check=True, stdout=subprocess.DEVNULL, cwd=os.path.expanduser("~"))
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def loaded_heavy_modules():
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import pysimplexpdf; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def main(args):
+    times = startup_times(args.runs)
+    median = statistics.median(times)
+    heavy = loaded_heavy_modules()
+
+    print(f"--help : médiane {median * 1000:.0f} ms, min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms ({args.runs} lancements)")
+    print(f"dépendances lourdes chargées à l'import : {', '.join(heavy) or 'aucune'}")
+
+    if median > args.max_seconds or heavy:
+        print(f"ÉCHEC : démarrage limité à {args.max_seconds * 1000:.0f} ms sans dépendance lourde")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parser.parse_args()))
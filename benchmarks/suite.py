@@ -0,0 +1,193 @@
+"""
+banc d'essai sur des familles de problèmes générés (voir generators.py)
+
+pour chaque famille, taille et moteur, mesure séparément (médiane de --repeat lancements) :
+
+    parse   lecture du fichier json (load_from_json)
+    solve   résolution sans rendu (solver.solve, boucle des pivots comprise)
+    render  correction latex complète (lin_prog_latex, pivots compris), avec --render
+    pdf     compilation de la correction (LatexCompiler), avec --pdf
+
+les résultats sont écrits en json (--output) avec le commit courant ; --compare compare avec un
+fichier de résultats précédent et se termine avec le code 1 si une mesure est plus lente que
+--threshold fois la référence, ou si un statut ou un nombre de pivots a changé.
+
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --families dense klee_minty --engines fraction integer --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generators import FAMILIES, DEFAULT_SIZES
+from loader import ENGINES, get_engine, load_from_json
+from pricing import PRICINGS
+import solver
+
+RESULTS_VERSION = 1
+PHASES = ("parse", "solve", "render", "pdf")
+# en dessous, les écarts relatifs sont du bruit de mesure
+NOISE_SECONDS = 0.002
+
+parser = argparse.ArgumentParser(description="Mesure les temps de lecture, de résolution et de rendu sur des problèmes générés.")
+parser.add_argument("--families", nargs="+", choices=FAMILIES, default=list(FAMILIES))
+parser.add_argument("--sizes", nargs="+", type=int, help="tailles (par défaut, celles de chaque famille)", default=None)
+parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["sympy", "fraction", "float", "integer", "revised"])
+parser.add_argument("--pricing", "-p", choices=PRICINGS, default="dantzig")
+parser.add_argument("--repeat", "-n", help="nombre de mesures par cas (médiane)", type=int, default=3)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--render", help="mesure aussi le rendu latex", action="store_true")
+parser.add_argument("--max-render-size", help="taille maximale pour le rendu", type=int, default=8)
+parser.add_argument("--pdf", help="mesure aussi la compilation pdf (pdflatex nécessaire, implique --render)", action="store_true")
+parser.add_argument("--output", "-o", help="fichier json des résultats", default=None)
+parser.add_argument("--compare", help="fichier json de résultats de référence", default=None)
+parser.add_argument("--threshold", help="rapport de temps au-delà duquel une mesure est une régression", type=float, default=1.25)
+
+
+def current_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def timed(function, repeat, setup=None):
+    """
+    médiane des durées de repeat appels de function(setup()), et le résultat du dernier appel
+    setup n'est pas compté dans la durée
+    """
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def measure(problem, engine, pricing, repeat, render=False, pdf=False):
+    factory = get_engine(engine, pricing=pricing)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "problem.json")
+        with open(filename, 'w') as f:
+            json.dump([problem], f)
+
+        def parse():
+            return load_from_json(filename, engine=factory)[0]
+
+        parse_time, _ = timed(parse, repeat)
+        # chaque mesure part d'un programme lu mais pas encore résolu
+        solve_time, summary = timed(solver.solve, repeat, setup=parse)
+
+        entry = {
+            "m" : len(problem["constraints"]),
+            "n" : len(problem["variables"]),
+            "status" : summary["status"],
+            "pivots" : summary["iterations"],
+            "parse" : parse_time,
+            "solve" : solve_time,
+            "render" : None,
+            "pdf" : None,
+            }
+
+        if render or pdf:
+            from simplex import lin_prog_latex
+
+            entry["render"], _ = timed(lin_prog_latex, repeat, setup=parse)
+
+        if pdf:
+            from simplex import build_document
+            from compiler import LatexCompiler
+
+            def compile_pdf(doc):
+                # nouveau dossier de travail : aucune unité n'est reprise d'un lancement précédent
+                with tempfile.TemporaryDirectory() as build_dir:
+                    LatexCompiler(build_dir=build_dir, use_format=False).generate_pdf(doc, os.path.join(build_dir, "bench"))
+
+            entry["pdf"], _ = timed(compile_pdf, 1, setup=lambda: build_document([parse()]))
+
+    return entry
+
+
+def run(args):
+    results = []
+    for family in args.families:
+        for size in args.sizes or DEFAULT_SIZES[family]:
+            problem = FAMILIES[family](size, seed=args.seed)
+            for engine in args.engines:
+                render = args.render and size <= args.max_render_size
+                entry = {"family" : family, "size" : size, "engine" : engine, "pricing" : args.pricing}
+                entry.update(measure(problem, engine, args.pricing, args.repeat, render=render, pdf=args.pdf and render))
+                results.append(entry)
+                timings = "  ".join(f"{phase} {entry[phase] * 1000:9.2f} ms" for phase in PHASES if entry[phase] is not None)
+                print(f"{family:15} {size:4} {engine:14} {entry['status']:10} {entry['pivots']:6} pivots  {timings}", flush=True)
+    return results
+
+
+def _key(entry):
+    return entry["family"], entry["size"], entry["engine"], entry["pricing"]
+
+
+def compare(results, reference, threshold):
+    """
+    affiche les rapports de temps avec la référence, renvoie le nombre de régressions
+    """
+    previous = {_key(entry): entry for entry in reference["results"]}
+    regressions = 0
+    print(f"\ncomparaison avec {reference.get('commit') or 'la référence'} (seuil x{threshold})")
+    for entry in results:
+        old = previous.get(_key(entry))
+        if old is None:
+            continue
+        if (old["status"], old["pivots"]) != (entry["status"], entry["pivots"]):
+            regressions += 1
+            print(f"{' '.join(map(str, _key(entry)))} : {old['status']}/{old['pivots']} pivots -> {entry['status']}/{entry['pivots']} pivots")
+        for phase in PHASES:
+            if entry[phase] is None or old.get(phase) is None or max(entry[phase], old[phase]) < NOISE_SECONDS:
+                continue
+            ratio = entry[phase] / max(old[phase], 1e-9)
+            slower = ratio > threshold
+            regressions += slower
+            if slower or ratio < 1 / threshold:
+                print(f"{' '.join(map(str, _key(entry)))} {phase} : {old[phase] * 1000:.2f} ms -> {entry[phase] * 1000:.2f} ms (x{ratio:.2f}){' RÉGRESSION' if slower else ''}")
+    return regressions
+
+
+def main(args):
+    results = run(args)
+    report = {
+        "version" : RESULTS_VERSION,
+        "commit" : current_commit(),
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "repeat" : args.repeat,
+        "seed" : args.seed,
+        "results" : results,
+        }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            reference = json.load(f)
+        if compare(results, reference, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parser.parse_args()))
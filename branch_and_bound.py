@@ -0,0 +1,277 @@
+"""
+programmes linéaires en nombres entiers : séparation et évaluation (branch and bound)
+
+la relaxation continue (sans les contraintes d'intégrité) est résolue par le simplexe. Tant
+qu'une variable entière x a une valeur fractionnaire v, le nœud est séparé en deux sous-problèmes
+x <= floor(v) et x >= floor(v) + 1. Chaque sous-problème part de la base optimale de son parent :
+la contrainte de séparation est ajoutée au tableau final (LinProg.add_row) et le simplexe dual
+rétablit une solution réalisable en quelques pivots, au lieu d'une résolution depuis la forme
+canonique. Un nœud est élagué quand sa relaxation n'est pas réalisable, ou quand sa borne (la
+valeur de la relaxation) ne dépasse pas la meilleure solution entière déjà trouvée.
+
+    selection   "best" : le nœud ouvert de meilleure borne d'abord ; "depth" : profondeur d'abord
+    workers     nombre de processus évaluant les nœuds ouverts en parallèle (1 : sans processus)
+    max_nodes   nombre maximal de nœuds évalués, None : sans limite
+
+    result = BranchAndBound(lin_prog, selection="depth").run()
+    result.summary()
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import heapq
+from math import floor, inf
+
+from linear_form import LinearForm
+
+SELECTIONS = ("best", "depth")
+
+# écart à l'entier toléré en calcul flottant
+INTEGRALITY_TOLERANCE = 1e-6
+
+
+class Node:
+    """
+    nœud de l'arbre : séparation depuis son parent (variable, comp, valeur), borne héritée du
+    parent, puis après évaluation statut ("branched", "integer", "infeasible", "pruned" ou "open")
+    et valeur de sa relaxation (sens de la fonction objectif d'origine)
+    """
+
+    __slots__ = ("index", "parent", "depth", "branch", "bound", "status", "objective", "branching", "solution", "lin_prog")
+
+    def __init__(self, index, parent=None, branch=None, bound=inf, lin_prog=None):
+        self.index = index
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.branch = branch
+        self.bound = bound
+        self.status = "open"
+        self.objective = None
+        # variable fractionnaire et sa valeur, pour un nœud séparé
+        self.branching = None
+        # solution sur les variables de décision d'origine, pour un nœud à solution entière
+        self.solution = None
+        # relaxation résolue du parent avant l'évaluation, celle du nœud ensuite
+        self.lin_prog = lin_prog
+
+
+def evaluate(lin_prog, branch):
+    """
+    relaxation d'un nœud à partir de la relaxation résolue de son parent, modifiée sur place
+    renvoie (statut, programme, nombre de pivots)
+    """
+    from solver import iterate
+
+    variable, comp, value = branch
+    lin_prog.add_row(LinearForm.variable(variable), comp, value)
+    nb_iter, feasible = lin_prog.dual_iterations()
+    if not feasible:
+        return "infeasible", lin_prog, nb_iter
+    # la base est dual réalisable : en général, aucun pivot primal n'est nécessaire
+    primal_iter, _ = iterate(lin_prog)
+    return "optimal", lin_prog, nb_iter + primal_iter
+
+
+def _evaluate(task):
+    return evaluate(*task)
+
+
+class BranchAndBound:
+    """
+    séparation et évaluation sur les variables lin_prog.integer
+    après run, status vaut "optimal", "infeasible" (pas de solution entière), "unbounded"
+    (relaxation non bornée) ou "node_limit" ; nodes : tous les nœuds créés, dans l'ordre
+    """
+
+    def __init__(self, lin_prog, selection="best", workers=1, max_nodes=None):
+        if selection not in SELECTIONS:
+            raise ValueError(f"unknown node selection {selection}, expected one of {SELECTIONS}")
+        self.lin_prog = lin_prog
+        self.selection = selection
+        self.workers = max(workers, 1)
+        self.max_nodes = max_nodes
+        # les valeurs sont comparées dans le sens d'une maximisation
+        self.sense = 1 if lin_prog.initial_optimizer == "max" else -1
+        self.tolerance = INTEGRALITY_TOLERANCE if lin_prog.tolerance else 0
+        self.nodes = []
+        self.evaluated = 0
+        self.iterations = 0
+        self.incumbent = None
+        self.incumbent_value = -inf
+        self.incumbent_lin_prog = None
+        self.relaxation = None
+        self.status = None
+        self._open = []
+
+    def run(self, solved=False):
+        """
+        solved : lin_prog est déjà résolu jusqu'à l'optimum de sa relaxation (rendu pdf)
+        """
+        from solver import solve
+
+        root = self._node()
+        if solved:
+            status, self.iterations = "optimal", self.lin_prog.pricing.pivots
+        else:
+            summary = solve(self.lin_prog, relaxation=True)
+            status, self.iterations = summary["status"], summary["iterations"]
+        self.evaluated = 1
+        if status != "optimal":
+            root.status = status
+            self.status = status
+            return self
+        self.relaxation = self.lin_prog.get_objective_value()
+        # la relaxation de la racine reste celle de lin_prog : les nœuds en partent sur une copie
+        self._evaluated(root, "optimal", self.lin_prog)
+
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            while self._open and (self.max_nodes is None or self.evaluated < self.max_nodes):
+                batch = self._next_nodes()
+                if executor is None:
+                    results = [evaluate(copy.deepcopy(node.lin_prog), node.branch) for node in batch]
+                else:
+                    results = executor.map(_evaluate, [(node.lin_prog, node.branch) for node in batch])
+                for node, (status, lin_prog, nb_iter) in zip(batch, results):
+                    self.evaluated += 1
+                    self.iterations += nb_iter
+                    self._evaluated(node, status, lin_prog)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if self._open:
+            self.status = "node_limit"
+        else:
+            self.status = "optimal" if self.incumbent is not None else "infeasible"
+        return self
+
+    def _node(self, parent=None, branch=None):
+        node = Node(len(self.nodes), parent, branch, bound=inf if parent is None else parent.objective * self.sense, lin_prog=None if parent is None else parent.lin_prog)
+        self.nodes.append(node)
+        return node
+
+    def _key(self, node):
+        if self.selection == "best":
+            return (-node.bound, node.index)
+        return (-node.depth, node.index)
+
+    def _pruned(self, value):
+        return self.incumbent is not None and value <= self.incumbent_value + self.tolerance
+
+    def _next_nodes(self):
+        """
+        nœuds ouverts évalués ensemble (un par processus), sans ceux que la solution entière
+        courante permet déjà d'élaguer
+        """
+        batch = []
+        limit = self.workers if self.max_nodes is None else min(self.workers, self.max_nodes - self.evaluated)
+        while self._open and len(batch) < limit:
+            node = heapq.heappop(self._open)[-1]
+            if self._pruned(node.bound):
+                node.status = "pruned"
+                node.lin_prog = None
+            else:
+                batch.append(node)
+        return batch
+
+    def _fractional(self, lin_prog):
+        """
+        variable entière la plus éloignée d'un entier et sa valeur, None si la solution est entière
+        """
+        best = None
+        for var in lin_prog.integer:
+            value = lin_prog.current_solution[var]
+            distance = abs(value - round(value))
+            if distance > self.tolerance and (best is None or distance > best[0]):
+                best = (distance, var, value)
+        return None if best is None else best[1:]
+
+    def _evaluated(self, node, status, lin_prog):
+        node.lin_prog = None
+        if status != "optimal":
+            node.status = status
+            return
+        node.objective = lin_prog.get_objective_value()
+        value = node.objective * self.sense
+        if self._pruned(value):
+            node.status = "pruned"
+            return
+
+        fractional = self._fractional(lin_prog)
+        if fractional is None:
+            node.status = "integer"
+            node.solution = self._solution(lin_prog)
+            self.incumbent, self.incumbent_value, self.incumbent_lin_prog = node, value, lin_prog
+            return
+
+        node.status = "branched"
+        node.branching = fractional
+        node.lin_prog = lin_prog
+        var, value = fractional
+        for branch in ((var, "LEQ", floor(value)), (var, "GEQ", floor(value) + 1)):
+            child = self._node(node, branch)
+            child.status = "open"
+            heapq.heappush(self._open, self._key(child) + (child,))
+        # les enfants gardent une référence à la relaxation du parent jusqu'à leur évaluation
+        node.lin_prog = None
+
+    def bound(self):
+        """
+        meilleure valeur possible d'une solution entière : la meilleure borne des nœuds encore
+        ouverts, ou la meilleure solution entière trouvée (sens de la fonction objectif d'origine)
+        """
+        values = [entry[-1].bound for entry in self._open if not self._pruned(entry[-1].bound)]
+        if self.incumbent is not None:
+            values.append(self.incumbent_value)
+        return max(values) * self.sense if values else None
+
+    def gap(self):
+        """
+        écart relatif entre la borne et la meilleure solution entière, 0 quand elle est optimale
+        """
+        bound = self.bound()
+        if self.incumbent is None or bound is None:
+            return None
+        return abs(bound - self.incumbent.objective) / max(abs(self.incumbent.objective), 1)
+
+    def _solution(self, lin_prog):
+        """
+        solution sur les variables de décision (d'origine après une pré-résolution)
+        """
+        solution = {var: lin_prog.current_solution[var] for var in lin_prog.decision_variables}
+        if lin_prog.presolve is not None:
+            solution = lin_prog.presolve.postsolve(solution)
+        return solution
+
+    def solution(self):
+        """
+        meilleure solution entière
+        """
+        return self.incumbent.solution
+
+    def stats(self):
+        from solver import json_value
+
+        gap = self.gap()
+        return {
+            "nodes" : self.evaluated,
+            "selection" : self.selection,
+            "relaxation" : None if self.relaxation is None else json_value(self.relaxation),
+            "bound" : None if self.bound() is None else json_value(self.bound()),
+            "gap" : None if gap is None else float(gap),
+            }
+
+    def summary(self):
+        """
+        résumé au format de solver.solution_summary, avec les statistiques de la séparation
+        """
+        from solver import solution_summary
+
+        if self.incumbent is not None:
+            summary = solution_summary(self.incumbent_lin_prog, self.iterations)
+            summary["status"] = self.status
+        else:
+            summary = solution_summary(self.lin_prog, self.iterations, status=self.status)
+        summary["branch_and_bound"] = self.stats()
+        return summary
@@ -0,0 +1,87 @@
+"""
+cache sur disque des sections latex déjà calculées
+
+la clé d'une section est l'empreinte du problème normalisé (LinProg.to_dict, et le problème
+d'origine après une pré-résolution), du moteur de calcul, de la règle de pricing et du template :
+un problème inchangé n'est pas résolu à nouveau.
+"""
+
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import threading
+
+# à incrémenter quand le rendu des sections change
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = ".simplex_cache"
+
+
+def fragment_key(lin_prog, template):
+    """
+    empreinte d'un programme linéaire (avant résolution) et du template utilisé pour le rendu
+    """
+    data = {
+        "version" : CACHE_VERSION,
+        "engine" : type(lin_prog).__name__,
+        "arithmetic" : getattr(lin_prog, "arithmetic", None),
+        "pricing" : lin_prog.pricing.name,
+        "problem" : lin_prog.to_dict(),
+        "template" : template,
+        }
+    if lin_prog.presolve is not None:
+        # deux problèmes différents peuvent avoir le même problème réduit
+        data["presolve"] = lin_prog.presolve.original().to_dict()
+    if lin_prog.integer:
+        # l'arbre de séparation dépend de la sélection des nœuds, pas du nombre de processus
+        data["branching"] = {key : value for key, value in lin_prog.branching.items() if key != "workers"}
+    if not lin_prog.allow_dual_simplex:
+        data["dual_simplex"] = False
+    text = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """
+    un fichier .tex par section, nommé par sa clé
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".tex")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r', encoding="utf-8") as f:
+                fragment = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return fragment
+
+    @contextmanager
+    def writer(self, key):
+        """
+        fichier de la section key, écrite morceau par morceau ; elle n'entre dans le cache que si
+        le bloc se termine sans erreur
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # écriture atomique : un autre processus ne lit jamais de fichier partiel
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding="utf-8") as f:
+                yield f
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put(self, key, fragment):
+        with self.writer(key) as f:
+            f.write(fragment)
@@ -0,0 +1,235 @@
+"""
+compilation latex des corrections
+
+remplace doc.generate_pdf : les fichiers de compilation sont écrits dans un dossier de travail
+(build_dir) et réutilisés d'un lancement à l'autre.
+
+- une unité dont le source .tex n'a pas changé depuis sa dernière compilation réussie n'est pas
+  recompilée (empreinte sha256 du source, du compilateur et du format) ;
+- le préambule, identique pour toutes les corrections, est compilé une fois pour toutes dans un
+  format (.fmt) : chaque compilation ne lit plus que le corps du document ;
+- avec plusieurs unités (une par problème), les unités sont compilées en parallèle puis
+  assemblées en un seul pdf (pdfunite s'il est installé, sinon le paquet latex pdfpages).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+
+DEFAULT_BUILD_DIR = ".simplex_build"
+
+BEGIN_DOCUMENT = r"\begin{document}"
+
+# messages latex demandant une nouvelle passe (références, lastpage)
+RERUN = re.compile(r"Rerun to get|Label\(s\) may have changed|Rerun LaTeX")
+
+# seul pdflatex (et latex) sait relire un format produit par \dump
+FORMAT_COMPILERS = ("pdflatex", "latex")
+
+
+def _sha256(*texts):
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def split_preamble(tex):
+    """
+    (préambule, corps) d'un document latex, le corps commence à \\begin{document}
+    """
+    idx = tex.index(BEGIN_DOCUMENT)
+    return tex[:idx], tex[idx:]
+
+
+class LatexCompiler:
+    """
+    compilation avec cache et format précompilé
+
+    compiler : pdflatex par défaut, le format n'est utilisé qu'avec pdflatex ou latex
+    workers : nombre de compilations simultanées des unités
+    max_passes : nombre maximal de passes si latex demande une recompilation
+    """
+
+    def __init__(self, build_dir=DEFAULT_BUILD_DIR, compiler="pdflatex", use_format=True, workers=1, max_passes=3):
+        self.build_dir = build_dir
+        self.compiler = compiler
+        self.use_format = use_format and compiler in FORMAT_COMPILERS
+        self.workers = workers
+        self.max_passes = max_passes
+        self.compiled = 0
+        self.skipped = 0
+
+    def stats(self):
+        return {
+            "compiled" : self.compiled,
+            "skipped" : self.skipped,
+            "format" : self.use_format,
+            }
+
+    def _run(self, args, log_name):
+        """
+        lance le compilateur dans build_dir, CompilerError (comme pylatex) en cas d'échec
+        """
+        from pylatex.errors import CompilerError
+
+        try:
+            result = subprocess.run([self.compiler, "-interaction=nonstopmode", "-halt-on-error"] + args,
+                                    cwd=self.build_dir, stdin=subprocess.DEVNULL, capture_output=True)
+        except FileNotFoundError:
+            raise CompilerError(f"LaTeX compiler {self.compiler} not found")
+        log_path = os.path.join(self.build_dir, log_name + ".log")
+        log = ""
+        if os.path.exists(log_path):
+            with open(log_path, 'r', encoding="utf-8", errors="replace") as f:
+                log = f.read()
+        if result.returncode != 0:
+            raise CompilerError(f"{self.compiler} failed on {log_name}:\n" + (log or result.stdout.decode("utf-8", "replace"))[-2000:])
+        return log
+
+    def _format(self, preamble):
+        """
+        nom du format précompilé pour ce préambule, None s'il ne peut pas être construit
+        """
+        name = "preamble-" + _sha256(self.compiler, preamble)[:16]
+        if os.path.exists(os.path.join(self.build_dir, name + ".fmt")):
+            return name
+
+        from pylatex.errors import CompilerError
+
+        with open(os.path.join(self.build_dir, name + ".tex"), 'w', encoding="utf-8") as f:
+            f.write(preamble + "\n\\dump\n")
+        try:
+            self._run(["-ini", f"-jobname={name}", f"&{self.compiler}", name + ".tex"], name)
+        except CompilerError:
+            # préambule impossible à figer (fichier ouvert, paquet incompatible) : compilation complète
+            self.use_format = False
+            return None
+        return name
+
+    def compile_file(self, source, name):
+        """
+        compile le document latex du fichier source en build_dir/name.pdf, sauf si son contenu n'a
+        pas changé ; le fichier est lu par blocs, sans être chargé en mémoire
+        renvoie le chemin du pdf
+        """
+        os.makedirs(self.build_dir, exist_ok=True)
+        pdf_path = os.path.join(self.build_dir, name + ".pdf")
+        hash_path = os.path.join(self.build_dir, name + ".sha256")
+
+        content = hashlib.sha256()
+        preamble = []
+        with open(source, 'r', encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(BEGIN_DOCUMENT):
+                    content.update(line.encode("utf-8"))
+                    break
+                preamble.append(line)
+                content.update(line.encode("utf-8"))
+            for block in iter(lambda: f.read(1 << 16), ""):
+                content.update(block.encode("utf-8"))
+
+        fmt = self._format("".join(preamble)) if self.use_format else None
+        digest = _sha256(self.compiler, fmt or "", content.hexdigest())
+
+        if os.path.exists(pdf_path) and os.path.exists(hash_path):
+            with open(hash_path, 'r') as f:
+                if f.read() == digest:
+                    self.skipped += 1
+                    return pdf_path
+
+        with open(source, 'r', encoding="utf-8") as f, open(os.path.join(self.build_dir, name + ".tex"), 'w', encoding="utf-8") as g:
+            if fmt:
+                # avec un format, le préambule est déjà chargé : seul le corps est lu
+                for line in f:
+                    if line.startswith(BEGIN_DOCUMENT):
+                        g.write(line)
+                        break
+            shutil.copyfileobj(f, g)
+
+        args = [f"-fmt={fmt}", name + ".tex"] if fmt else [name + ".tex"]
+        for _ in range(self.max_passes):
+            log = self._run(args, name)
+            if not RERUN.search(log):
+                break
+
+        # l'empreinte n'est écrite qu'après une compilation réussie
+        with open(hash_path, 'w') as f:
+            f.write(digest)
+        self.compiled += 1
+        return pdf_path
+
+    def compile_unit(self, tex, name):
+        """
+        compile un document donné sous forme de chaîne, voir compile_file
+        """
+        os.makedirs(self.build_dir, exist_ok=True)
+        source = os.path.join(self.build_dir, name + ".source.tex")
+        with open(source, 'w', encoding="utf-8") as f:
+            f.write(tex)
+        return self.compile_file(source, name)
+
+    def compile_tex(self, filepath):
+        """
+        compile filepath.tex, déjà écrit, en filepath.pdf
+        """
+        self.merge([self.compile_file(filepath + ".tex", os.path.basename(filepath))], filepath + ".pdf")
+
+    def merge(self, pdf_paths, output):
+        """
+        assemble les pdf des unités dans output, sans rien refaire si aucune unité n'a changé
+        """
+        if len(pdf_paths) == 1:
+            shutil.copyfile(pdf_paths[0], output)
+            return
+
+        digests = []
+        for path in pdf_paths:
+            with open(os.path.splitext(path)[0] + ".sha256", 'r') as f:
+                digests.append(f.read())
+        name = "merge-" + _sha256(*pdf_paths, *digests)[:16]
+        merged = os.path.join(self.build_dir, name + ".pdf")
+
+        if os.path.exists(merged):
+            self.skipped += 1
+        elif shutil.which("pdfunite"):
+            subprocess.run(["pdfunite"] + list(pdf_paths) + [merged], check=True)
+        else:
+            with open(os.path.join(self.build_dir, name + ".tex"), 'w', encoding="utf-8") as f:
+                f.write("\\documentclass{article}\n\\usepackage{pdfpages}\n\\begin{document}\n")
+                for path in pdf_paths:
+                    f.write(f"\\includepdf[pages=-]{{{os.path.relpath(path, self.build_dir)}}}\n")
+                f.write("\\end{document}\n")
+            self._run([name + ".tex"], name)
+        shutil.copyfile(merged, output)
+
+    def generate_pdf(self, doc, filepath, units=None):
+        """
+        équivalent de doc.generate_pdf(filepath, clean_tex=False) : écrit filepath.tex et filepath.pdf
+
+        units : liste de morceaux de corps latex (une section par problème), compilés chacun dans
+        un document séparé avec le préambule de doc ; par défaut le document est compilé d'un bloc
+        """
+        tex = doc.dumps()
+        with open(filepath + ".tex", 'w', encoding="utf-8") as f:
+            f.write(tex)
+
+        base = os.path.basename(filepath)
+        if not units:
+            pdf_paths = [self.compile_file(filepath + ".tex", base)]
+        else:
+            preamble, _ = split_preamble(tex)
+            sources = [f"{preamble}{BEGIN_DOCUMENT}%\n{unit}%\n\\end{{document}}\n" for unit in units]
+            names = [f"{base}-{idx}" for idx in range(1, len(units) + 1)]
+            with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+                # le format est construit avant de lancer les compilations en parallèle
+                if self.use_format:
+                    os.makedirs(self.build_dir, exist_ok=True)
+                    self._format(preamble)
+                pdf_paths = list(executor.map(self.compile_unit, sources, names))
+
+        self.merge(pdf_paths, filepath + ".pdf")
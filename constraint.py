@@ -1,107 +1,180 @@
 
 
-import re
-from itertools import chain, count
-from math import inf
+from itertools import chain
 
-import sympy
+from linear_form import LinearForm, latex_scalar, latex_term
+
+COMP = {
+    'LEQ' : r"""\leq""",
+    'EQ' : r"""=""",
+    'GEQ' : r"""\geq""",
+    }
+
+
+def _typed(form):
+    """
+    forme comparable à une autre avec le type de chaque nombre : 1, Fraction(1) et 1.0 sont égaux
+    mais ne s'affichent pas de la même façon
+    """
+    return type(form.constant), form.constant, tuple((var, type(coeff), coeff) for var, coeff in form.terms.items())
 
-class Constraint:
 
-    l_part = None
-    r_part = None
+class Constraint:
+    """
+    contrainte linéaire l_part comp r_part
+    chaque membre est une LinearForm (l_form, r_form) ; les expressions sympy l_part et r_part
+    ne sont construites que pour le rendu
+    """
+
+    l_form = None
+    r_form = None
     comp = None
+    deviation_variable = None
     variables = list()
     substitutions = {}
 
     def __init__(self, l_part, comp, r_part):
-        self.l_part = sympy.sympify(l_part)
-        self.r_part = sympy.sympify(r_part)
+        self.l_form = LinearForm.convert(l_part)
+        self.r_form = LinearForm.convert(r_part)
         self.comp = comp
-        self.variables = sorted(set(filter(lambda x:isinstance(x, sympy.Symbol), chain(self.l_part.atoms(), self.r_part.atoms()))), key=lambda v:v.name)
+        self.variables = sorted(set(chain(self.l_form.terms, self.r_form.terms)))
         self.substitutions = {}
 
-    def __str__(self):
-        return str(self.l_part) + {
-            'LEQ' : r"""\leq""",
-            'EQ' : r"""=""",
-            'GEQ' : r"""\geq""",
-            }[self.comp] + str(self.r_part)
+    @property
+    def l_part(self):
+        return self.l_form.to_sympy()
 
-    def canonize(self):
-        scalar = self.get_scalar()
+    @l_part.setter
+    def l_part(self, value):
+        self.l_form = LinearForm.convert(value)
+
+    @property
+    def r_part(self):
+        return self.r_form.to_sympy()
 
-        lin_part = self.r_part - scalar[1]
-        self.l_part -= lin_part
-        self.r_part -= lin_part
-        self.l_part -= scalar[0]
-        self.r_part -= scalar[0]
+    @r_part.setter
+    def r_part(self, value):
+        self.r_form = LinearForm.convert(value)
 
+    def __str__(self):
+        return str(self.l_form) + COMP[self.comp] + str(self.r_form)
+
+    def canonize(self):
+        """
+        toutes les variables à gauche, les scalaires à droite, et les GEQ deviennent des LEQ
+        """
+        l_form = self.l_form.linear_part() - self.r_form.linear_part()
+        r_form = LinearForm(self.r_form.constant - self.l_form.constant)
 
         if self.comp == "GEQ":
-            self.l_part *= -1
-            self.r_part *= -1
+            l_form, r_form = -l_form, -r_form
             self.comp = "LEQ"
 
+        self.l_form, self.r_form = l_form, r_form
+
+    def negate(self):
+        """
+        multiplie les deux membres par -1
+        """
+        self.l_form, self.r_form = -self.l_form, -self.r_form
+        self.comp = {"LEQ" : "GEQ", "GEQ" : "LEQ"}.get(self.comp, self.comp)
+
     def set_variables(self, variables):
         self.variables = variables
 
     def add_deviation(self, deviation_variable):
 
-        self.l_part += deviation_variable
+        self.l_form = self.l_form + LinearForm.variable(deviation_variable)
         if deviation_variable not in self.variables:
             self.variables.append(deviation_variable)
         self.deviation_variable = deviation_variable
         self.comp = "EQ"
 
+    def get_base_variable(self):
+        """
+        variable de base d'une contrainte sous forme standard (seule variable du membre gauche)
+        """
+        return self.l_form.single_variable()
+
     def in_base(self, base_variable=None):
         if base_variable is None:
             base_variable = self.deviation_variable
         l_coeff, r_coeff = self.get_coeff(base_variable)
         coeff = l_coeff - r_coeff
 
-        self.l_part, self.r_part = base_variable, (self.r_part - self.l_part + coeff*base_variable) / (coeff)
+        self.l_form, self.r_form = LinearForm.variable(base_variable), (self.r_form - self.l_form + LinearForm.variable(base_variable, coeff)) / coeff
 
 
     def var_constraint(self, out_variable):
-        return Constraint(self.r_part.subs([(var, 0) for var in filter(lambda v:v!=out_variable, self.variables)]), "GEQ", 0)
+        return Constraint(self.r_form.restrict([out_variable]), "GEQ", 0)
 
     def subs(self, variable, expression):
-        self.substitutions[variable] = expression
+        self.substitutions[variable] = LinearForm.convert(expression)
 
     def apply_subs(self):
-        self.l_part = self.l_part.subs([(k,v) for k, v in self.substitutions.items()])
-        self.r_part = self.r_part.subs([(k,v) for k, v in self.substitutions.items()])
+        self.l_form = self.l_form.substitute(self.substitutions)
+        self.r_form = self.r_form.substitute(self.substitutions)
         self.substitutions = {}
 
     def latex(self):
-        COMP = {
-            'LEQ' : r"""\leq""",
-            'EQ' : r"""=""",
-            'GEQ' : r"""\geq""",
-            }
+        import sympy
         return sympy.latex(self.l_part) + COMP[self.comp] + sympy.latex(self.r_part)
 
+    def _substitution(self, variable):
+        """
+        expression sympy affichée pour une variable : la variable ou sa substitution en attente
+        """
+        import sympy
+        if variable in self.substitutions:
+            return self.substitutions[variable].to_sympy()
+        return sympy.Symbol(variable)
+
+    def term_latex(self, coeff, variable):
+        """
+        code latex de coeff * variable, ou de coeff * (substitution en attente de la variable)
+        """
+        if variable in self.substitutions:
+            import sympy
+            return sympy.latex(sympy.Mul(coeff, self.substitutions[variable].to_sympy(), evaluate=False))
+        return latex_term(coeff, variable)
+
+    def latex_key(self):
+        """
+        état dont dépend le rendu de la contrainte, comparé d'un rendu à l'autre : une
+        substitution en attente ne compte que pour une variable de la contrainte
+        """
+        terms = self.l_form.terms, self.r_form.terms
+        substitutions = tuple((variable, _typed(form)) for variable, form in self.substitutions.items() if any(part.get(variable, 0) != 0 for part in terms))
+        return _typed(self.l_form), _typed(self.r_form), self.comp, tuple(self.variables), substitutions
+
+    def std_latex_key(self, out_var=None):
+        """
+        latex_key pour std_latex_array(out_var) : une variable hors base absente de la ligne n'y
+        ajoute que deux cases vides, seule compte leur place parmi les termes de la ligne
+        """
+        terms = self.r_form.terms
+        cells = tuple(var if terms.get(var, 0) != 0 else None for var in self.variables if terms.get(var, 0) != 0 or not out_var or var in out_var)
+        return self.latex_key() + (cells,)
+
     def std_latex_array(self, out_var=None):
         l_scalar, r_scalar = self.get_scalar()
 
         l_part = []
-        r_part = [sympy.latex(r_scalar)]
+        r_part = [latex_scalar(r_scalar)]
 
         for variable in self.variables:
 
             l_coeff, r_coeff = self.get_coeff(variable)
-            substitution = self.substitutions.get(variable, variable)
 
             if l_coeff != 0:
-                l_part.append(sympy.latex(sympy.Mul(l_coeff, substitution, evaluate=False)))
+                l_part.append(self.term_latex(l_coeff, variable))
 
             if r_coeff < 0:
                 r_part.append("-")
-                r_part.append(sympy.latex(sympy.Mul(-r_coeff, substitution, evaluate=False)))
+                r_part.append(self.term_latex(-r_coeff, variable))
             elif r_coeff > 0:
                 r_part.append("+")
-                r_part.append(sympy.latex(sympy.Mul(r_coeff, substitution, evaluate=False)))
+                r_part.append(self.term_latex(r_coeff, variable))
             elif out_var:
                 if variable in out_var:
                     r_part += ["", ""]
@@ -113,96 +186,33 @@ class Constraint:
         l_part = " & ".join(l_part)
         r_part = " & ".join(r_part)
 
-        comp = {
-            'LEQ' : r"""\leq""",
-            'EQ' : r"""=""",
-            'GEQ' : r"""\geq""",
-            }[self.comp]
-
-        return l_part + " & " + comp + " & " + r_part + r"""\\"""
+        return l_part + " & " + COMP[self.comp] + " & " + r_part + r"""\\"""
 
     def latex_array(self):
         l_scalar, r_scalar = self.get_scalar()
 
-        l_part = [sympy.latex(l_scalar)] if l_scalar != 0 else []
-        r_part = [sympy.latex(r_scalar)]
+        l_part = [latex_scalar(l_scalar)] if l_scalar != 0 else []
+        r_part = [latex_scalar(r_scalar)]
 
         for variable in self.variables:
 
             l_coeff, r_coeff = self.get_coeff(variable)
-            substitution = self.substitutions.get(variable, variable)
 
             if l_coeff != 0:
-                l_part.append(sympy.latex(sympy.Mul(l_coeff, substitution, evaluate=False)))
+                l_part.append(self.term_latex(l_coeff, variable))
             else:
                 l_part.append("")
 
             if r_coeff != 0:
-                r_part.append(sympy.latex(sympy.Mul(r_coeff, substitution, evaluate=False)))
+                r_part.append(self.term_latex(r_coeff, variable))
 
         l_part = " & + & ".join(l_part)
         r_part = " & + & ".join(r_part)
 
-        comp = {
-            'LEQ' : r"""\leq""",
-            'EQ' : r"""=""",
-            'GEQ' : r"""\geq""",
-            }[self.comp]
-
-        return l_part + " & " + comp + " & " + r_part + r"""\\"""
-
-
-
+        return l_part + " & " + COMP[self.comp] + " & " + r_part + r"""\\"""
 
     def get_coeff(self, variable):
-        return self._get_coeff(self.l_part, variable), self._get_coeff(self.r_part, variable)
-
-    @classmethod
-    def _get_coeff(cls, expression, variable):
-
-        assert cls._is_linear_part(expression)
-
-        coeff = None
-        if expression == variable:
-            return 1
-        elif isinstance(expression, sympy.mul.Mul):
-            if variable in expression.args:
-                return expression.subs(variable, 1)
-        elif isinstance(expression, sympy.add.Add):
-            coeff = 0
-            for arg in expression.args:
-                coeff += cls._get_coeff(arg, variable)
-            return coeff
-
-        return 0
-
-    @staticmethod
-    def _has_symbols(expression):
-        return any([e.is_symbol for e in expression.atoms()])
-
-    @staticmethod
-    def _nb_symbols(expression):
-        return len(list(filter(lambda x:isinstance(x, sympy.Symbol), expression.atoms())))
-
-    @classmethod
-    def _is_linear_part(cls, part):
-
-        if part.is_number or part.is_symbol:
-            return True
-        elif isinstance(part, sympy.mul.Mul):
-            # works if only 1 arg got symbols (avoid quadratic)
-            if sum([cls._has_symbols(arg) for arg in part.args]) > 1:
-                return False
-
-            return all([cls._is_linear_part(arg) for arg in part.args])
-
-        elif isinstance(part, sympy.add.Add):
-            return all([cls._is_linear_part(arg) for arg in part.args])
-
-        return False
-
-    def _get_scalar(self, expression):
-        return expression.subs([(k, 0) for k in self.variables])
+        return self.l_form.coeff(variable), self.r_form.coeff(variable)
 
     def get_scalar(self):
-        return self._get_scalar(self.l_part), self._get_scalar(self.r_part)
+        return self.l_form.constant, self.r_form.constant
@@ -0,0 +1,310 @@
+"""
+moteur exact sans fractions
+
+chaque ligne du tableau est stockée sous la forme de numérateurs entiers et d'un dénominateur
+commun positif : la ligne i vaut A[i] / d[i] et son second membre b[i] / d[i], la fonction
+utilité vaut (c.x + z0) / dc. Les pivots sont des combinaisons entières de lignes (sans
+division, comme dans l'élimination de Bareiss), chaque ligne modifiée est ensuite réduite par le
+pgcd de ses coefficients.
+
+Les tableaux sont en int64 : avant chaque pivot, une borne des résultats est calculée et si elle
+dépasse int64, les tableaux passent en entiers python (dtype object), sans limite de taille ; ils
+reviennent en int64 dès que les coefficients le permettent. Les valeurs ne sont converties en
+fractions que pour le rendu et pour les règles de pricing.
+"""
+
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+
+import numpy
+
+from tableau import TableauLinProg
+
+# marge sous 2^63 : les bornes calculées couvrent une soustraction et un changement de signe
+LIMIT = 2 ** 62
+
+
+def lcm(*numbers):
+    """
+    plus petit commun multiple (math.lcm n'existe qu'à partir de python 3.9)
+    """
+    return reduce(lambda a, b: a * b // gcd(a, b), numbers, 1)
+
+
+def _magnitude(array):
+    return int(numpy.abs(array).max()) if array.size else 0
+
+
+def _integer_row(values, constant):
+    """
+    numérateurs, numérateur de la constante et dénominateur commun d'une ligne de fractions
+    """
+    values = [Fraction(value) for value in values]
+    constant = Fraction(constant)
+    den = lcm(constant.denominator, *(value.denominator for value in values))
+    return [value.numerator * (den // value.denominator) for value in values], constant.numerator * (den // constant.denominator), den
+
+
+class FractionFreeLinProg(TableauLinProg):
+    """
+    programme linéaire résolu sur un tableau d'entiers avec un dénominateur par ligne
+    les pivots et le rendu sont identiques à ceux de TableauLinProg en arithmétique "fraction"
+    """
+
+    d = None
+    dc = 1
+    big = False
+
+    def __init__(self, pricing="dantzig"):
+        super().__init__(arithmetic="fraction", pricing=pricing)
+        self.arithmetic = "integer"
+
+    def _array(self, values):
+        return numpy.vectorize(Fraction, otypes=[object])(numpy.array(values, dtype=object))
+
+    def _zeros(self, shape):
+        return numpy.zeros(shape, dtype=object if self.big else numpy.int64)
+
+    def _row_unit(self, idx):
+        return self.d[idx]
+
+    def from_dict(self, dictionnary):
+        super().from_dict(dictionnary)
+
+        rows = [_integer_row(row, rhs) for row, rhs in zip(self.A, self.b)]
+        self.A = numpy.array([row for row, _, _ in rows], dtype=object).reshape(self.A.shape)
+        self.b = numpy.array([rhs for _, rhs, _ in rows], dtype=object)
+        self.d = numpy.array([den for _, _, den in rows], dtype=object)
+        c, z0, self.dc = _integer_row(self.c, self.z0)
+        self.c = numpy.array(c, dtype=object)
+        self.z0 = z0
+        self.big = True
+        self._normalize(numpy.arange(len(self.b)))
+        self._fit()
+
+    # représentation entière
+
+    def _fit(self):
+        """
+        int64 si tous les coefficients le permettent, entiers python sinon
+        """
+        magnitude = max(_magnitude(self.A), _magnitude(self.b), _magnitude(self.d), _magnitude(self.c), abs(self.z0), self.dc)
+        big = magnitude >= LIMIT
+        dtype = object if big else numpy.int64
+        if big != self.big or self.A.dtype != dtype:
+            self.A, self.b, self.d, self.c = (array.astype(dtype) for array in (self.A, self.b, self.d, self.c))
+            self.big = big
+
+    def _widen(self):
+        if not self.big:
+            self.A, self.b, self.d, self.c = (array.astype(object) for array in (self.A, self.b, self.d, self.c))
+            self.big = True
+
+    def _normalize(self, rows):
+        """
+        divise les lignes rows par le pgcd de leurs numérateurs et de leur dénominateur
+        """
+        if len(rows) == 0:
+            return
+        g = numpy.gcd.reduce(numpy.column_stack([self.A[rows], self.b[rows], self.d[rows]]), axis=1)
+        self.A[rows] //= g[:, None]
+        self.b[rows] //= g
+        self.d[rows] //= g
+
+    def _normalize_utility(self):
+        g = int(numpy.gcd.reduce(numpy.concatenate([self.c, numpy.array([self.z0, self.dc], dtype=self.c.dtype)])))
+        self.c //= g
+        self.z0 = int(self.z0) // g
+        self.dc = int(self.dc) // g
+
+    # valeurs exactes, pour le rendu et le pricing
+
+    def _fractions(self, numerators, denominators):
+        return numpy.array([Fraction(int(num), int(den)) for num, den in zip(numerators, denominators)], dtype=object)
+
+    def _tableau_row(self, idx):
+        return self._fractions(self.A[idx], [self.d[idx]] * self.A.shape[1]), Fraction(int(self.b[idx]), int(self.d[idx]))
+
+    def _objective_row(self):
+        return self._fractions(self.c, [self.dc] * len(self.c)), Fraction(self.z0, self.dc)
+
+    def _tableau_column(self, variable):
+        return self._fractions(self.A[:, self.variables.index(variable)], self.d)
+
+    def _tableau_row_combination(self, vector):
+        weights = numpy.array([Fraction(value) / int(den) for value, den in zip(vector, self.d)], dtype=object)
+        return numpy.dot(weights, self.A.astype(object))
+
+    def _rhs(self):
+        return self._fractions(self.b, self.d)
+
+    def _reduced_costs(self, variables):
+        index = {var: j for j, var in enumerate(self.variables)}
+        return [Fraction(int(self.c[index[var]]), self.dc) for var in variables]
+
+    def update_solution(self):
+        self.current_solution = {var: Fraction(0) for var in self.out}
+        for idx, base_idx in enumerate(self.row_base):
+            self.current_solution[self.variables[base_idx]] = Fraction(int(self.b[idx]), int(self.d[idx]))
+        self._complemented_values()
+
+    def _utility_value(self):
+        return Fraction(self.z0, self.dc)
+
+    # méthode des deux phases
+
+    def _reduce(self, cost, z0, dc):
+        """
+        exprime la fonction utilité (cost.x + z0) / dc en fonction des variables hors base
+        renvoie ses numérateurs et son dénominateur, en entiers python
+        """
+        cost = cost.astype(object)
+        factors = [(idx, int(cost[base_idx])) for idx, base_idx in enumerate(self.row_base) if cost[base_idx] != 0]
+        den = lcm(*(int(self.d[idx]) for idx, _ in factors))
+        cost = cost * den
+        z0 = int(z0) * den
+        for idx, factor in factors:
+            scale = factor * (den // int(self.d[idx]))
+            cost -= scale * self.A[idx].astype(object)
+            z0 += scale * int(self.b[idx])
+        return cost, z0, int(dc) * den
+
+    def start_phase_one(self, comment="On maximise $w$, l'opposé de la somme des variables artificielles."):
+        self.phase_two_utility = (self.c, self.z0, self.dc)
+        cost = numpy.zeros(len(self.variables), dtype=object)
+        cost[[self.variables.index(var) for var in self.artificials]] = -1
+        self._set_utility((cost, 0, 1))
+        self.objective_name = "w"
+        self.comments = comment
+
+    def _set_utility(self, utility):
+        self.c, self.z0, self.dc = self._reduce(*utility)
+        self._widen()
+        self._normalize_utility()
+        self._fit()
+
+    def _utility_data(self, utility):
+        c, z0, dc = _integer_row(*self._coefficients(utility))
+        return numpy.array(c, dtype=object), z0, dc
+
+    def _shift_rhs(self, shift, utility_shift):
+        self._widen()
+        rows = []
+        for idx, value in enumerate(shift):
+            value = Fraction(value)
+            if value != 0:
+                # b / d + p / q = (b q + p d) / (d q)
+                self.A[idx] *= value.denominator
+                self.b[idx] = self.b[idx] * value.denominator + value.numerator * self.d[idx]
+                self.d[idx] *= value.denominator
+                rows.append(idx)
+        self._normalize(rows)
+
+        utility_shift = Fraction(utility_shift)
+        self.c *= utility_shift.denominator
+        self.z0 = self.z0 * utility_shift.denominator + utility_shift.numerator * self.dc
+        self.dc *= utility_shift.denominator
+        self._normalize_utility()
+        self._fit()
+
+    def _drop_row(self, idx):
+        super()._drop_row(idx)
+        self.d = numpy.delete(self.d, idx)
+
+    def _append_row(self, coefficients, value, slack):
+        coefficients, value = self._reduced_row(coefficients, value)
+        row, rhs, den = _integer_row(coefficients + [1], value)
+        column = len(self.variables)
+        self._widen()
+        self.A = numpy.vstack([numpy.hstack([self.A, numpy.zeros((len(self.b), 1), dtype=object)]), numpy.array([row], dtype=object)])
+        self.b = numpy.append(self.b, numpy.array([rhs], dtype=object))
+        self.d = numpy.append(self.d, numpy.array([den], dtype=object))
+        self.c = numpy.append(self.c, numpy.array([0], dtype=object))
+        self.row_base.append(column)
+        self.deviation.append(column)
+        self.comps.append("EQ")
+        self._normalize([len(self.b) - 1])
+        self._fit()
+
+    def _complement(self, variable, new_name, bound):
+        """
+        colonne j de variable = p / q - new_name : chaque ligne est multipliée par q, b -= A[:, j] p,
+        puis la colonne change de signe
+        """
+        j = self.variables.index(variable)
+        bound = Fraction(bound)
+        p, q = bound.numerator, bound.denominator
+        self._widen()
+        self.b = self.b * q - self.A[:, j] * p
+        self.A *= q
+        self.d *= q
+        self.A[:, j] = -self.A[:, j]
+        if j in self.row_base:
+            # la variable de base garde un coefficient positif dans sa ligne
+            idx = self.row_base.index(j)
+            self.A[idx] = -self.A[idx]
+            self.b[idx] = -self.b[idx]
+        self._normalize(numpy.arange(len(self.b)))
+
+        self.c, self.z0, self.dc = self._complement_utility(self.c, self.z0, self.dc, j, p, q)
+        self._normalize_utility()
+        if self.phase_two_utility is not None:
+            self.phase_two_utility = self._complement_utility(*self.phase_two_utility, j, p, q)
+        self._fit()
+
+    def _complement_utility(self, c, z0, dc, j, p, q):
+        # (c.x + z0) / dc avec x_j = p / q - new_name
+        z0 = int(z0) * q + int(c[j]) * p
+        c = c.astype(object) * q
+        c[j] = -c[j]
+        return c, z0, int(dc) * q
+
+    # pivots
+
+    def _scale_row(self, idx, column):
+        # la ligne vaut A[idx] / d[idx], divisée par A[idx, column] / d[idx] : seul le dénominateur change
+        pivot = self.A[idx, column]
+        if pivot < 0:
+            self.A[idx] = -self.A[idx]
+            self.b[idx] = -self.b[idx]
+        self.d[idx] = abs(pivot)
+        self._normalize([idx])
+
+    def _eliminate(self, column, idx):
+        pivot_row, pivot_rhs, pivot_den = self.A[idx].copy(), self.b[idx], self.d[idx]
+        factors = self.A[:, column].copy()
+        factors[idx] = 0
+        rows = numpy.flatnonzero(factors)
+        factor = self.c[column]
+
+        if not self.big:
+            # borne des numérateurs et dénominateurs calculés, en entiers python
+            pivot_max = max(_magnitude(pivot_row), abs(int(pivot_rhs)))
+            den = int(pivot_den)
+            bound = max(
+                max(_magnitude(self.A[rows]), _magnitude(self.b[rows])) * den + _magnitude(factors) * pivot_max,
+                _magnitude(self.d[rows]) * den,
+                max(_magnitude(self.c), abs(self.z0)) * den + abs(int(factor)) * pivot_max,
+                self.dc * den,
+                )
+            if bound >= LIMIT:
+                self._widen()
+                pivot_row, pivot_rhs, pivot_den = pivot_row.astype(object), int(pivot_rhs), int(pivot_den)
+                factors = factors.astype(object)
+                factor = int(factor)
+
+        f = factors[rows]
+        self.A[rows] = self.A[rows] * pivot_den - numpy.outer(f, pivot_row)
+        self.b[rows] = self.b[rows] * pivot_den - f * pivot_rhs
+        self.d[rows] = self.d[rows] * pivot_den
+        self._normalize(rows)
+
+        if factor != 0:
+            self.c = self.c * pivot_den - factor * pivot_row
+            self.z0 = int(self.z0) * int(pivot_den) + int(factor) * int(pivot_rhs)
+            self.dc = int(self.dc) * int(pivot_den)
+            self._normalize_utility()
+
+        if self.big:
+            self._fit()
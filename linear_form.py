@@ -0,0 +1,352 @@
+"""
+formes linéaires creuses : une constante et un dictionnaire variable -> coefficient
+
+c'est la représentation de calcul des contraintes et de la fonction utilité. Les coefficients
+sont des fractions exactes (ou des flottants pour le moteur tableau en float64). Les expressions
+sympy ne sont construites que pour le rendu latex : sympy n'est importé qu'à ce moment.
+le code latex des variables, des nombres et des termes coefficient * variable est mémorisé
+(cache LRU borné) : les mêmes termes reviennent à chaque tableau affiché.
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+from numbers import Integral
+import re
+import sys
+
+
+def loaded_sympy():
+    """
+    module sympy s'il est déjà importé, None sinon : sans sympy chargé, aucune valeur ne peut être
+    une expression sympy, inutile de l'importer pour le vérifier
+    """
+    return sys.modules.get("sympy")
+
+
+def to_number(value):
+    """
+    convertit un nombre (python, numpy ou sympy) en fraction exacte, les flottants restent flottants
+    """
+    if type(value) in (Fraction, float):
+        # cas le plus fréquent, sans passer par les classes abstraites de numbers
+        return value
+    if hasattr(value, "item"):
+        # scalaire numpy
+        return to_number(value.item())
+    if isinstance(value, (Fraction, float)):
+        return value
+    if isinstance(value, Integral):
+        return Fraction(int(value))
+    sympy = loaded_sympy()
+    if sympy is not None and isinstance(value, sympy.Rational):
+        return Fraction(int(value.p), int(value.q))
+    if sympy is not None and isinstance(value, sympy.Float):
+        return float(value)
+    return Fraction(value)
+
+
+# nombre de codes latex gardés par chacun des caches ; les nombres sont mis en cache avec leur
+# type (typed) : 1, Fraction(1) et 1.0 sont égaux mais ne s'affichent pas de la même façon
+LATEX_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=LATEX_CACHE_SIZE)
+def latex_variable(name):
+    """
+    code latex d'une variable
+    """
+    import sympy
+    return sympy.latex(sympy.Symbol(name))
+
+
+@lru_cache(maxsize=LATEX_CACHE_SIZE, typed=True)
+def latex_scalar(value):
+    """
+    code latex d'un nombre
+    """
+    import sympy
+    return sympy.latex(sympy.sympify(value))
+
+
+@lru_cache(maxsize=LATEX_CACHE_SIZE, typed=True)
+def latex_term(coeff, name):
+    """
+    code latex du terme coeff * name, sans simplification (1 x_1 s'affiche x_{1})
+    """
+    import sympy
+    return sympy.latex(sympy.Mul(coeff, sympy.Symbol(name), evaluate=False))
+
+
+def modified_name(name, modifier, used=()):
+    """
+    nom d'une variable dérivée de name, distinct des noms de used : modified_name("x_1", "bar")
+    vaut "xbar_1", affiché \\bar{x}_{1} (sympy lit le modificateur à la fin du nom de base)
+    """
+    prefix = re.match(r"[A-Za-z]*", name).end()
+    new_name = name[:prefix] + modifier + name[prefix:]
+    while new_name in used:
+        new_name += "_"
+    return new_name
+
+
+class LinearForm:
+    """
+    constante + somme coeff * variable, les variables sont identifiées par leur nom
+    les opérations renvoient une nouvelle forme
+    """
+
+    __slots__ = ("constant", "terms")
+
+    def __init__(self, constant=0, terms=None):
+        # une constante nulle est toujours l'entier 0 (affiché 0 et non 0.0)
+        self.constant = constant if constant != 0 else 0
+        self.terms = {var: coeff for var, coeff in terms.items() if coeff != 0} if terms else {}
+
+    @classmethod
+    def variable(cls, name, coeff=1):
+        return cls(0, {name: to_number(coeff)})
+
+    @classmethod
+    def from_sympy(cls, expression):
+        """
+        extrait la forme d'une expression sympy linéaire
+        """
+        import sympy
+        constant = Fraction(0)
+        terms = {}
+        for term, coeff in sympy.expand(expression).as_coefficients_dict().items():
+            if term == 1:
+                constant += to_number(coeff)
+            elif isinstance(term, sympy.Symbol):
+                terms[term.name] = terms.get(term.name, 0) + to_number(coeff)
+            else:
+                raise ValueError(f"non linear term {term} in {expression}")
+        return cls(constant, terms)
+
+    @classmethod
+    def convert(cls, value):
+        """
+        construit une forme à partir d'une forme, d'une expression sympy, d'une chaîne ou d'un nombre
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return parse_expression(value)
+        sympy = loaded_sympy()
+        if sympy is not None and isinstance(value, sympy.Basic):
+            return cls.from_sympy(value)
+        return cls(to_number(value))
+
+    def coeff(self, variable):
+        return self.terms.get(variable, 0)
+
+    def variables(self):
+        return list(self.terms)
+
+    def single_variable(self):
+        """
+        nom de la variable si la forme est exactement une variable, None sinon
+        """
+        if self.constant == 0 and len(self.terms) == 1:
+            (variable, coeff), = self.terms.items()
+            if coeff == 1:
+                return variable
+        return None
+
+    def restrict(self, variables):
+        """
+        forme réduite à la constante et aux variables données (les autres valent 0)
+        """
+        return LinearForm(self.constant, {var: coeff for var, coeff in self.terms.items() if var in variables})
+
+    def linear_part(self):
+        return LinearForm(0, self.terms)
+
+    def substitute(self, substitutions):
+        """
+        remplace simultanément chaque variable de substitutions par la forme associée
+        """
+        constant = self.constant
+        terms = {}
+        for var, coeff in self.terms.items():
+            form = substitutions.get(var)
+            if form is None:
+                terms[var] = terms.get(var, 0) + coeff
+                continue
+            constant += coeff * form.constant
+            for sub_var, sub_coeff in form.terms.items():
+                terms[sub_var] = terms.get(sub_var, 0) + coeff * sub_coeff
+        return LinearForm(constant, terms)
+
+    def __add__(self, other):
+        other = LinearForm.convert(other)
+        terms = dict(self.terms)
+        for var, coeff in other.terms.items():
+            terms[var] = terms.get(var, 0) + coeff
+        return LinearForm(self.constant + other.constant, terms)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return LinearForm(-self.constant, {var: -coeff for var, coeff in self.terms.items()})
+
+    def __sub__(self, other):
+        return self + (-LinearForm.convert(other))
+
+    def __rsub__(self, other):
+        return LinearForm.convert(other) - self
+
+    def __mul__(self, scalar):
+        return LinearForm(self.constant * scalar, {var: coeff * scalar for var, coeff in self.terms.items()})
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return LinearForm(self.constant / scalar, {var: coeff / scalar for var, coeff in self.terms.items()})
+
+    def __eq__(self, other):
+        if not isinstance(other, LinearForm):
+            return NotImplemented
+        return self.constant == other.constant and self.terms == other.terms
+
+    def __hash__(self):
+        return hash((self.constant, frozenset(self.terms.items())))
+
+    def to_sympy(self):
+        import sympy
+        return sympy.sympify(self.constant) + sum(
+            (sympy.sympify(coeff) * sympy.Symbol(var) for var, coeff in self.terms.items()),
+            sympy.Integer(0))
+
+    def __str__(self):
+        parts = []
+        for var in sorted(self.terms):
+            coeff = self.terms[var]
+            sign = "-" if coeff < 0 else "+"
+            text = var if abs(coeff) == 1 else f"{abs(coeff)}*{var}"
+            parts.append((sign, text))
+        if self.constant != 0 or not parts:
+            parts.append(("-" if self.constant < 0 else "+", str(abs(self.constant))))
+        text = " ".join(f"{sign} {part}" for sign, part in parts)
+        return text[2:] if text.startswith("+ ") else "-" + text[2:]
+
+    def __repr__(self):
+        return f"LinearForm({self})"
+
+
+# analyse des chaînes : "10*x_1 + 5*x_2 <= 200" est lu directement en formes linéaires, sans sympy
+
+TOKEN_REGEX = re.compile(r"""\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<op><=|>=|=|[-+*/()]))""")
+
+COMPARATORS = {
+    "<=" : "LEQ",
+    ">=" : "GEQ",
+    "=" : "EQ",
+    }
+
+
+def tokenize(text):
+    """
+    découpe une expression en lexèmes (type, valeur) : number, name ou op
+    """
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_REGEX.match(text, pos)
+        if match is None or match.end() == pos:
+            raise SyntaxError(f"unexpected character {text[pos:].strip()[:1]!r} in {text!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    analyseur descendant récursif :
+    expression = terme (("+" | "-") terme)*
+    terme = facteur (("*" | "/") facteur)*
+    facteur = ("+" | "-") facteur | nombre | variable | "(" expression ")"
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def error(self, message):
+        return SyntaxError(f"{message} in {self.text!r}")
+
+    def expression(self):
+        form = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            _, op = self.take()
+            form = form + self.term() if op == "+" else form - self.term()
+        return form
+
+    def term(self):
+        form = self.factor()
+        while self.peek() in (("op", "*"), ("op", "/")):
+            _, op = self.take()
+            other = self.factor()
+            if op == "/":
+                if other.terms or other.constant == 0:
+                    raise self.error("division by a variable or by 0")
+                form = form / other.constant
+            elif not other.terms:
+                form = form * other.constant
+            elif not form.terms:
+                form = other * form.constant
+            else:
+                raise self.error("non linear product")
+        return form
+
+    def factor(self):
+        kind, value = self.take()
+        if kind == "number":
+            return LinearForm(Fraction(value))
+        if kind == "name":
+            return LinearForm.variable(value)
+        if value == "-":
+            return -self.factor()
+        if value == "+":
+            return self.factor()
+        if value == "(":
+            form = self.expression()
+            if self.take() != ("op", ")"):
+                raise self.error("missing )")
+            return form
+        raise self.error(f"unexpected {value!r}" if value else "unexpected end")
+
+    def parse(self):
+        form = self.expression()
+        if self.pos != len(self.tokens):
+            raise self.error(f"unexpected {self.peek()[1]!r}")
+        return form
+
+
+def parse_expression(text):
+    """
+    lit une expression linéaire
+    """
+    return _Parser(text).parse()
+
+
+def parse_constraint(text):
+    """
+    lit une contrainte "l_part <= r_part" (ou >=, =) et renvoie (l_form, comp, r_form)
+    """
+    for symbol in ("<=", ">=", "="):
+        if symbol in text:
+            l_part, r_part = text.split(symbol, 1)
+            return parse_expression(l_part), COMPARATORS[symbol], parse_expression(r_part)
+    raise SyntaxError(f"no comparator in constraint {text!r}")
@@ -1,18 +1,59 @@
 
 
+from functools import partial
 import re
 from itertools import chain, count
 from math import inf
 
-import sympy
-
 from constraint import Constraint
+from linear_form import LinearForm, latex_scalar, latex_variable, modified_name, to_number
+from pricing import make_pricing
+
+
+def variable_bounds(dictionnary):
+    """
+    bornes du problème, dictionnary["bounds"] = {variable: (inférieure, supérieure)}, en nombres
+    (supérieure inf si elle est absente) ; les variables libres et les bornes inférieures
+    négatives ne sont pas gérées
+    """
+    bounds = {}
+    for var, (lower, upper) in dictionnary.get("bounds", {}).items():
+        if lower is None:
+            raise NotImplementedError(f"free variable {var} is not supported")
+        lower = to_number(lower)
+        if lower < 0:
+            raise NotImplementedError(f"negative lower bound on {var} is not supported")
+        bounds[str(var)] = (lower, inf if upper is None else to_number(upper))
+    return bounds
+
+
+def split_bounds(dictionnary):
+    """
+    contraintes du problème et bornes supérieures gérées par le simplexe à variables bornées
+    les autres bornes deviennent des contraintes : x >= l pour une borne inférieure non nulle,
+    x = l pour une variable fixée, x <= u pour une borne supérieure négative
+    """
+    rows = list(dictionnary["constraints"])
+    upper = {}
+    for var, (lower, bound) in variable_bounds(dictionnary).items():
+        if lower == bound:
+            rows.append((LinearForm.variable(var), "EQ", LinearForm(lower)))
+            continue
+        if lower > 0:
+            rows.append((LinearForm.variable(var), "GEQ", LinearForm(lower)))
+        if bound < 0:
+            rows.append((LinearForm.variable(var), "LEQ", LinearForm(bound)))
+        elif bound < inf:
+            upper[var] = bound
+    return rows, upper
+
 
 class LinProg:
     """
     classe permettant de contenir un programme d'optimisation linéaire et de le résoudre
     le format des donnée est le suivant :
     UTILITY = une liste de coefficients de la fonctions utilité
+    les variables sont identifiées par leur nom, utility est une LinearForm
     """
 
     title = ""
@@ -27,21 +68,87 @@ class LinProg:
     current_solution = {}
     base = None
     out = None
+    # variables artificielles du problème auxiliaire (phase 1)
+    artificials = []
+    phase_two_utility = None
+    objective_name = "z"
+    # tolérance sur les comparaisons à 0, nulle en calcul exact
+    tolerance = 0
+    # problème tel que donné à from_dict, lignes supprimées en fin de phase 1 (indices d'origine)
+    problem = None
+    dropped_rows = ()
+    _standard_rows = None
+    # pré-résolution appliquée au problème (presolve.Presolve), None sinon
+    presolve = None
+    # bornes supérieures gérées par le simplexe à variables bornées (nom d'origine -> borne) et
+    # variables complémentées x barre = u - x (nom courant -> nom d'origine)
+    upper = {}
+    complemented = {}
+    # la variable sortante du prochain pivot quitte la base à sa borne supérieure
+    leaving_bound = False
+    # rendu précédent de chaque ligne du tableau : (clé, code latex), voir _latex_line
+    _latex_lines = None
+    # variables entières (séparation et évaluation, voir branch_and_bound) et options de la
+    # séparation (arguments de branch_and_bound.BranchAndBound)
+    integer = []
+    branching = {}
+    # la base initiale est dual réalisable mais pas réalisable : simplexe dual au lieu de la
+    # phase 1 (voir needs_dual_simplex) ; allow_dual_simplex False impose la phase 1
+    dual_simplex = False
+    allow_dual_simplex = True
+
+    def __init__(self, pricing="dantzig"):
+        # règle de choix de la variable entrante, voir pricing.PRICINGS
+        self.pricing = make_pricing(pricing)
 
     def from_dict(self, dictionnary):
+        self.problem = dictionnary
         self.title = dictionnary.get("title", "")
         self.description = dictionnary.get("description", "")
-        self.utility = dictionnary["utility"]
-        self.utility_constraint = Constraint("z", "EQ", self.utility)
-        self.variables = dictionnary["variables"]
+        self.utility = LinearForm.convert(dictionnary["utility"])
+        self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
+        self.variables = [str(var) for var in dictionnary["variables"]]
+        self.decision_variables = list(self.variables)
         self.optimizer = dictionnary["optimizer"]
-        self.constraints = [Constraint(*constraint) for constraint in dictionnary["constraints"]]
+        self.initial_optimizer = self.optimizer
+        rows, self.upper = split_bounds(dictionnary)
+        self.complemented = {}
+        self.integer = [str(var) for var in dictionnary.get("integer", [])]
+        self.constraints = [Constraint(*constraint) for constraint in rows]
         for constraint in self.constraints:
             constraint.set_variables(self.variables)
+        self.artificials = []
+        self.objective_name = "z"
         self.comments = "Forme initiale du problème."
         self.standard = False
 
+    def to_dict(self):
+        """
+        renvoie le problème au format json de load_from_json, sous une forme normalisée
+        (formes linéaires réduites). À appeler avant canonical_form.
+        les bornes qui ne sont pas gérées par le simplexe à variables bornées sont des contraintes
+        """
+        COMP = {
+            'LEQ' : "<=",
+            'EQ' : "=",
+            'GEQ' : ">=",
+            }
+        data = {
+            "title" : self.title,
+            "description" : self.description,
+            "variables" : [str(var) for var in self.variables],
+            "utility" : str(self.utility),
+            "optimizer" : self.optimizer,
+            "constraints" : [f"{constraint.l_form} {COMP[constraint.comp]} {constraint.r_form}" for constraint in self.constraints],
+            }
+        if self.upper:
+            data["bounds"] = {var : [0, str(bound)] for var, bound in self.upper.items()}
+        if self.integer:
+            data["integer"] = list(self.integer)
+        return data
+
     def to_latex(self, comments=False):
+        import sympy
 
         COMP = {
             'LEQ' : r"""\leq""",
@@ -66,41 +173,28 @@ class LinProg:
 
         lines = [prefix]
 
+        # une ligne n'est recalculée que si sa contrainte a changé depuis le rendu précédent :
+        # un pivot ne modifie en général que quelques lignes
         if self.standard:
-            for constraint in self.constraints:
-                lines.append(constraint.std_latex_array(out_var=self.out))
+            out = frozenset(self.out or ())
+            for idx, constraint in enumerate(self.constraints):
+                lines.append(self._latex_line(("std", idx), constraint.std_latex_key(out), partial(constraint.std_latex_array, out_var=self.out)))
 
-            # import pdb; pdb.set_trace()
-            utility_line = "z & = & "
             utility = self.utility_constraint
-            if utility.get_scalar()[1] == 0:
-                skip = True
-            else:
-                skip = False
-                utility_line += sympy.latex(utility.get_scalar()[1])
-            for variable in self.variables:
-                var_coeff = utility.get_coeff(variable)[1]
-                substitution = utility.substitutions.get(variable, variable)
-                if var_coeff > 0:
-                    if skip:
-                        utility_line += " &  & " + sympy.latex(sympy.Mul(var_coeff, substitution, evaluate=False))
-                        skip = False
-                    else:
-                        utility_line += " & + & " + sympy.latex(sympy.Mul(var_coeff, substitution, evaluate=False))
-                elif var_coeff < 0:
-                    utility_line += " & - & " + sympy.latex(sympy.Mul(-var_coeff, substitution, evaluate=False))
-                    skip = False
-
-
-            lines.append(utility_line)
+            lines.append(self._latex_line("utility", utility.latex_key() + (self.objective_name,), partial(self._utility_latex, utility)))
             lines.append(suffix1)
 
         else:
-            for constraint in self.constraints:
-                lines.append(constraint.latex_array())
+            for idx, constraint in enumerate(self.constraints):
+                lines.append(self._latex_line(("array", idx), constraint.latex_key(), constraint.latex_array))
             lines.append(suffix1)
-            lines.append(self.optimizer + " z="+sympy.latex(self.utility))
+            lines.append(self.optimizer + " z="+sympy.latex(self.utility.to_sympy()))
         lines.append(suffix2)
+        if self.upper:
+            bounds = [f"0 \\leq {latex_variable(var)} \\leq {latex_scalar(self.bound(var))}" for var in self.variables if self.bound(var) < inf]
+            lines.append(r"\[" + r" \quad ".join(bounds) + r"\]")
+        if self.integer:
+            lines.append(r"\[" + ", ".join(latex_variable(var) for var in self.integer) + (r" \mbox{ entiers}\]" if len(self.integer) > 1 else r" \mbox{ entier}\]"))
         if self.current_solution:
             lines.append(self.view_solution())
         if comments:
@@ -108,6 +202,38 @@ class LinProg:
         else:
             return "\n".join(lines)
 
+    def _latex_line(self, line, key, render):
+        """
+        code latex d'une ligne du tableau : celui du rendu précédent si key n'a pas changé,
+        render() sinon
+        """
+        if self._latex_lines is None:
+            self._latex_lines = {}
+        cached = self._latex_lines.get(line)
+        if cached is None or cached[0] != key:
+            cached = self._latex_lines[line] = (key, render())
+        return cached[1]
+
+    def _utility_latex(self, utility):
+        utility_line = self.objective_name + " & = & "
+        if utility.get_scalar()[1] == 0:
+            skip = True
+        else:
+            skip = False
+            utility_line += latex_scalar(utility.get_scalar()[1])
+        for variable in self.variables:
+            var_coeff = utility.get_coeff(variable)[1]
+            if var_coeff > 0:
+                if skip:
+                    utility_line += " &  & " + utility.term_latex(var_coeff, variable)
+                    skip = False
+                else:
+                    utility_line += " & + & " + utility.term_latex(var_coeff, variable)
+            elif var_coeff < 0:
+                utility_line += " & - & " + utility.term_latex(-var_coeff, variable)
+                skip = False
+        return utility_line
+
     def canonical_form(self,
                        to_max="Minimiser une fonction, c'est maximiser son inverse : on multiplie $z$ par -1.\n",
                        comment="On transforme les $\\geq$ en $\\leq$ en multipliant chaque membre par -1.\n"
@@ -117,8 +243,8 @@ class LinProg:
         """
 
         if self.optimizer == "min":
-            self.utility *= -1
-            self.utility_constraint = Constraint("z", "EQ", self.utility)
+            self.utility = -self.utility
+            self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
             self.optimizer = "max"
             self.comments = to_max
         else:
@@ -131,12 +257,13 @@ class LinProg:
         self.comments += comment
 
 
-    def get_new_var(self):
+    def get_new_var(self, prefix="x"):
         for idx in count(1):
-            if sympy.Symbol(f"x_{idx}") in self.variables:
+            # le nom d'origine d'une variable complémentée reste réservé
+            if f"{prefix}_{idx}" in self.variables or f"{prefix}_{idx}" in self.complemented.values():
                 continue
             else:
-                return sympy.Symbol(f"x_{idx}")
+                return f"{prefix}_{idx}"
 
     def pre_standard_form(self, comment="On introduit les variables d'écart."):
 
@@ -155,8 +282,60 @@ class LinProg:
 
         self.comments = comment
 
+    def _row_constraint(self, idx):
+        return self.constraints[idx]
+
+    def _artificial_rows(self):
+        """
+        lignes sans variable de base évidente : égalités (pas de variable d'écart) ou second membre négatif
+        """
+        return [idx for idx, constraint in enumerate(self.constraints) if constraint.deviation_variable is None or constraint.get_scalar()[1] < 0]
+
+    def needs_artificials(self):
+        return bool(self._artificial_rows())
+
+    def _equality_rows(self):
+        """
+        lignes sans variable d'écart
+        """
+        return [idx for idx, constraint in enumerate(self.constraints) if constraint.deviation_variable is None]
+
+    def needs_dual_simplex(self):
+        """
+        à appeler après pre_standard_form : des seconds membres sont négatifs, mais chaque ligne a
+        sa variable d'écart et aucun coefficient de z n'est positif. La base des variables d'écart
+        est alors dual réalisable : le simplexe dual en part directement, sans variable artificielle
+        """
+        if not self.allow_dual_simplex or not self._artificial_rows() or self._equality_rows():
+            return False
+        return all(coeff <= self.tolerance for coeff in self.utility.terms.values())
+
+    def start_dual_simplex(self, comment="Les coefficients des variables dans $z$ sont tous négatifs ou nuls : la base des variables d'écart est dual réalisable, on applique l'algorithme dual du simplexe."):
+        self.dual_simplex = True
+        self.comments = comment
+
+    def add_artificials(self, comment="On multiplie par -1 les contraintes dont le second membre est négatif, et on introduit une variable artificielle dans chaque contrainte sans variable de base."):
+        """
+        à appeler après pre_standard_form : la variable artificielle devient la variable de base de sa ligne
+        """
+        for idx in self._artificial_rows():
+            constraint = self.constraints[idx]
+            if constraint.get_scalar()[1] < 0:
+                constraint.negate()
+            new_var = self.get_new_var("a")
+            self.variables.append(new_var)
+            self.artificials.append(new_var)
+            constraint.add_deviation(new_var)
+
+        for constraint in self.constraints:
+            constraint.set_variables(self.variables)
+
+        self.comments = comment
+
     def standard_form(self, comment="On passe les variables d'écart sur la partie gauche : ce sont les variables de base.\nLes autres membres sont sur la partie droite : ce sont les scalaires et les variables hors base."):
 
+        if any(constraint.deviation_variable is None for constraint in self.constraints):
+            raise NotImplementedError("can't put in base a constraint without deviation variable")
         for constraint in self.constraints:
             constraint.in_base()
 
@@ -165,15 +344,15 @@ class LinProg:
 
     def set_base(self, comment="On initialise la solution de base."):
 
-        base_var = [constraint.deviation_variable for constraint in self.constraints]
+        base_var = [constraint.get_base_variable() for constraint in self.constraints]
         out_var = [var for var in filter(lambda v:v not in base_var, self.variables)]
         solution = {var:0 for var in out_var}
 
         # check if out_var set to 0 is a solution
         for constraint in self.constraints:
-            if constraint.get_scalar()[1] < 0:
+            if constraint.get_scalar()[1] < 0 and not self.dual_simplex:
                 raise NotImplementedError("can't solve problems not satisfying 0 sol")
-            solution[constraint.l_part] = constraint.get_scalar()[1]
+            solution[constraint.get_base_variable()] = constraint.get_scalar()[1]
 
         self.base = base_var
         self.out = out_var
@@ -186,28 +365,234 @@ class LinProg:
 
         # check if out_var set to 0 is a solution
         for constraint in self.constraints:
-            self.current_solution[constraint.l_part] = constraint.get_scalar()[1]
+            self.current_solution[constraint.get_base_variable()] = constraint.get_scalar()[1]
+        self._complemented_values()
+
+    def _complemented_values(self):
+        """
+        valeurs des variables d'origine des variables complémentées : x = u - x barre
+        """
+        for new_name, variable in self.complemented.items():
+            self.current_solution[variable] = self.upper[variable] - self.current_solution[new_name]
+
+    def _utility_value(self):
+        """
+        valeur de la fonction utilité courante (z, ou w en phase 1) pour la solution de base
+        """
+        return self.utility_constraint.get_scalar()[1]
+
+    def get_objective_value(self):
+        """
+        valeur de la fonction objectif initiale pour la solution de base courante
+        """
+        value = self._utility_value()
+        return -value if self.initial_optimizer == "min" else value
+
+    # méthode des deux phases
+
+    def _set_utility(self, utility):
+        """
+        remplace la fonction utilité, exprimée en fonction des variables hors base
+        """
+        rows = {constraint.get_base_variable(): constraint.r_form for constraint in self.constraints}
+        self.utility = utility.substitute(rows)
+        self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
+        self.utility_constraint.set_variables(self.variables)
+
+    def start_phase_one(self, comment="On maximise $w$, l'opposé de la somme des variables artificielles."):
+        """
+        phase 1 : la fonction utilité devient w = - somme des variables artificielles
+        """
+        self.phase_two_utility = self.utility
+        self._set_utility(LinearForm(0, {var: -1 for var in self.artificials}))
+        self.objective_name = "w"
+        self.comments = comment
+
+    def end_phase_one(self,
+                      comment="On supprime les variables artificielles et on exprime $z$ en fonction des variables hors base.",
+                      infeasible="L'optimum de $w$ est strictement négatif : le problème n'a pas de solution réalisable."
+                      ):
+        """
+        fin de la phase 1, renvoie False si le problème n'a pas de solution réalisable
+        sinon les variables artificielles restées en base (à 0) en sont sorties, les lignes redondantes
+        supprimées, puis les variables artificielles sont retirées et z est rétablie
+        """
+        if self._utility_value() < -self.tolerance:
+            self.comments = infeasible
+            return False
+
+        for idx in reversed(range(len(self.base))):
+            if self._base_variable(idx) not in self.artificials:
+                continue
+            constraint = self._row_constraint(idx)
+            candidates = [var for var in self.out if var not in self.artificials and abs(constraint.r_form.coeff(var)) > self.tolerance]
+            if candidates:
+                self.set_in_base(candidates[0], idx)
+                self.apply_subs()
+            else:
+                # la ligne est une combinaison des autres contraintes
+                self._drop_row(idx)
+                self.dropped_rows += (idx,)
+
+        self._drop_artificials()
+        self._set_utility(self.phase_two_utility)
+        self.objective_name = "z"
+        self.pricing.reset()
+        self.update_solution()
+        self.comments = comment
+        return True
+
+    def _drop_row(self, idx):
+        self.base.remove(self.constraints[idx].get_base_variable())
+        del self.constraints[idx]
+
+    def _drop_artificials(self):
+        zero = {var: LinearForm() for var in self.artificials}
+        for constraint in self.constraints:
+            constraint.r_form = constraint.r_form.substitute(zero)
+        for var in self.artificials:
+            # self.variables est partagée avec les contraintes : on la modifie sur place
+            self.variables.remove(var)
+            if var in self.out:
+                self.out.remove(var)
 
     def view_solution(self):
-        return " ; ".join([f"${var} = {self.current_solution[var]}$" for var in self.variables]) + "\n"
+        return " ; ".join([self._view_value(var) for var in self.variables]) + "\n"
+
+    def _view_value(self, var):
+        if var not in self.complemented:
+            return f"${var} = {self.current_solution[var]}$"
+        # variable complémentée : on rappelle aussi la valeur de la variable d'origine
+        variable = self.complemented[var]
+        return f"${latex_variable(var)} = {self.current_solution[var]}$ (${latex_variable(variable)} = {self.current_solution[variable]}$)"
 
     def get_incoming_variable(self):
         """
-        check utility function to find best candidate
+        variable entrante choisie par la règle de pricing, None si la solution est optimale
+        """
+        return self.pricing.select(self)
+
+    # accès au tableau courant pour les règles de pricing
+    # une ligne s'écrit x_B + somme alpha_j x_j = b, les coefficients sont rangés comme self.variables
+
+    def _reduced_costs(self, variables):
+        return [self.utility.coeff(var) for var in variables]
+
+    def _base_variable(self, idx):
+        return self.constraints[idx].get_base_variable()
+
+    def _tableau_row(self, idx):
+        constraint = self.constraints[idx]
+        base_variable = constraint.get_base_variable()
+        return [1 if var == base_variable else -constraint.r_form.coeff(var) for var in self.variables], constraint.r_form.constant
+
+    def _tableau_column(self, variable):
+        return [1 if constraint.get_base_variable() == variable else -constraint.r_form.coeff(variable) for constraint in self.constraints]
+
+    def _tableau_row_combination(self, vector):
+        """
+        somme des lignes du tableau pondérées par vector
+        """
+        combination = dict.fromkeys(self.variables, 0)
+        for value, constraint in zip(vector, self.constraints):
+            if value == 0:
+                continue
+            combination[constraint.get_base_variable()] += value
+            for var, coeff in constraint.r_form.terms.items():
+                combination[var] -= value * coeff
+        return [combination[var] for var in self.variables]
+
+    # simplexe à variables bornées : une variable de borne u ne prend jamais que les valeurs de
+    # [0, u]. Quand elle doit atteindre u, elle est remplacée par x barre = u - x (qui vaut alors 0) :
+    # le dictionnaire garde ses variables hors base à 0 et le reste de l'algorithme ne change pas
+
+    def bound(self, variable):
+        """
+        borne supérieure d'une variable (nom courant), inf si elle n'en a pas
         """
-        best_value = 0
-        best_var = None
-        for var in self.out:
-            value = Constraint._get_coeff(self.utility, var)
-            if value > best_value:
-                best_var = var
-                best_value = value
+        return self.upper.get(self.complemented.get(variable, variable), inf)
 
-        return best_var
+    def complement(self, variable, comment="\nLa variable atteint sa borne supérieure : on la remplace par son complément à cette borne."):
+        """
+        remplace la variable x de borne u par x barre = u - x (ou x barre par x), à la même place
+        dans la base ou hors base : une variable hors base passe de 0 à sa borne sans pivot
+        """
+        bound = self.bound(variable)
+        if variable in self.complemented:
+            new_name = self.complemented.pop(variable)
+        else:
+            new_name = modified_name(variable, "bar", self.variables)
+            self.complemented[new_name] = variable
+        self._complement(variable, new_name, bound)
+        # les listes sont modifiées sur place : self.variables est partagée avec les contraintes
+        for names in (self.variables, self.base, self.out):
+            if variable in names:
+                names[names.index(variable)] = new_name
+        self.pricing.rename(variable, new_name)
+        self.update_solution()
+        self.comments = comment
+        return new_name
+
+    def _complement(self, variable, new_name, bound):
+        """
+        substitution variable = bound - new_name dans le dictionnaire courant
+        """
+        substitution = {variable: LinearForm(bound, {new_name: -1})}
+        for constraint in self.constraints:
+            if constraint.get_base_variable() == variable:
+                constraint.l_form, constraint.r_form = LinearForm.variable(new_name), LinearForm(bound) - constraint.r_form
+            else:
+                constraint.r_form = constraint.r_form.substitute(substitution)
+        self.utility = self.utility.substitute(substitution)
+        self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
+        self.utility_constraint.set_variables(self.variables)
+        if self.phase_two_utility is not None:
+            self.phase_two_utility = self.phase_two_utility.substitute(substitution)
+
+    def _bounded_row(self, variable, column, rhs, ratios, best_index, var_constraints, std_var_constraints):
+        """
+        test du rapport du simplexe à variables bornées, à partir du test usuel (ratios, best_index)
+        une variable de base de coefficient négatif croît avec la variable entrante et ne doit pas
+        dépasser sa borne ; la variable entrante ne doit pas dépasser la sienne
+        renvoie la ligne pivot, -1 si le problème n'est pas borné, None si la variable entrante
+        atteint sa borne avant toute variable de base (complement, sans changement de base) ;
+        leaving_bound indique si la variable sortante quitte la base à sa borne supérieure
+        """
+        self.leaving_bound = False
+        if self.upper:
+            best_value = ratios[best_index] if best_index >= 0 else inf
+            for idx, coeff in enumerate(column):
+                bound = self.bound(self._base_variable(idx))
+                if coeff < -self.tolerance and bound < inf:
+                    ratio = (bound - rhs[idx]) / -coeff
+                    ratios[idx] = ratio
+                    var_constraints[idx] = Constraint(LinearForm(to_number(rhs[idx]), {variable: -to_number(coeff)}), "LEQ", to_number(bound))
+                    std_var_constraints[idx] = Constraint(LinearForm.variable(variable), "LEQ", to_number(ratio))
+                    if ratio < best_value:
+                        best_value, best_index = ratio, idx
+            bound = self.bound(variable)
+            if bound < inf:
+                var_constraints.append(Constraint(LinearForm.variable(variable), "LEQ", to_number(bound)))
+                std_var_constraints.append(var_constraints[-1])
+                if bound <= best_value:
+                    return None
+        best_index = self._bland_row(ratios, best_index)
+        self.leaving_bound = best_index >= 0 and column[best_index] < 0
+        return best_index
+
+    def _bland_row(self, ratios, best_index):
+        """
+        anti-cyclage : parmi les lignes de rapport minimal, celle dont la variable de base a le plus petit indice
+        """
+        if best_index < 0 or not self.pricing.anti_cycling:
+            return best_index
+        rows = [idx for idx, ratio in enumerate(ratios) if ratio <= ratios[best_index] + self.tolerance]
+        return min(rows, key=lambda idx: self.variables.index(self._base_variable(idx)))
 
     def get_pivot_line(self, variable):
         var_constraints = list()
         std_var_constraints = list()
+        ratios = list()
         best_value = inf
         best_index = -1
         for idx, constraint in enumerate(self.constraints):
@@ -218,31 +603,37 @@ class LinProg:
             coeff = var_constraint.get_coeff(variable)[0]
 
             if coeff > 0:
-                var_constraint.l_part /= coeff
-                var_constraint.r_part /= coeff
+                var_constraint.l_form /= coeff
+                var_constraint.r_form /= coeff
+                ratios.append(var_constraint.r_form.constant)
 
-                if var_constraint.r_part < best_value:
-                    best_value = var_constraint.r_part
+                if var_constraint.r_form.constant < best_value:
+                    best_value = var_constraint.r_form.constant
                     best_index = idx
             else:
-                var_constraint = Constraint(variable, "GEQ", 0)
+                var_constraint = Constraint(LinearForm.variable(variable), "GEQ", 0)
+                ratios.append(inf)
             std_var_constraints.append(var_constraint)
 
-
-
-        return var_constraints, std_var_constraints, best_index
+        column = [-constraint.r_form.coeff(variable) for constraint in self.constraints]
+        rhs = [constraint.r_form.constant for constraint in self.constraints]
+        return var_constraints, std_var_constraints, self._bounded_row(variable, column, rhs, ratios, best_index, var_constraints, std_var_constraints)
 
     def set_in_base(self, variable, idx, comment="\nOn fait entrer la variable ${variable}$ dans la base."):
-        out_var = self.constraints[idx].l_part
+        if self.leaving_bound:
+            self.leaving_bound = False
+            self.complement(self._base_variable(idx))
+        self.pricing.update(self, variable, idx)
+        out_var = self.constraints[idx].get_base_variable()
         self.constraints[idx].in_base(variable)
         for idx_constraint, constraint in enumerate(self.constraints):
             if idx_constraint == idx:
                 continue
-            constraint.substitutions[variable] = self.constraints[idx].r_part
-        self.utility_constraint = Constraint("z", "EQ", self.utility)
+            constraint.subs(variable, self.constraints[idx].r_form)
+        self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
         self.utility_constraint.set_variables(self.variables)
-        self.utility_constraint.substitutions[variable] = self.constraints[idx].r_part
-        self.utility = self.utility_constraint.r_part
+        self.utility_constraint.subs(variable, self.constraints[idx].r_form)
+        self.utility = self.utility_constraint.r_form
         self.comments = comment.format(variable=variable, idx=idx)
         self.out.remove(variable)
         self.out.append(out_var)
@@ -256,6 +647,411 @@ class LinProg:
             constraint.apply_subs()
         self.utility_constraint.apply_subs()
 
-        self.utility = self.utility_constraint.r_part
+        self.utility = self.utility_constraint.r_form
         self.update_solution()
         self.comments = comment
+
+    # résolution à partir de la base optimale précédente (analyse de scénarios)
+
+    def _utility_data(self, utility):
+        """
+        fonction utilité (LinearForm sur self.variables) dans la représentation de _set_utility
+        """
+        return utility
+
+    def _canonical_utility(self, utility):
+        utility = LinearForm.convert(utility)
+        return -utility if self.initial_optimizer == "min" else utility
+
+    def _standard_form_rows(self):
+        """
+        lignes de la forme standard, avant le choix de la base, dans l'ordre des lignes courantes :
+        (coefficients, signe, variable d'écart) où signe vaut -1 si la ligne a été multipliée par -1
+        pour la phase 1. Calculées une fois à partir du problème d'origine.
+        """
+        if self._standard_rows is None:
+            reference = LinProg()
+            reference.from_dict(self.problem)
+            reference.canonical_form()
+            reference.pre_standard_form()
+            rows = []
+            for idx, constraint in enumerate(reference.constraints):
+                if idx in self.dropped_rows:
+                    continue
+                # même règle que add_artificials : second membre négatif après canonical_form ; le
+                # simplexe dual part des lignes telles quelles
+                sign = -1 if not self.dual_simplex and constraint.get_scalar()[1] < -self.tolerance else 1
+                rows.append((constraint.l_form * sign, sign, constraint.deviation_variable))
+            self._standard_rows = rows
+        return self._standard_rows
+
+    def _basis_solve(self, delta):
+        """
+        B^-1 delta : variation des seconds membres du tableau courant pour une variation delta des
+        seconds membres de la forme standard. Les colonnes des variables d'écart du tableau sont
+        celles de B^-1 ; pour les autres lignes (égalités), le système B y = delta est résolu.
+        """
+        rows = self._standard_form_rows()
+        result = [0] * len(rows)
+        rest = []
+        for k, (value, (_, sign, deviation)) in enumerate(zip(delta, rows)):
+            if value == 0:
+                continue
+            if deviation is None:
+                rest.append(k)
+                continue
+            for idx, coeff in enumerate(self._tableau_column(deviation)):
+                result[idx] += sign * value * to_number(coeff)
+
+        if rest:
+            heading = [self._base_variable(idx) for idx in range(len(rows))]
+            # colonne d'une variable complémentée x barre = u - x : celle de x, opposée
+            matrix = [[-form.coeff(self.complemented[var]) if var in self.complemented else form.coeff(var) for var in heading] for form, _, _ in rows]
+            vector = [delta[k] if k in rest else 0 for k in range(len(rows))]
+            result = [a + b for a, b in zip(result, _solve_linear(matrix, vector))]
+        return result
+
+    def _rhs_factors(self):
+        """
+        {indice de la contrainte d'origine: (ligne courante, facteur)} : une variation v du second
+        membre de la contrainte est une variation facteur * v de celui de la ligne de la forme
+        standard (facteur -1 pour les >= et pour les lignes multipliées par -1 en phase 1)
+        """
+        rows = [k for k in range(len(self.problem["constraints"])) if k not in self.dropped_rows]
+        return {
+            k: (position, sign * (-1 if self.problem["constraints"][k][1] == "GEQ" else 1))
+            for position, (k, (_, sign, _)) in enumerate(zip(rows, self._standard_form_rows()))
+            }
+
+    def _shift_rhs(self, shift, utility_shift):
+        """
+        ajoute shift aux seconds membres du tableau courant et utility_shift à la valeur de z
+        """
+        for constraint, value in zip(self.constraints, shift):
+            constraint.r_form = constraint.r_form + value
+        self.utility = self.utility + utility_shift
+        self.utility_constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
+        self.utility_constraint.set_variables(self.variables)
+
+    def _change_rhs(self, delta, utility):
+        """
+        variation delta des seconds membres de la forme standard, la base restant la même
+        utility : fonction utilité courante (forme canonique), pour la nouvelle valeur de z
+        """
+        shift = self._basis_solve(delta)
+        utility_shift = sum((utility.coeff(self._base_variable(idx)) * value for idx, value in enumerate(shift)), 0)
+        self._shift_rhs(shift, utility_shift)
+
+    # simplexe dual : la base est dual réalisable (coûts réduits négatifs ou nuls) mais des
+    # variables de base sont négatives
+
+    def complement_over_bounds(self, comment="\nLa variable de base dépasse sa borne supérieure : on la remplace par son complément à cette borne, qui est négatif."):
+        """
+        variables bornées : une variable de base au-dessus de sa borne est complémentée, elle
+        devient négative et sort ensuite de la base à sa borne
+        renvoie les couples (variable, complément)
+        """
+        complemented = []
+        if self.upper:
+            for idx in range(len(self.base)):
+                variable = self._base_variable(idx)
+                if self.current_solution[variable] > self.bound(variable) + self.tolerance:
+                    complemented.append((variable, self.complement(variable, comment=comment)))
+        return complemented
+
+    def get_leaving_row(self):
+        """
+        ligne de la variable de base la plus négative, None si la solution de base est réalisable
+        """
+        value, row = min(((self.current_solution[self._base_variable(idx)], idx) for idx in range(len(self.base))), default=(0, -1))
+        if row < 0 or value >= -self.tolerance:
+            return None
+        return row
+
+    def get_dual_entering(self, row):
+        """
+        test du rapport dual sur la ligne row : parmi les variables hors base de coefficient
+        alpha < 0 dans la ligne, celle de plus petit rapport coût réduit / alpha (puis de plus
+        petit indice) garde les coûts réduits négatifs ou nuls
+        renvoie la variable entrante (None si aucune : pas de solution réalisable) et les rapports
+        """
+        index = {var: j for j, var in enumerate(self.variables)}
+        coefficients, _ = self._tableau_row(row)
+        ratios = {}
+        best = None
+        for var, cost in zip(self.out, self._reduced_costs(self.out)):
+            alpha = coefficients[index[var]]
+            if alpha < -self.tolerance:
+                ratios[var] = to_number(cost / alpha)
+                key = (ratios[var], index[var])
+                if best is None or key < best[0]:
+                    best = (key, var)
+        return (None if best is None else best[1]), ratios
+
+    def dual_iterations(self):
+        """
+        la variable de base la plus négative sort de la base, la variable entrante est choisie par
+        le test du rapport dual (get_dual_entering)
+        renvoie le nombre de pivots et False si le problème n'a pas de solution réalisable
+        """
+        nb_iter = 0
+        while True:
+            self.complement_over_bounds()
+            row = self.get_leaving_row()
+            if row is None:
+                return nb_iter, True
+            in_var, _ = self.get_dual_entering(row)
+            if in_var is None:
+                return nb_iter, False
+
+            self.set_in_base(in_var, row)
+            self.apply_subs()
+            nb_iter += 1
+
+    # séparation et évaluation : contrainte ajoutée à un problème déjà résolu
+
+    def add_row(self, form, comp, value):
+        """
+        ajoute la contrainte form comp value (comp LEQ ou GEQ, form sur les variables de décision)
+        au problème résolu, avec une nouvelle variable d'écart en base : la base reste dual
+        réalisable et dual_iterations rétablit une solution réalisable si l'écart est négatif
+        renvoie le nom de la variable d'écart
+        """
+        form = LinearForm.convert(form)
+        value = to_number(value)
+        if comp == "GEQ":
+            form, value = -form, -value
+        # variables complémentées : x = u - x barre
+        form = form.substitute({variable: LinearForm(self.upper[variable], {new_name: -1}) for new_name, variable in self.complemented.items()})
+        slack = self.get_new_var()
+        self._append_row([form.coeff(var) for var in self.variables], value - form.constant, slack)
+        self.variables.append(slack)
+        self.base.append(slack)
+        self.update_solution()
+        return slack
+
+    def _reduced_row(self, coefficients, value):
+        """
+        ligne sum coefficients x = value exprimée en fonction des variables hors base
+        """
+        index = {var: j for j, var in enumerate(self.variables)}
+        for idx in range(len(self.base)):
+            factor = coefficients[index[self._base_variable(idx)]]
+            if factor != 0:
+                row, rhs = self._tableau_row(idx)
+                coefficients = [coeff - factor * to_number(alpha) for coeff, alpha in zip(coefficients, row)]
+                value -= factor * to_number(rhs)
+        return coefficients, value
+
+    def _append_row(self, coefficients, value, slack):
+        coefficients, value = self._reduced_row(coefficients, value)
+        constraint = Constraint(LinearForm.variable(slack), "EQ", LinearForm(value, {
+            var : -coeff for var, coeff in zip(self.variables, coefficients) if coeff != 0
+            }))
+        constraint.set_variables(self.variables)
+        constraint.deviation_variable = slack
+        self.constraints.append(constraint)
+
+    def resolve(self, new_rhs=None, new_utility=None):
+        """
+        résout à nouveau le problème après modification des seconds membres ou de la fonction
+        utilité, à partir de la base optimale courante plutôt que depuis canonical_form
+
+        new_rhs : nouveaux seconds membres, liste (None : inchangé) ou dictionnaire {indice: valeur},
+        la contrainte d'indice k s'écrivant (partie linéaire) comp (second membre)
+        new_utility : nouvelle fonction utilité (chaîne, LinearForm...), même sens d'optimisation
+
+        un changement de b peut rendre la base non réalisable : simplexe dual. Un changement de c
+        la rend non optimale : simplexe primal. Si les deux, le simplexe dual est mené avec une
+        fonction utilité nulle avant de rétablir c.
+        renvoie le résumé de solver.solve
+        """
+        from solver import iterate, solution_summary
+
+        if self.base is None or self.objective_name != "z":
+            raise ValueError("resolve needs a problem solved up to the end of phase one")
+        if self.upper:
+            raise NotImplementedError("resolve is not supported with bounded variables")
+
+        problem = dict(self.problem)
+        utility = self._canonical_utility(problem["utility"])
+
+        if new_rhs is not None:
+            changes = new_rhs if isinstance(new_rhs, dict) else dict(enumerate(new_rhs))
+            constraints = list(problem["constraints"])
+            factors = self._rhs_factors()
+            delta = [0] * len(factors)
+            for k, value in changes.items():
+                if value is None:
+                    continue
+                l_part, comp, r_part = constraints[k]
+                form = LinearForm.convert(l_part) - LinearForm.convert(r_part)
+                value = to_number(value)
+                constraints[k] = (form.linear_part(), comp, LinearForm(value))
+                if k in factors:
+                    position, factor = factors[k]
+                    delta[position] = factor * (value + form.constant)
+            problem["constraints"] = constraints
+            self._change_rhs(delta, utility)
+
+        if new_utility is not None:
+            problem["utility"] = LinearForm.convert(new_utility)
+            utility = self._canonical_utility(problem["utility"])
+            self._set_utility(self._utility_data(utility))
+
+        self.problem = problem
+        self.pricing.reset()
+        self.pricing.reset_stats()
+        self.update_solution()
+
+        nb_iter = 0
+        if any(self.current_solution[var] < -self.tolerance for var in self.base):
+            dual_feasible = all(cost <= self.tolerance for cost in self._reduced_costs(self.out))
+            if not dual_feasible:
+                self._set_utility(self._utility_data(LinearForm()))
+            nb_iter, feasible = self.dual_iterations()
+            if not dual_feasible:
+                self._set_utility(self._utility_data(utility))
+            if not feasible:
+                return solution_summary(self, nb_iter, status="infeasible")
+
+        primal_iter, bounded = iterate(self)
+        return solution_summary(self, nb_iter + primal_iter, status="optimal" if bounded else "unbounded")
+
+    def sensitivity(self):
+        """
+        analyse de sensibilité de la solution optimale, calculée à partir de la base finale sans
+        nouvelle résolution. Les valeurs sont exprimées pour la fonction objectif d'origine (min ou max).
+
+        constraints : pour chaque contrainte, son écart, son prix fictif (variation de l'objectif
+        pour une augmentation d'une unité du second membre), l'intervalle du second membre dans
+        lequel la base reste optimale et la variation des variables de décision pour une unité de
+        second membre dans cet intervalle
+        variables : pour chaque variable de décision, sa valeur, son coût réduit, l'intervalle de
+        son coefficient dans la fonction utilité dans lequel la solution reste optimale et, hors
+        base, la variation des variables de base quand elle augmente d'une unité
+        les bornes absentes valent -inf ou inf. Une variable à sa borne supérieure a un coût réduit
+        positif ou nul, et une variable de base doit rester sous sa borne supérieure dans les
+        intervalles des seconds membres
+        """
+        if self.base is None or self.objective_name != "z":
+            raise ValueError("sensitivity needs a problem solved up to the end of phase one")
+
+        utility = self._canonical_utility(self.problem["utility"])
+        orientation = -1 if self.initial_optimizer == "min" else 1
+        heading = [self._base_variable(idx) for idx in range(len(self.base))]
+        values = [to_number(self.current_solution[var]) for var in heading]
+        # variable complémentée x barre = u - x : ses variations et son coût sont ceux de x, opposés
+        names = [self.complemented.get(var, var) for var in heading]
+        flips = [-1 if var in self.complemented else 1 for var in heading]
+        base_costs = [flip * to_number(utility.coeff(name)) for name, flip in zip(names, flips)]
+        factors = self._rhs_factors()
+        decision = set(self.decision_variables)
+
+        constraints, forms = [], []
+        for k, (l_part, comp, r_part) in enumerate(self.problem["constraints"]):
+            form = LinearForm.convert(l_part) - LinearForm.convert(r_part)
+            forms.append(form)
+            rhs = -form.constant
+            activity = sum((coeff * to_number(self.current_solution[var]) for var, coeff in form.terms.items()), 0)
+            slack = {"LEQ" : rhs - activity, "GEQ" : activity - rhs}.get(comp, 0)
+            if abs(slack) <= self.tolerance:
+                slack = 0
+
+            shadow_price, lower, upper = 0, 0, 0
+            rates = {}
+            if k in factors:
+                # colonne de B^-1 : variation des variables de base pour une unité de second membre
+                position, factor = factors[k]
+                delta = [0] * len(factors)
+                delta[position] = factor
+                column = self._basis_solve(delta)
+                shadow_price = orientation * sum((cost * value for cost, value in zip(base_costs, column)), 0)
+                rates = {name : flip * to_number(value) for name, flip, value in zip(names, flips, column) if name in decision and value}
+                # les variables de base restent entre 0 et leur borne
+                lower, upper = -inf, inf
+                for var, value, variation in zip(heading, values, column):
+                    bound = self.bound(var)
+                    if variation > self.tolerance:
+                        lower = max(lower, -value / variation)
+                        upper = min(upper, (bound - value) / variation)
+                    elif variation < -self.tolerance:
+                        upper = min(upper, -value / variation)
+                        lower = max(lower, (bound - value) / variation)
+
+            constraints.append({
+                "index" : k,
+                "slack" : slack,
+                "shadow_price" : shadow_price,
+                "rhs" : rhs,
+                "rhs_range" : (rhs + lower, rhs + upper),
+                "variation" : rates,
+                })
+
+        index = {var: j for j, var in enumerate(self.variables)}
+        out_costs = [to_number(cost) for cost in self._reduced_costs(self.out)]
+        reduced_costs = dict(zip(self.out, out_costs))
+
+        current = {variable : new_name for new_name, variable in self.complemented.items()}
+        variables = []
+        for var in self.decision_variables:
+            name = current.get(var, var)
+            flip = -1 if var in current else 1
+            if name in reduced_costs:
+                # hors base : optimale tant que son coût réduit reste négatif ou nul, positif ou
+                # nul à sa borne supérieure
+                reduced_cost = flip * reduced_costs[name]
+                lower, upper = (-inf, -reduced_cost) if flip > 0 else (-reduced_cost, inf)
+                column = self._tableau_column(name)
+                rates = {base_name : -flip * base_flip * to_number(alpha) for base_name, base_flip, alpha in zip(names, flips, column) if base_name in decision and alpha}
+            else:
+                # en base : les coûts réduits des variables hors base varient de -t alpha
+                rates = {}
+                coefficients, _ = self._tableau_row(heading.index(name))
+                lower, upper = -inf, inf
+                for out_var, cost in zip(self.out, out_costs):
+                    alpha = flip * to_number(coefficients[index[out_var]])
+                    if alpha > self.tolerance:
+                        lower = max(lower, cost / alpha)
+                    elif alpha < -self.tolerance:
+                        upper = min(upper, cost / alpha)
+            if orientation < 0:
+                lower, upper = -upper, -lower
+
+            cost = orientation * to_number(utility.coeff(var))
+            # coût réduit sur les contraintes du problème : une borne inférieure non nulle (ligne
+            # x >= l ajoutée par split_bounds) y contribue comme une borne supérieure
+            reduced_cost = cost - sum((row["shadow_price"] * to_number(form.coeff(var)) for row, form in zip(constraints, forms)), 0)
+            if abs(reduced_cost) <= self.tolerance:
+                reduced_cost = 0
+            variables.append({
+                "name" : var,
+                "value" : to_number(self.current_solution[var]),
+                "reduced_cost" : reduced_cost,
+                "cost" : cost,
+                "cost_range" : (cost + lower, cost + upper),
+                "variation" : rates,
+                })
+
+        return {
+            "objective" : to_number(self.get_objective_value()),
+            "constraints" : constraints,
+            "variables" : variables,
+            }
+
+
+def _solve_linear(matrix, vector):
+    """
+    solution de matrix.y = vector par élimination de Gauss (pivot de plus grande valeur absolue)
+    """
+    size = len(vector)
+    rows = [[to_number(value) for value in row] + [to_number(value)] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda idx: abs(rows[idx][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        pivot_value = rows[column][column]
+        for idx in range(size):
+            factor = rows[idx][column] / pivot_value if idx != column else 0
+            if factor != 0:
+                rows[idx] = [a - factor * b for a, b in zip(rows[idx], rows[column])]
+    return [rows[idx][size] / rows[idx][idx] for idx in range(size)]
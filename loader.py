@@ -0,0 +1,183 @@
+"""
+lecture des programmes linéaires (json ou format texte)
+ce module n'importe pas pylatex : il est utilisable sans chaîne de compilation latex
+les expressions sont lues directement en formes linéaires, sans passer par sympy
+"""
+
+from fractions import Fraction
+from functools import partial
+from importlib import import_module
+import json
+
+from linear_form import parse_expression, parse_constraint
+from linear_program import LinProg
+
+# module, classe et options de chaque moteur : le module n'est importé que pour le moteur choisi
+# (numpy n'est pas chargé avec le moteur sympy)
+ENGINES = {
+    "sympy" : ("linear_program", "LinProg", {}),
+    "fraction" : ("tableau", "TableauLinProg", {"arithmetic" : "fraction"}),
+    "float" : ("tableau", "TableauLinProg", {"arithmetic" : "float"}),
+    "integer" : ("fraction_free", "FractionFreeLinProg", {}),
+    "revised" : ("revised", "RevisedLinProg", {"arithmetic" : "fraction"}),
+    "revised-float" : ("revised", "RevisedLinProg", {"arithmetic" : "float"}),
+    }
+
+
+def get_engine(name, **options):
+    """
+    fabrique de programmes linéaires pour le moteur name
+    """
+    module, class_name, engine_options = ENGINES[name]
+    return partial(getattr(import_module(module), class_name), **engine_options, **options)
+
+
+def parse_checked_constraint(text, declared):
+    """
+    lit une contrainte et vérifie que toutes ses variables sont déclarées
+    """
+    l_form, comp, r_form = parse_constraint(text)
+    if not (l_form.terms.keys() | r_form.terms.keys()) <= declared:
+        raise SyntaxError(f"undeclared variable found while parsing constraint {text}")
+    return l_form, comp, r_form
+
+
+def _bound_number(value):
+    # les bornes non entières peuvent être écrites "1/3"
+    return Fraction(value) if isinstance(value, str) else value
+
+
+def parse_bounds(bounds, declared):
+    """
+    bornes des variables : {"x" : 10} (0 <= x <= 10) ou {"x" : [2, 10]}, null pour une borne absente
+    """
+    parsed = {}
+    for var, bound in bounds.items():
+        if var not in declared:
+            raise SyntaxError(f"undeclared variable {var} found in bounds")
+        lower, upper = bound if isinstance(bound, list) else (0, bound)
+        parsed[var] = (_bound_number(lower), None if upper is None else _bound_number(upper))
+    return parsed
+
+
+def lin_prog_from_json(pl, engine=LinProg):
+    """
+    construit un programme linéaire à partir d'un problème au format json (dictionnaire)
+    """
+    variables = list(pl["variables"])
+    declared = set(variables)
+    constraints = [parse_checked_constraint(c, declared) for c in pl["constraints"]]
+
+    problem = {
+        "title" : pl.get("title", ""),
+        "description": pl.get("description", ""),
+        "variables" : variables,
+        "utility" : parse_expression(pl["utility"]),
+        "optimizer" : pl["optimizer"],
+        "constraints" : constraints,
+        }
+    if pl.get("bounds"):
+        problem["bounds"] = parse_bounds(pl["bounds"], declared)
+    if pl.get("integer"):
+        undeclared = [var for var in pl["integer"] if var not in declared]
+        if undeclared:
+            raise SyntaxError(f"undeclared variable {undeclared[0]} found in integer")
+        problem["integer"] = list(pl["integer"])
+
+    new_prog = engine()
+    new_prog.from_dict(problem)
+    return new_prog
+
+
+def iter_json_items(f, chunk_size=1 << 16):
+    """
+    itère sur les objets d'un fichier json sans le charger en entier :
+    une liste [{...}, {...}] ou une suite d'objets (json lines)
+    la mémoire utilisée ne dépend que de la taille d'un objet
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    in_array = None
+
+    while True:
+        # blancs, et virgules entre les éléments d'une liste
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+
+        if pos >= len(buffer) or (in_array and buffer[pos] == "]"):
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        yield item
+
+
+def iter_from_json(filename, engine=LinProg):
+    """
+    générateur de programmes linéaires, un par problème du fichier (liste json ou json lines)
+    """
+    with open(filename, 'r') as f:
+        for pl in iter_json_items(f):
+            yield lin_prog_from_json(pl, engine=engine)
+
+
+def load_from_json(filename, engine=LinProg):
+    """
+    load lienar programs from json fils. Simple is json.pl
+    engine construit le programme vide à remplir (LinProg, TableauLinProg...)
+    """
+    return list(iter_from_json(filename, engine=engine))
+
+
+def parse_linear_program(multiline_string):
+
+    variables = []
+    utility = None
+    optimizer = None
+    constraints = []
+    state = 'init'
+    for idx, line in enumerate(multiline_string.split('\n')):
+
+        if line.strip() == '':
+            continue
+        elif state == 'init':
+
+            if "var:" in line:
+                for variable in line.split("var:")[1].split(","):
+                    variables.append(variable.strip())
+            elif "max" in line:
+                utility = parse_expression(line.split("=")[1])
+                optimizer = "max"
+            elif "min" in line:
+                utility = parse_expression(line.split("=")[1])
+                optimizer = "min"
+            elif "sc" in line:
+                state = 'constraints'
+        else:
+            constraints.append(parse_checked_constraint(line, set(variables)))
+
+    return {
+        "variables" : variables,
+        "utility" : utility,
+        "optimizer" : optimizer,
+        "constraints" : constraints,
+        }
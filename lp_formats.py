@@ -0,0 +1,553 @@
+"""
+lecture et écriture des formats MPS (libre) et CPLEX LP
+
+les fichiers sont lus ligne par ligne et les coefficients rangés directement dans des
+formes linéaires creuses (une par contrainte), sans passer par des chaînes sympy.
+les bornes simples sont passées au programme (bornes supérieures du simplexe à variables
+bornées, voir linear_program.split_bounds), les variables libres ne sont pas gérées. les
+variables entières (marqueurs INTORG/INTEND et bornes BV, UI, LI en MPS ; sections General et
+Binary en LP) sont gardées dans la liste "integer" du problème.
+les nombres sont écrits exactement : une contrainte dont un coefficient n'a pas d'écriture
+décimale finie (1/3) est multipliée par le ppcm de ses dénominateurs, un tel nombre dans
+l'objectif ou dans une borne lève ValueError.
+"""
+
+from fractions import Fraction
+from functools import reduce
+from math import gcd, inf
+import re
+
+from linear_form import LinearForm
+from linear_program import LinProg
+
+MPS_SECTIONS = {"NAME", "OBJSENSE", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "ENDATA"}
+
+MPS_ROW_TYPES = {
+    "L" : "LEQ",
+    "G" : "GEQ",
+    "E" : "EQ",
+    }
+
+COMP_SYMBOLS = {
+    "LEQ" : "<=",
+    "GEQ" : ">=",
+    "EQ" : "=",
+    }
+
+
+def _open(file, mode):
+    """
+    accepte un nom de fichier ou un fichier déjà ouvert
+    """
+    if isinstance(file, str):
+        return open(file, mode)
+    return _Unclosed(file)
+
+
+class _Unclosed:
+    """
+    context manager qui ne ferme pas le fichier fourni par l'appelant
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        return self.f
+
+    def __exit__(self, *args):
+        return False
+
+
+def _number(text):
+    return Fraction(text)
+
+
+def _build(engine, title, variables, optimizer, utility, constraints, bounds, integer=()):
+    problem = {
+        "title" : title,
+        "description" : "",
+        "variables" : variables,
+        "utility" : utility,
+        "optimizer" : optimizer,
+        "constraints" : constraints,
+        }
+    # la borne inférieure 0 est implicite
+    bounds = {variable: bound for variable, bound in bounds.items() if bound != (0, None)}
+    if bounds:
+        problem["bounds"] = bounds
+    if integer:
+        problem["integer"] = [variable for variable in variables if variable in integer]
+
+    lin_prog = engine()
+    lin_prog.from_dict(problem)
+    return lin_prog
+
+
+def _rows(lin_prog):
+    """
+    contraintes du programme sous la forme (forme linéaire, comp, second membre)
+    """
+    for constraint in lin_prog.constraints:
+        form = constraint.l_form - constraint.r_form
+        numbers = [form.constant, *form.terms.values()]
+        if not all(_is_decimal(number) for number in numbers):
+            # la ligne est multipliée par le ppcm de ses dénominateurs : mêmes solutions, et des
+            # coefficients entiers qui s'écrivent exactement
+            form = form * _lcm(*(Fraction(number).denominator for number in numbers))
+        yield form.linear_part(), constraint.comp, -form.constant
+
+
+def _upper_bounds(lin_prog):
+    """
+    bornes supérieures finies des variables du programme
+    """
+    for var in lin_prog.variables:
+        bound = lin_prog.bound(var)
+        if bound < inf:
+            yield str(var), bound
+
+
+def _lcm(*numbers):
+    """
+    plus petit commun multiple (math.lcm n'existe qu'à partir de python 3.9)
+    """
+    return reduce(lambda a, b: a * b // gcd(a, b), numbers, 1)
+
+
+def _decimal_digits(denominator):
+    """
+    nombre de décimales d'une fraction de ce dénominateur, None si son écriture décimale est infinie
+    """
+    twos = fives = 0
+    while denominator % 2 == 0:
+        denominator //= 2
+        twos += 1
+    while denominator % 5 == 0:
+        denominator //= 5
+        fives += 1
+    return max(twos, fives) if denominator == 1 else None
+
+
+def _is_decimal(value):
+    return isinstance(value, float) or _decimal_digits(Fraction(value).denominator) is not None
+
+
+def _format_number(value):
+    """
+    écriture exacte d'un nombre : les flottants des moteurs numériques par repr, les fractions
+    en décimal ; une fraction comme 1/3 n'a pas d'écriture exacte et lève ValueError
+    """
+    if isinstance(value, float) and not value.is_integer():
+        return repr(float(value))
+    value = Fraction(value)
+    if value.denominator == 1:
+        return str(value.numerator)
+    digits = _decimal_digits(value.denominator)
+    if digits is None:
+        raise ValueError(f"{value} has no exact decimal representation")
+    scaled = abs(value.numerator) * 10 ** digits // value.denominator
+    return f"{'-' if value < 0 else ''}{scaled // 10 ** digits}.{scaled % 10 ** digits:0{digits}d}"
+
+
+# MPS
+
+def read_mps(file, engine=LinProg):
+    """
+    lit un programme linéaire au format MPS (libre ou fixe sans espaces dans les noms)
+    """
+    title = ""
+    optimizer = "min"
+    objective = None
+    row_types = {}
+    row_terms = {}
+    rhs = {}
+    ranges = {}
+    bounds = {}
+    variables = []
+    known_variables = set()
+    integer = set()
+    # entre les marqueurs INTORG et INTEND, les colonnes sont des variables entières
+    integer_columns = False
+    section = None
+
+    with _open(file, 'r') as f:
+        for line in f:
+            if not line.strip() or line.startswith("*"):
+                continue
+            fields = line.split()
+
+            if not line[0].isspace() and fields[0].upper() in MPS_SECTIONS:
+                section = fields[0].upper()
+                if section == "NAME":
+                    title = " ".join(fields[1:])
+                elif section == "OBJSENSE" and len(fields) > 1:
+                    optimizer = "max" if fields[1].upper().startswith("MAX") else "min"
+                elif section == "ENDATA":
+                    break
+                continue
+
+            if section == "OBJSENSE":
+                optimizer = "max" if fields[0].upper().startswith("MAX") else "min"
+
+            elif section == "ROWS":
+                row_type, name = fields[0].upper(), fields[1]
+                if row_type == "N":
+                    # seule la première ligne N est l'objectif, les suivantes sont ignorées
+                    if objective is None:
+                        objective = name
+                        row_terms[name] = {}
+                else:
+                    row_types[name] = MPS_ROW_TYPES[row_type]
+                    row_terms[name] = {}
+
+            elif section == "COLUMNS":
+                if len(fields) > 2 and fields[1].strip("'").upper() == "MARKER":
+                    integer_columns = fields[2].strip("'").upper() == "INTORG"
+                    continue
+                variable = fields[0]
+                if variable not in known_variables:
+                    known_variables.add(variable)
+                    variables.append(variable)
+                if integer_columns:
+                    integer.add(variable)
+                for row, value in zip(fields[1::2], fields[2::2]):
+                    if row in row_terms:
+                        row_terms[row][variable] = _number(value)
+
+            elif section in ("RHS", "RANGES"):
+                target = rhs if section == "RHS" else ranges
+                pairs = fields[1:] if len(fields) % 2 else fields
+                for row, value in zip(pairs[0::2], pairs[1::2]):
+                    target[row] = _number(value)
+
+            elif section == "BOUNDS":
+                bound_type, variable = fields[0].upper(), fields[2]
+                value = _number(fields[3]) if len(fields) > 3 else None
+                lower, upper = bounds.get(variable, (Fraction(0), None))
+                if bound_type in ("UP", "UI"):
+                    upper = value
+                elif bound_type in ("LO", "LI"):
+                    lower = value
+                elif bound_type == "FX":
+                    lower = upper = value
+                elif bound_type == "BV":
+                    lower, upper = Fraction(0), Fraction(1)
+                elif bound_type == "PL":
+                    upper = None
+                elif bound_type in ("FR", "MI"):
+                    lower = None
+                bounds[variable] = (lower, upper)
+                if bound_type in ("UI", "LI", "BV"):
+                    integer.add(variable)
+
+    utility = LinearForm(-rhs.get(objective, 0), row_terms.get(objective, {}))
+
+    constraints = []
+    for name, comp in row_types.items():
+        form = LinearForm(0, row_terms[name])
+        value = rhs.get(name, Fraction(0))
+        if name not in ranges:
+            constraints.append((form, comp, LinearForm(value)))
+            continue
+        # une ligne avec RANGES devient deux contraintes
+        spread = abs(ranges[name])
+        if comp == "LEQ" or (comp == "EQ" and ranges[name] < 0):
+            lower, upper = value - spread, value
+        else:
+            lower, upper = value, value + spread
+        constraints.append((form, "GEQ", LinearForm(lower)))
+        constraints.append((form, "LEQ", LinearForm(upper)))
+
+    return _build(engine, title, variables, optimizer, utility, constraints, bounds, integer)
+
+
+def write_mps(lin_prog, file):
+    """
+    écrit le programme dans son état courant au format MPS libre
+    """
+    rows = list(_rows(lin_prog))
+    names = [f"C{idx}" for idx in range(1, len(rows) + 1)]
+    mps_types = {comp: row_type for row_type, comp in MPS_ROW_TYPES.items()}
+
+    columns = {str(var): [] for var in lin_prog.variables}
+    for var, coeff in lin_prog.utility.terms.items():
+        columns.setdefault(var, []).append(("OBJ", coeff))
+    for name, (form, comp, value) in zip(names, rows):
+        for var, coeff in form.terms.items():
+            columns.setdefault(var, []).append((name, coeff))
+
+    with _open(file, 'w') as f:
+        f.write(f"NAME          {lin_prog.title.replace(' ', '_') or 'LINPROG'}\n")
+        f.write(f"OBJSENSE\n    {'MAX' if lin_prog.optimizer == 'max' else 'MIN'}\n")
+        f.write("ROWS\n N  OBJ\n")
+        for name, (form, comp, value) in zip(names, rows):
+            f.write(f" {mps_types[comp]}  {name}\n")
+        f.write("COLUMNS\n")
+        integer_columns = False
+        for var, entries in columns.items():
+            if (var in lin_prog.integer) != integer_columns:
+                integer_columns = not integer_columns
+                f.write(f"    MARKER     'MARKER'   '{'INTORG' if integer_columns else 'INTEND'}'\n")
+            for row, coeff in entries:
+                f.write(f"    {var:<10} {row:<10} {_format_number(coeff)}\n")
+        if integer_columns:
+            f.write("    MARKER     'MARKER'   'INTEND'\n")
+        f.write("RHS\n")
+        if lin_prog.utility.constant != 0:
+            f.write(f"    RHS        OBJ        {_format_number(-lin_prog.utility.constant)}\n")
+        for name, (form, comp, value) in zip(names, rows):
+            if value != 0:
+                f.write(f"    RHS        {name:<10} {_format_number(value)}\n")
+        bounds = list(_upper_bounds(lin_prog))
+        if bounds:
+            f.write("BOUNDS\n")
+            for var, bound in bounds:
+                f.write(f" UP BND       {var:<10} {_format_number(bound)}\n")
+        f.write("ENDATA\n")
+
+
+# CPLEX LP
+
+LP_TOKEN_REGEX = re.compile(r"""\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(?P<comp><=|>=|=<|=>|<|>|=)|(?P<sign>[-+])|(?P<name>[A-Za-z_!"#$%&()/,;?@`'{}|~][\w!"#$%&()/,.;?@`'{}|~\[\]]*))""")
+
+LP_COMPARATORS = {
+    "<=" : "LEQ",
+    "=<" : "LEQ",
+    "<" : "LEQ",
+    ">=" : "GEQ",
+    "=>" : "GEQ",
+    ">" : "GEQ",
+    "=" : "EQ",
+    }
+
+def _lp_keyword(keywords):
+    """
+    en-tête de section : le mot-clé doit être un mot entier, "steel" ou "gen1" sont des variables
+    """
+    return re.compile(rf"^({keywords})(?=\s|:|$)\s*:?\s*(.*)$", re.I)
+
+
+LP_SECTIONS = [
+    ("objective", _lp_keyword(r"maximi[sz]e|maximum|max")),
+    ("objective", _lp_keyword(r"minimi[sz]e|minimum|min")),
+    ("constraints", _lp_keyword(r"subject\s+to|such\s+that|s\.t\.|st\.|st")),
+    ("bounds", _lp_keyword(r"bounds?")),
+    ("integers", _lp_keyword(r"generals?|gen|integers?")),
+    ("binaries", _lp_keyword(r"binar(?:y|ies)|bin")),
+    ("end", re.compile(r"^(end)\s*()$", re.I)),
+    ]
+
+
+def _lp_tokens(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = LP_TOKEN_REGEX.match(text, pos)
+        if match is None or match.end() == pos:
+            raise SyntaxError(f"unexpected character in LP expression {text!r}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+    return tokens
+
+
+def _lp_form(tokens):
+    """
+    somme de termes [signe] [coefficient] [variable]
+    """
+    constant = Fraction(0)
+    terms = {}
+    sign, coeff = 1, None
+    for kind, value in tokens:
+        if kind == "sign":
+            sign = sign * (-1 if value == "-" else 1)
+        elif kind == "number":
+            if coeff is not None:
+                constant += sign * coeff
+                sign = 1
+            coeff = Fraction(value)
+        elif kind == "name":
+            terms[value] = terms.get(value, 0) + sign * (1 if coeff is None else coeff)
+            sign, coeff = 1, None
+        else:
+            raise SyntaxError(f"unexpected {value!r} in LP expression")
+    if coeff is not None:
+        constant += sign * coeff
+    return LinearForm(constant, terms)
+
+
+def _lp_split(statement):
+    """
+    sépare le nom éventuel "c1:" et le reste d'une déclaration
+    """
+    match = re.match(r"^\s*([^:<>=]+?)\s*:(?!=)(.*)$", statement)
+    if match and not re.search(r"[<>=]", match.group(1)):
+        return match.group(1), match.group(2)
+    return None, statement
+
+
+def _lp_statements(lines):
+    """
+    regroupe les lignes d'une section en déclarations : une contrainte peut tenir sur plusieurs lignes
+    elle se termine avec la ligne qui contient son second membre
+    """
+    current = ""
+    for line in lines:
+        current += " " + line
+        parts = re.split(r"<=|>=|=<|=>|<|>|=", _lp_split(current)[1])
+        if len(parts) >= 2 and parts[-1].strip():
+            yield current.strip()
+            current = ""
+    if current.strip():
+        yield current.strip()
+
+
+VARIABLE = object()
+
+
+def _lp_bound_value(tokens):
+    """
+    valeur d'un membre de borne : VARIABLE, un nombre, ou None pour +/- l'infini
+    """
+    names = [value for kind, value in tokens if kind == "name"]
+    if names and names[0].lower() in ("inf", "infinity"):
+        return None
+    if names:
+        return VARIABLE
+    return _lp_form(tokens).constant
+
+
+def read_lp(file, engine=LinProg):
+    """
+    lit un programme linéaire au format CPLEX LP
+    """
+    optimizer = None
+    sections = {"objective": [], "constraints": [], "bounds": [], "integers": [], "binaries": []}
+    section = None
+
+    with _open(file, 'r') as f:
+        for line in f:
+            line = line.split("\\", 1)[0].strip()
+            if not line:
+                continue
+            for name, regex in LP_SECTIONS:
+                match = regex.match(line)
+                if match and (name != "objective" or optimizer is None):
+                    section = name
+                    if name == "objective":
+                        optimizer = "max" if match.group(1).lower().startswith("max") else "min"
+                    line = match.group(2).strip()
+                    break
+            if section == "end":
+                break
+            if line and section is not None:
+                sections[section].append(line)
+
+    variables = []
+    known_variables = set()
+
+    def declare(form):
+        for var in form.terms:
+            if var not in known_variables:
+                known_variables.add(var)
+                variables.append(var)
+        return form
+
+    utility = declare(_lp_form(_lp_tokens(_lp_split(" ".join(sections["objective"]))[1])))
+
+    constraints = []
+    for statement in _lp_statements(sections["constraints"]):
+        tokens = _lp_tokens(_lp_split(statement)[1])
+        comps = [idx for idx, (kind, _) in enumerate(tokens) if kind == "comp"]
+        if len(comps) != 1:
+            raise SyntaxError(f"LP constraint must have exactly one comparator : {statement}")
+        idx = comps[0]
+        constraints.append((declare(_lp_form(tokens[:idx])), LP_COMPARATORS[tokens[idx][1]], declare(_lp_form(tokens[idx + 1:]))))
+
+    bounds = {}
+    for statement in sections["bounds"]:
+        tokens = _lp_tokens(statement)
+        names = [value for kind, value in tokens if kind == "name"]
+        if len(names) == 2 and names[1].lower() == "free":
+            declare(LinearForm.variable(names[0]))
+            bounds[names[0]] = (None, None)
+            continue
+        variable = [name for name in names if name.lower() not in ("inf", "infinity")][0]
+        declare(LinearForm.variable(variable))
+        lower, upper = bounds.get(variable, (Fraction(0), None))
+        # découpe "l <= x <= u", "x <= u", "x >= l", "x = v"
+        chunks, comps = [[]], []
+        for kind, value in tokens:
+            if kind == "comp":
+                comps.append(LP_COMPARATORS[value])
+                chunks.append([])
+            else:
+                chunks[-1].append((kind, value))
+        values = [_lp_bound_value(chunk) for chunk in chunks]
+        for idx, comp in enumerate(comps):
+            left, right = values[idx], values[idx + 1]
+            if left is VARIABLE:
+                # x comp right
+                if comp == "LEQ":
+                    upper = right
+                elif comp == "GEQ":
+                    lower = right
+                else:
+                    lower = upper = right
+            else:
+                # left comp x
+                if comp == "LEQ":
+                    lower = left
+                elif comp == "GEQ":
+                    upper = left
+                else:
+                    lower = upper = left
+        bounds[variable] = (lower, upper)
+
+    integer = set()
+    for section in ("integers", "binaries"):
+        for statement in sections[section]:
+            for kind, value in _lp_tokens(statement):
+                if kind == "name":
+                    declare(LinearForm.variable(value))
+                    integer.add(value)
+                    if section == "binaries":
+                        bounds[value] = (Fraction(0), Fraction(1))
+
+    return _build(engine, "", variables, optimizer or "min", utility, constraints, bounds, integer)
+
+
+def _lp_expression(form):
+    parts = []
+    for var, coeff in form.terms.items():
+        sign = "-" if coeff < 0 else "+"
+        coeff = abs(coeff)
+        parts.append(f"{sign} {var}" if coeff == 1 else f"{sign} {_format_number(coeff)} {var}")
+    if form.constant != 0 or not parts:
+        parts.append(f"{'-' if form.constant < 0 else '+'} {_format_number(abs(form.constant))}")
+    text = " ".join(parts)
+    return text[2:] if text.startswith("+ ") else text
+
+
+def write_lp(lin_prog, file):
+    """
+    écrit le programme dans son état courant au format CPLEX LP
+    """
+    with _open(file, 'w') as f:
+        if lin_prog.title:
+            f.write(f"\\ {lin_prog.title}\n")
+        f.write("Maximize\n" if lin_prog.optimizer == "max" else "Minimize\n")
+        f.write(f" obj: {_lp_expression(lin_prog.utility)}\n")
+        f.write("Subject To\n")
+        for idx, (form, comp, value) in enumerate(_rows(lin_prog), 1):
+            f.write(f" c{idx}: {_lp_expression(form)} {COMP_SYMBOLS[comp]} {_format_number(value)}\n")
+        bounds = list(_upper_bounds(lin_prog))
+        if bounds:
+            f.write("Bounds\n")
+            for var, bound in bounds:
+                f.write(f" {var} <= {_format_number(bound)}\n")
+        if lin_prog.integer:
+            f.write("General\n")
+            f.write(f" {' '.join(lin_prog.integer)}\n")
+        f.write("End\n")
@@ -0,0 +1,588 @@
+"""
+pré-résolution : réduit un programme linéaire (lu, pas encore sous forme canonique) avant le simplexe
+
+    contraintes à une seule variable    deviennent des bornes de la variable
+    contraintes vides ou redondantes    toujours vérifiées compte tenu des bornes : supprimées
+    contraintes en double               (proportionnelles) : seule la plus forte est gardée
+    contraintes forçantes               vérifiées seulement à une borne de chaque variable : ces
+                                        variables sont fixées
+    variables fixées                    bornes égales : remplacées par leur valeur
+    colonnes vides                      variables absentes des contraintes : fixées à la borne
+                                        qui optimise la fonction utilité
+
+les moteurs ne gèrent que les bornes supérieures (simplexe à variables bornées) : une borne
+inférieure l non nulle est un changement de variable x = l + x~ (sans contrainte ni variable
+artificielle), de borne supérieure u - l ; une borne supérieure impliquée par une contrainte gardée
+est supprimée. les bornes d'une variable entière sont arrondies vers l'intérieur (une valeur fixée
+non entière rend le problème irréalisable). postsolve ramène la solution du problème réduit aux variables d'origine,
+postsolve_sensitivity son analyse de sensibilité aux contraintes et aux variables d'origine.
+
+    result = presolve(lin_prog)
+    ...
+    result.postsolve(lin_prog.current_solution)
+    result.postsolve_sensitivity(lin_prog.sensitivity())
+"""
+
+from math import ceil, floor, inf
+
+from linear_form import LinearForm, modified_name, to_number
+from linear_program import variable_bounds
+
+# sens d'une contrainte multipliée par un coefficient négatif
+FLIP = {"LEQ" : "GEQ", "EQ" : "EQ", "GEQ" : "LEQ"}
+
+
+class Infeasible(Exception):
+    """
+    la pré-résolution a montré que le problème n'a pas de solution réalisable
+    """
+
+
+class _Row:
+    """
+    contrainte sum coeff * variable comp rhs, index : indice de la contrainte d'origine
+    """
+
+    __slots__ = ("index", "terms", "comp", "rhs")
+
+    def __init__(self, index, terms, comp, rhs):
+        self.index = index
+        self.terms = terms
+        self.comp = comp
+        self.rhs = rhs
+
+
+def holds(value, comp, rhs):
+    return value <= rhs if comp == "LEQ" else value >= rhs if comp == "GEQ" else value == rhs
+
+
+class Presolve:
+    """
+    pré-résolution d'un problème au format de LinProg.from_dict
+    après run, status vaut "reduced" (reduced : problème réduit, au même format) ou "infeasible"
+    log : étapes de la pré-résolution, (type, données) pour le rendu (voir simplex.presolve_latex)
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.variables = [str(var) for var in problem["variables"]]
+        self.utility = LinearForm.convert(problem["utility"])
+        # coût de chaque variable pour une maximisation
+        self.sign = 1 if problem["optimizer"] == "max" else -1
+        self.lower = dict.fromkeys(self.variables, 0)
+        self.upper = dict.fromkeys(self.variables, inf)
+        for var, (lower, upper) in variable_bounds(problem).items():
+            self.lower[var], self.upper[var] = lower, upper
+        self.integer = {str(var) for var in problem.get("integer", [])}
+        for var in self.integer:
+            self._round(var)
+        self.fixed = {}
+        # variable fixée à une seule de ses bornes ("lower" ou "upper", contrainte forçante ou
+        # colonne vide), None : bornes égales
+        self.fixed_at = {}
+        # contrainte forçante : (à la borne inférieure de ses termes, termes fixés)
+        self.forced = {}
+        # indice d'origine de chaque contrainte du problème réduit
+        self.rows = []
+        # inégalité supprimée par fusion avec l'inégalité opposée : rapport de ses coefficients à
+        # ceux de l'égalité gardée
+        self.ratios = {}
+        # bornes supérieures impliquées par une contrainte gardée : pas de contrainte ajoutée
+        self.implied = set()
+        self.names = {}
+        self.status = None
+        self.reduced = None
+        self.log = []
+
+    def run(self):
+        rows = []
+        for idx, (l_part, comp, r_part) in enumerate(self.problem["constraints"]):
+            form = LinearForm.convert(l_part) - LinearForm.convert(r_part)
+            rows.append(_Row(idx, dict(form.terms), comp, -form.constant))
+
+        try:
+            for var in self.variables:
+                if self.lower[var] > self.upper[var]:
+                    self.log.append(("infeasible_bounds", {"var" : var}))
+                    raise Infeasible(var)
+                if self.lower[var] == self.upper[var]:
+                    self._fix(var, self.lower[var])
+            changed = True
+            while changed:
+                rows, changed = self._reduce_rows(rows)
+                rows, duplicates = self._duplicate_rows(rows)
+                changed = self._empty_columns(rows) or duplicates or changed
+            self._implied_bounds(rows)
+        except Infeasible:
+            self.status = "infeasible"
+            return self
+
+        self.reduced = self._reduced_problem(rows)
+        self.status = "reduced"
+        return self
+
+    def _round(self, var):
+        """
+        bornes d'une variable entière arrondies à l'entier compris entre elles
+        """
+        if -inf < self.lower[var] != ceil(self.lower[var]):
+            self.lower[var] = to_number(ceil(self.lower[var]))
+        if self.upper[var] < inf and self.upper[var] != floor(self.upper[var]):
+            self.upper[var] = to_number(floor(self.upper[var]))
+
+    def _fix(self, var, value, at=None):
+        if var in self.fixed:
+            return
+        if not self.lower[var] <= value <= self.upper[var] or (var in self.integer and value != floor(value)):
+            self.log.append(("infeasible_bounds", {"var" : var}))
+            raise Infeasible(var)
+        if self.lower[var] == self.upper[var]:
+            at = None
+        self.lower[var] = self.upper[var] = value
+        self.fixed[var] = value
+        self.fixed_at[var] = at
+        self.log.append(("fixed", {"var" : var, "value" : value}))
+
+    def _bound(self, var, comp, value):
+        if comp in ("GEQ", "EQ") and value > self.lower[var]:
+            self.lower[var] = value
+        if comp in ("LEQ", "EQ") and value < self.upper[var]:
+            self.upper[var] = value
+        if var in self.integer:
+            self._round(var)
+        if self.lower[var] > self.upper[var]:
+            self.log.append(("infeasible_bounds", {"var" : var}))
+            raise Infeasible(var)
+        if self.lower[var] == self.upper[var]:
+            self._fix(var, self.lower[var])
+
+    def _activity(self, row):
+        """
+        valeurs minimale et maximale de la partie gauche de row compte tenu des bornes
+        """
+        low = high = 0
+        for var, coeff in row.terms.items():
+            if coeff > 0:
+                low += coeff * self.lower[var]
+                high += coeff * self.upper[var]
+            else:
+                low += coeff * self.upper[var]
+                high += coeff * self.lower[var]
+        return low, high
+
+    def _force(self, row, at_lower):
+        """
+        row n'est vérifiée que si chaque terme atteint son minimum (at_lower) ou son maximum
+        """
+        self.log.append(("forcing", {"constraint" : row.index}))
+        self.forced[row.index] = (at_lower, dict(row.terms))
+        for var, coeff in list(row.terms.items()):
+            lower = (coeff > 0) == at_lower
+            self._fix(var, self.lower[var] if lower else self.upper[var], at="lower" if lower else "upper")
+
+    def _reduce_rows(self, rows):
+        """
+        remplace les variables fixées, puis supprime les contraintes vides, à une variable
+        (bornes), redondantes et forçantes
+        """
+        changed = False
+        kept = []
+        for row in rows:
+            for var in [var for var in row.terms if var in self.fixed]:
+                row.rhs -= row.terms.pop(var) * self.fixed[var]
+
+            if not row.terms:
+                if not holds(0, row.comp, row.rhs):
+                    self.log.append(("infeasible", {"constraint" : row.index}))
+                    raise Infeasible(row.index)
+                self.log.append(("redundant", {"constraint" : row.index}))
+                continue
+
+            if len(row.terms) == 1:
+                (var, coeff), = row.terms.items()
+                comp = row.comp if coeff > 0 else FLIP[row.comp]
+                value = row.rhs / coeff
+                self.log.append(("bound", {"constraint" : row.index, "var" : var, "comp" : comp, "value" : value}))
+                self._bound(var, comp, value)
+                changed = True
+                continue
+
+            low, high = self._activity(row)
+            if (row.comp != "GEQ" and low > row.rhs) or (row.comp != "LEQ" and high < row.rhs):
+                self.log.append(("infeasible", {"constraint" : row.index}))
+                raise Infeasible(row.index)
+            if (row.comp == "LEQ" and high <= row.rhs) or (row.comp == "GEQ" and low >= row.rhs):
+                self.log.append(("redundant", {"constraint" : row.index}))
+                changed = True
+                continue
+            if row.comp != "GEQ" and low == row.rhs:
+                self._force(row, at_lower=True)
+                changed = True
+                continue
+            if row.comp != "LEQ" and high == row.rhs:
+                self._force(row, at_lower=False)
+                changed = True
+                continue
+
+            kept.append(row)
+        return kept, changed
+
+    def _duplicate_rows(self, rows):
+        """
+        contraintes proportionnelles : deux inégalités de même sens, ou une inégalité et une
+        égalité, se réduisent à la plus forte ; deux inégalités opposées de même second membre
+        à une égalité
+        """
+        groups = {}
+        dropped = set()
+        for row in rows:
+            first = row.terms[min(row.terms)]
+            scale = 1 / first if first > 0 else -1 / first
+            key = tuple(sorted((var, coeff * scale) for var, coeff in row.terms.items()))
+            # second membre et sens de la contrainte normalisée (premier coefficient 1)
+            comp = row.comp if first > 0 else FLIP[row.comp]
+            rhs = row.rhs * scale * (1 if first > 0 else -1)
+            group = groups.setdefault(key, {})
+
+            other = group.get(comp)
+            if other is not None:
+                other_row, other_rhs = other
+                if comp == "EQ" and rhs != other_rhs:
+                    self.log.append(("infeasible", {"constraint" : row.index}))
+                    raise Infeasible(row.index)
+                if comp == "EQ" or (rhs >= other_rhs if comp == "LEQ" else rhs <= other_rhs):
+                    self.log.append(("duplicate", {"constraint" : row.index, "other" : other_row.index}))
+                    dropped.add(id(row))
+                    continue
+                self.log.append(("duplicate", {"constraint" : other_row.index, "other" : row.index}))
+                dropped.add(id(other_row))
+            group[comp] = (row, rhs)
+
+            equality = group.get("EQ")
+            for ineq in ("LEQ", "GEQ"):
+                if equality is None or ineq not in group:
+                    continue
+                ineq_row, ineq_rhs = group.pop(ineq)
+                if not holds(equality[1], ineq, ineq_rhs):
+                    self.log.append(("infeasible", {"constraint" : ineq_row.index}))
+                    raise Infeasible(ineq_row.index)
+                self.log.append(("duplicate", {"constraint" : ineq_row.index, "other" : equality[0].index}))
+                dropped.add(id(ineq_row))
+
+            if "LEQ" in group and "GEQ" in group:
+                (leq_row, leq_rhs), (geq_row, geq_rhs) = group["LEQ"], group["GEQ"]
+                if leq_rhs < geq_rhs:
+                    self.log.append(("infeasible", {"constraint" : row.index}))
+                    raise Infeasible(row.index)
+                if leq_rhs == geq_rhs:
+                    self.log.append(("merged", {"constraint" : geq_row.index, "other" : leq_row.index}))
+                    var = min(leq_row.terms)
+                    self.ratios[geq_row.index] = geq_row.terms[var] / leq_row.terms[var]
+                    dropped.add(id(geq_row))
+                    leq_row.comp = "EQ"
+                    group["EQ"] = group.pop("LEQ")
+                    del group["GEQ"]
+
+        return [row for row in rows if id(row) not in dropped], bool(dropped)
+
+    def _empty_columns(self, rows):
+        """
+        une variable absente des contraintes prend la borne qui maximise son terme dans l'utilité
+        (une variable de coût positif sans borne supérieure reste : le problème n'est pas borné
+        s'il est réalisable)
+        """
+        used = set()
+        for row in rows:
+            used.update(row.terms)
+        changed = False
+        for var in self.variables:
+            if var in used or var in self.fixed:
+                continue
+            cost = self.sign * self.utility.coeff(var)
+            value = self.lower[var] if cost <= 0 else self.upper[var]
+            if value == inf:
+                continue
+            self.log.append(("column", {"var" : var}))
+            self._fix(var, value, at="lower" if cost <= 0 else "upper")
+            changed = True
+        return changed
+
+    def _implied_bounds(self, rows):
+        """
+        resserrement des bornes : sum a_k x_k <= b avec a_j > 0 et a_k >= 0 implique
+        x_j <= (b - sum_{k != j} a_k l_k) / a_j ; une borne supérieure au moins aussi large est
+        inutile. seules les bornes inférieures, toujours gardées, servent au calcul.
+        """
+        for row in rows:
+            sides = [(row.terms, row.rhs)] if row.comp == "LEQ" else [({var: -coeff for var, coeff in row.terms.items()}, -row.rhs)]
+            if row.comp == "EQ":
+                sides.append((row.terms, row.rhs))
+            for terms, rhs in sides:
+                if any(coeff < 0 for coeff in terms.values()):
+                    continue
+                low = sum(coeff * self.lower[var] for var, coeff in terms.items())
+                for var, coeff in terms.items():
+                    bound = (rhs - low) / coeff + self.lower[var]
+                    if var not in self.implied and bound <= self.upper[var] < inf:
+                        self.implied.add(var)
+                        self.log.append(("implied", {"constraint" : row.index, "var" : var, "value" : self.upper[var]}))
+
+    def _reduced_problem(self, rows):
+        variables = [var for var in self.variables if var not in self.fixed]
+        used = set(self.variables)
+        substitutions = {var : LinearForm(value) for var, value in self.fixed.items()}
+        for var in variables:
+            if self.lower[var] != 0:
+                self.names[var] = modified_name(var, "tilde", used)
+                used.add(self.names[var])
+                substitutions[var] = LinearForm(self.lower[var], {self.names[var] : 1})
+                self.log.append(("shift", {"var" : var, "name" : self.names[var], "value" : self.lower[var]}))
+            else:
+                self.names[var] = var
+
+        constraints = []
+        self.rows = [row.index for row in rows]
+        for row in rows:
+            form = LinearForm(0, row.terms).substitute(substitutions)
+            constraints.append((form.linear_part(), row.comp, LinearForm(row.rhs - form.constant)))
+        bounds = {
+            self.names[var] : (0, self.upper[var] - self.lower[var])
+            for var in variables if self.upper[var] < inf and var not in self.implied
+            }
+
+        reduced = {
+            "title" : self.problem.get("title", ""),
+            "description" : self.problem.get("description", ""),
+            "variables" : [self.names[var] for var in variables],
+            "utility" : self.utility.substitute(substitutions),
+            "optimizer" : self.problem["optimizer"],
+            "constraints" : constraints,
+            }
+        if bounds:
+            reduced["bounds"] = bounds
+        if self.integer:
+            reduced["integer"] = [self.names[var] for var in variables if var in self.integer]
+        return reduced
+
+    def postsolve(self, solution):
+        """
+        valeurs des variables d'origine à partir d'une solution du problème réduit
+        """
+        values = {}
+        for var in self.variables:
+            if var in self.fixed:
+                values[var] = self.fixed[var]
+            else:
+                values[var] = to_number(solution[self.names[var]]) + self.lower[var]
+        return values
+
+    def postsolve_sensitivity(self, report, tolerance=0):
+        """
+        analyse de sensibilité (LinProg.sensitivity) du problème réduit ramenée aux contraintes et
+        aux variables d'origine
+
+        une contrainte gardée reprend le prix fictif de sa contrainte réduite ; une égalité issue de
+        deux inégalités opposées le donne à celle des deux dont il a le bon signe. Les contraintes
+        supprimées sont reprises dans l'ordre inverse de la pré-résolution : une contrainte forçante
+        reçoit le plus petit prix fictif qui rend optimales les valeurs des variables qu'elle fixe,
+        une contrainte à une variable devenue une borne atteinte reçoit le coût réduit restant de
+        sa variable, les autres ont un prix fictif nul. L'intervalle du second membre d'une
+        contrainte gardée est restreint pour que les contraintes supprimées restent vérifiées ;
+        celui d'une borne atteinte va jusqu'à ce qu'une autre contrainte devienne liante ; celui
+        d'une autre contrainte supprimée n'est calculé que si elle n'est pas liante, sinon il est
+        réduit au second membre.
+        """
+        forms = []
+        for l_part, comp, r_part in self.problem["constraints"]:
+            form = LinearForm.convert(l_part) - LinearForm.convert(r_part)
+            forms.append((dict(form.terms), comp, -form.constant))
+        solution = self.postsolve({row["name"] : row["value"] for row in report["variables"]})
+        reduced = {self.rows[row["index"]] : row for row in report["constraints"]}
+        # prix fictifs dans le sens d'une maximisation
+        prices = [0] * len(forms)
+        for idx, row in reduced.items():
+            prices[idx] = self.sign * to_number(row["shadow_price"])
+
+        def reduced_cost(var):
+            cost = self.sign * to_number(self.utility.coeff(var))
+            return cost - sum((price * forms[idx][0].get(var, 0) for idx, price in enumerate(prices) if price), 0)
+
+        def valid(comp, price):
+            return comp == "EQ" or (price >= 0 if comp == "LEQ" else price <= 0)
+
+        for kind, data in reversed(self.log):
+            if kind == "forcing":
+                idx = data["constraint"]
+                at_lower, terms = self.forced[idx]
+                ratios = [reduced_cost(var) / coeff for var, coeff in terms.items()]
+                prices[idx] = max([0] + ratios) if at_lower else min([0] + ratios)
+            elif kind == "bound":
+                var, idx = data["var"], data["constraint"]
+                if abs(solution[var] - data["value"]) > tolerance:
+                    continue
+                cost = reduced_cost(var)
+                if (data["comp"] != "GEQ" and cost > tolerance) or (data["comp"] != "LEQ" and cost < -tolerance):
+                    prices[idx] = cost / forms[idx][0][var]
+            elif kind == "merged":
+                # l'égalité issue de deux inégalités opposées : le prix fictif va à celle des deux
+                # dont il a le bon signe
+                kept, dropped = data["other"], data["constraint"]
+                if not valid(forms[kept][1], prices[kept]):
+                    prices[dropped], prices[kept] = prices[kept] / self.ratios[dropped], 0
+
+        ranges = {}
+
+        def clip(low, high, rates, limits):
+            """
+            intervalle [low, high] restreint aux variations pour lesquelles la solution, qui varie
+            de rates par unité, vérifie les contraintes limits
+            """
+            for terms, comp, rhs in limits:
+                rate = sum((coeff * rates.get(var, 0) for var, coeff in terms.items()), 0)
+                if abs(rate) <= tolerance:
+                    continue
+                activity = sum((coeff * solution[var] for var, coeff in terms.items()), 0)
+                # variation à laquelle la contrainte devient liante
+                limit = (rhs - activity) / rate
+                if comp == "EQ":
+                    low, high = max(low, 0), min(high, 0)
+                elif (comp == "LEQ") == (rate > 0):
+                    high = min(high, limit)
+                else:
+                    low = max(low, limit)
+            return low, high
+
+        # variations du second membre d'une contrainte gardée pour lesquelles la base reste
+        # optimale : la solution varie alors, les contraintes supprimées et les bornes impliquées
+        # doivent rester vérifiées
+        limits = [form for idx, form in enumerate(forms) if idx not in reduced]
+        limits += [({var : 1}, "LEQ", self.upper[var]) for var in self.implied]
+        shifts = {}
+        for idx, row in reduced.items():
+            low, high = (value - to_number(row["rhs"]) for value in row["rhs_range"])
+            rates = {var : to_number(row.get("variation", {}).get(name, 0)) for var, name in self.names.items()}
+            shifts[idx] = clip(low, high, rates, limits)
+
+        # une borne atteinte qui a un prix fictif retient sa variable, hors base dans le problème
+        # réduit : son second membre déplace cette variable, et les variables de base avec elle,
+        # tant que toutes les autres contraintes et les bornes d'origine restent vérifiées
+        columns = {row["name"] : row for row in report["variables"]}
+        origin = {name : var for var, name in self.names.items()}
+        native = variable_bounds(self.problem)
+        bounds = []
+        for var in self.variables:
+            lower, upper = native.get(var, (0, inf))
+            bounds.append(({var : 1}, "GEQ", lower))
+            if upper < inf:
+                bounds.append(({var : 1}, "LEQ", upper))
+        for kind, data in self.log:
+            var, idx = data.get("var"), data.get("constraint")
+            if kind != "bound" or var in self.fixed or not prices[idx]:
+                continue
+            coeff = forms[idx][0][var]
+            rates = {origin[name] : to_number(rate) / coeff for name, rate in columns[self.names[var]].get("variation", {}).items()}
+            rates[var] = 1 / coeff
+            low, high = clip(-inf, inf, rates, [form for k, form in enumerate(forms) if k != idx] + bounds)
+            ranges[idx] = (forms[idx][2] + low, forms[idx][2] + high)
+
+        for kind, data in self.log:
+            if kind != "merged" or data["other"] not in reduced:
+                continue
+            # l'intervalle de l'égalité gardée va à celle des deux inégalités qui a le prix
+            # fictif, celui de l'autre s'arrête à son second membre
+            kept, dropped = data["other"], data["constraint"]
+            for idx, ratio in ((kept, 1), (dropped, self.ratios[dropped])):
+                terms, comp, rhs = forms[idx]
+                if prices[idx]:
+                    low, high = sorted(rhs + ratio * shift for shift in shifts[kept])
+                    ranges[idx] = (rhs, high) if comp == "LEQ" else (low, rhs)
+                else:
+                    ranges[idx] = (rhs, inf) if comp == "LEQ" else (-inf, rhs)
+
+        constraints = []
+        for idx, (terms, comp, rhs) in enumerate(forms):
+            activity = sum((coeff * solution[var] for var, coeff in terms.items()), 0)
+            slack = {"LEQ" : rhs - activity, "GEQ" : activity - rhs}.get(comp, 0)
+            if abs(slack) <= tolerance:
+                slack = 0
+            if idx in ranges:
+                rhs_range = ranges[idx]
+            elif idx in reduced:
+                rhs_range = tuple(rhs + shift for shift in shifts[idx])
+            elif prices[idx] or comp == "EQ":
+                rhs_range = (rhs, rhs)
+            else:
+                # contrainte supprimée non liante : la solution reste optimale tant qu'elle est vérifiée
+                rhs_range = (activity, inf) if comp == "LEQ" else (-inf, activity)
+            constraints.append({
+                "index" : idx,
+                "slack" : slack,
+                "shadow_price" : self.sign * prices[idx],
+                "rhs" : rhs,
+                "rhs_range" : rhs_range,
+                })
+
+        variables = []
+        for var in self.variables:
+            cost = self.sign * to_number(self.utility.coeff(var))
+            remaining = reduced_cost(var)
+            if abs(remaining) <= tolerance:
+                remaining = 0
+            if var not in self.fixed:
+                cost_range = columns[self.names[var]]["cost_range"]
+            else:
+                # fixée par ses bornes : optimale pour tout coefficient ; à une seule borne : tant
+                # que son coût réduit garde le signe qui la retient à cette borne
+                at = self.fixed_at[var]
+                low, high = -inf, inf
+                if at == "lower":
+                    high = cost - remaining
+                elif at == "upper":
+                    low = cost - remaining
+                cost_range = (low, high) if self.sign > 0 else (-high, -low)
+            variables.append({
+                "name" : var,
+                "value" : solution[var],
+                "reduced_cost" : self.sign * remaining,
+                "cost" : self.sign * cost,
+                "cost_range" : cost_range,
+                })
+
+        return {
+            "objective" : report["objective"],
+            "constraints" : constraints,
+            "variables" : variables,
+            }
+
+    def stats(self):
+        """
+        tailles du problème avant et après la pré-résolution
+        """
+        stats = {"status" : self.status, "rows" : [len(self.problem["constraints"])], "variables" : [len(self.variables)]}
+        if self.reduced is not None:
+            stats["rows"].append(len(self.reduced["constraints"]))
+            stats["variables"].append(len(self.reduced["variables"]))
+        return stats
+
+    def original(self):
+        """
+        programme linéaire d'origine (moteur sympy, pour le rendu)
+        """
+        from linear_program import LinProg
+
+        lin_prog = LinProg()
+        lin_prog.from_dict(self.problem)
+        return lin_prog
+
+
+def presolve(lin_prog):
+    """
+    pré-résout lin_prog, lu mais pas encore sous forme canonique : il est remplacé par le problème
+    réduit (inchangé si le problème n'est pas réalisable). renvoie la pré-résolution, aussi
+    accessible par lin_prog.presolve
+    """
+    result = Presolve(lin_prog.problem).run()
+    if result.status == "reduced":
+        lin_prog.from_dict(result.reduced)
+    lin_prog.presolve = result
+    return result
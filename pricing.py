@@ -0,0 +1,255 @@
+"""
+règles de choix de la variable entrante (pricing)
+
+une règle choisit, parmi les variables hors base de coût réduit positif, celle qui entre dans la
+base. Les moteurs de calcul fournissent les coûts réduits (_reduced_costs), les lignes et colonnes
+du tableau courant (_tableau_row, _tableau_column, _tableau_row_combination) ; les poids des règles
+steepest edge et devex sont mis à jour à chaque pivot par update, appelée depuis set_in_base.
+
+Après degenerate_limit pivots sans amélioration de la fonction utilité, la règle de Bland (plus
+petit indice, pour la variable entrante comme pour la variable sortante) prend le relais jusqu'à
+la prochaine amélioration : le simplexe ne peut pas cycler.
+"""
+
+from math import sqrt
+
+
+class Pricing:
+    """
+    règle de Dantzig : plus grand coût réduit positif
+    """
+
+    name = "dantzig"
+
+    def __init__(self, degenerate_limit=20):
+        self.degenerate_limit = degenerate_limit
+        self.pivots = 0
+        self.degenerate_pivots = 0
+        self.bland_pivots = 0
+        self.anti_cycling = False
+        self._degenerate = 0
+        self._last_value = None
+
+    def reset(self):
+        """
+        nouvelle fonction utilité (fin de la phase 1) : les poids et le suivi de la dégénérescence repartent de zéro
+        """
+        self.anti_cycling = False
+        self._degenerate = 0
+        self._last_value = None
+
+    def reset_stats(self):
+        """
+        nouvelle résolution (LinProg.resolve) : les compteurs ne décrivent que celle-ci
+        """
+        self.pivots = 0
+        self.degenerate_pivots = 0
+        self.bland_pivots = 0
+
+    def stats(self):
+        return {
+            "rule" : self.name,
+            "pivots" : self.pivots,
+            "degenerate_pivots" : self.degenerate_pivots,
+            "bland_pivots" : self.bland_pivots,
+            }
+
+    def select(self, lin_prog):
+        """
+        variable entrante, None si la solution courante est optimale
+        """
+        value = lin_prog._utility_value()
+        if self._last_value is not None:
+            if value > self._last_value + lin_prog.tolerance:
+                self._degenerate = 0
+                self.anti_cycling = False
+            else:
+                self._degenerate += 1
+                self.degenerate_pivots += 1
+                if self._degenerate >= self.degenerate_limit:
+                    self.anti_cycling = True
+        self._last_value = value
+
+        if self.anti_cycling:
+            return self.bland(lin_prog)
+        return self.choose(lin_prog)
+
+    def choose(self, lin_prog):
+        return self.dantzig(lin_prog, lin_prog.out)
+
+    def update(self, lin_prog, entering, idx):
+        """
+        appelée avant le pivot de entering sur la ligne idx
+        """
+        self.pivots += 1
+        if self.anti_cycling:
+            self.bland_pivots += 1
+
+    def rename(self, old, new):
+        """
+        variable remplacée par son complément à sa borne (simplexe à variables bornées)
+        """
+
+    @staticmethod
+    def dantzig(lin_prog, variables):
+        best_value = lin_prog.tolerance
+        best_var = None
+        for var, value in zip(variables, lin_prog._reduced_costs(variables)):
+            if value > best_value:
+                best_var = var
+                best_value = value
+        return best_var
+
+    @staticmethod
+    def bland(lin_prog):
+        """
+        règle de Bland : variable de plus petit indice parmi celles de coût réduit positif
+        """
+        index = {var: j for j, var in enumerate(lin_prog.variables)}
+        candidates = [var for var, value in zip(lin_prog.out, lin_prog._reduced_costs(lin_prog.out)) if value > lin_prog.tolerance]
+        return min(candidates, key=index.get, default=None)
+
+
+class BlandPricing(Pricing):
+    """
+    règle de Bland à chaque itération
+    """
+
+    name = "bland"
+
+    def choose(self, lin_prog):
+        return self.bland(lin_prog)
+
+
+class PartialPricing(Pricing):
+    """
+    pricing partiel : les coûts réduits sont calculés par blocs de variables hors base, on s'arrête
+    au premier bloc contenant un candidat ; le bloc de départ tourne d'une itération à l'autre
+    """
+
+    name = "partial"
+
+    def __init__(self, degenerate_limit=20, size=None):
+        super().__init__(degenerate_limit)
+        self.size = size
+        self._start = 0
+
+    def choose(self, lin_prog):
+        out = lin_prog.out
+        if not out:
+            return None
+        size = self.size or max(8, int(sqrt(len(out))) + 1)
+        for offset in range(0, len(out), size):
+            start = self._start + offset
+            block = [out[(start + k) % len(out)] for k in range(min(size, len(out) - offset))]
+            best_var = self.dantzig(lin_prog, block)
+            if best_var is not None:
+                self._start = (start + size) % len(out)
+                return best_var
+        return None
+
+
+class WeightedPricing(Pricing):
+    """
+    plus grand rapport d_j^2 / poids_j, les poids sont indexés par le nom des variables hors base
+    """
+
+    def __init__(self, degenerate_limit=20):
+        super().__init__(degenerate_limit)
+        self.weights = {}
+
+    def reset(self):
+        super().reset()
+        self.weights = {}
+
+    def weight(self, lin_prog, var):
+        return self.weights.setdefault(var, 1.0)
+
+    def rename(self, old, new):
+        # la colonne ne fait que changer de signe : son poids est inchangé
+        if old in self.weights:
+            self.weights[new] = self.weights.pop(old)
+
+    def choose(self, lin_prog):
+        best_value = 0
+        best_var = None
+        for var, value in zip(lin_prog.out, lin_prog._reduced_costs(lin_prog.out)):
+            if value > lin_prog.tolerance:
+                score = float(value) ** 2 / self.weight(lin_prog, var)
+                if score > best_value:
+                    best_var = var
+                    best_value = score
+        return best_var
+
+
+class DevexPricing(WeightedPricing):
+    """
+    devex : poids de référence initialisés à 1, majorés à chaque pivot à partir de la ligne pivot
+    """
+
+    name = "devex"
+
+    def update(self, lin_prog, entering, idx):
+        super().update(lin_prog, entering, idx)
+        row, _ = lin_prog._tableau_row(idx)
+        row = dict(zip(lin_prog.variables, row))
+        pivot = float(row[entering])
+        weight = self.weight(lin_prog, entering)
+
+        for var in self.weights:
+            value = float(row[var])
+            if var != entering and value != 0:
+                self.weights[var] = max(self.weights[var], (value / pivot) ** 2 * weight)
+        del self.weights[entering]
+        self.weights[lin_prog._base_variable(idx)] = max(weight / pivot ** 2, 1.0)
+
+
+class SteepestEdgePricing(WeightedPricing):
+    """
+    steepest edge : le poids de x_j est 1 + |B^-1 a_j|^2, calculé une fois puis mis à jour
+    exactement à chaque pivot (formules de Goldfarb et Reid)
+    """
+
+    name = "steepest_edge"
+
+    def weight(self, lin_prog, var):
+        if var not in self.weights:
+            self.weights[var] = 1.0 + sum(float(value) ** 2 for value in lin_prog._tableau_column(var))
+        return self.weights[var]
+
+    def update(self, lin_prog, entering, idx):
+        super().update(lin_prog, entering, idx)
+        column = lin_prog._tableau_column(entering)
+        pivot = float(column[idx])
+        weight = self.weight(lin_prog, entering)
+        row, _ = lin_prog._tableau_row(idx)
+        # produits scalaires entre la colonne entrante et chaque colonne du tableau
+        dots = lin_prog._tableau_row_combination(column)
+
+        for var, value, dot in zip(lin_prog.variables, row, dots):
+            if var != entering and var in self.weights and value != 0:
+                ratio = float(value) / pivot
+                self.weights[var] = max(self.weights[var] - 2 * ratio * float(dot) + ratio ** 2 * weight, 1 + ratio ** 2)
+        del self.weights[entering]
+        self.weights[lin_prog._base_variable(idx)] = max(weight / pivot ** 2, 1.0)
+
+
+PRICINGS = {
+    "dantzig" : Pricing,
+    "steepest_edge" : SteepestEdgePricing,
+    "devex" : DevexPricing,
+    "partial" : PartialPricing,
+    "bland" : BlandPricing,
+    }
+
+
+def make_pricing(pricing):
+    """
+    nouvelle règle de pricing à partir de son nom (ou d'une sous-classe de Pricing)
+    chaque programme a sa propre instance : les poids ne sont pas partagés
+    """
+    if isinstance(pricing, type) and issubclass(pricing, Pricing):
+        return pricing()
+    if pricing not in PRICINGS:
+        raise ValueError(f"unknown pricing {pricing}, expected one of {tuple(PRICINGS)}")
+    return PRICINGS[pricing]()
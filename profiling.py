@@ -0,0 +1,142 @@
+"""
+instrumentation : durée et nombre d'appels de chaque étape de la résolution et du rendu
+
+Profiler.install remplace les méthodes listées dans TARGETS par des versions chronométrées, et
+uninstall remet les méthodes d'origine : sans profiler installé, le code n'est pas modifié et
+l'instrumentation ne coûte rien. Chaque appel est un événement au format Chrome trace (ouvert dans
+chrome://tracing ou https://ui.perfetto.dev) ; les appels sur un programme linéaire portent son
+titre et le numéro du pivot en cours.
+
+    profiler = Profiler()
+    profiler.install()
+    ...
+    profiler.uninstall()
+    profiler.write("trace.json")
+"""
+
+from functools import wraps
+from importlib import import_module
+import json
+import os
+import threading
+import time
+
+# étapes instrumentées : module -> {classe (None pour une fonction du module) : méthodes}
+# seules les méthodes définies dans la classe elle-même sont remplacées
+LIN_PROG_STEPS = (
+    "canonical_form", "pre_standard_form", "add_artificials", "standard_form", "set_base",
+    "start_phase_one", "end_phase_one",
+    "get_incoming_variable", "get_pivot_line", "set_in_base", "apply_subs", "complement",
+    "add_row", "dual_iterations", "get_leaving_row", "get_dual_entering", "complement_over_bounds",
+    "to_latex",
+    )
+
+TARGETS = {
+    "loader" : {None : ("lin_prog_from_json",)},
+    "presolve" : {None : ("presolve",)},
+    "branch_and_bound" : {None : ("evaluate",)},
+    "linear_program" : {"LinProg" : LIN_PROG_STEPS},
+    "tableau" : {"TableauLinProg" : LIN_PROG_STEPS},
+    "fraction_free" : {"FractionFreeLinProg" : LIN_PROG_STEPS},
+    "revised" : {"RevisedLinProg" : LIN_PROG_STEPS},
+    "compiler" : {"LatexCompiler" : ("generate_pdf", "compile_tex", "compile_file", "merge", "_run")},
+    }
+
+# étapes d'un pivot, regroupées par itération dans le résumé
+ITERATION_STEPS = ("get_incoming_variable", "get_pivot_line", "set_in_base", "apply_subs", "to_latex")
+
+
+class Profiler:
+
+    def __init__(self, targets=TARGETS):
+        self.targets = targets
+        self.events = []
+        self.origin = time.perf_counter_ns()
+        self._installed = []
+        self._local = threading.local()
+
+    def _wrap(self, name, category, function):
+        profiler = self
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            active = getattr(profiler._local, "active", None)
+            if active is None:
+                active = profiler._local.active = set()
+            if name in active:
+                # appel par super() d'une méthode déjà chronométrée
+                return function(*args, **kwargs)
+
+            event = {"name" : name, "cat" : category, "ph" : "X", "pid" : os.getpid(), "tid" : threading.get_ident()}
+            pricing = getattr(args[0], "pricing", None) if args else None
+            if pricing is not None:
+                event["args"] = {"problem" : args[0].title, "iteration" : pricing.pivots}
+
+            active.add(name)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = time.perf_counter_ns()
+                active.discard(name)
+                event["ts"] = (start - profiler.origin) / 1000
+                event["dur"] = (end - start) / 1000
+                profiler.events.append(event)
+
+        return timed
+
+    def install(self):
+        for module_name, owners in self.targets.items():
+            module = import_module(module_name)
+            for class_name, names in owners.items():
+                owner = module if class_name is None else getattr(module, class_name)
+                for name in names:
+                    original = vars(owner).get(name)
+                    if original is None:
+                        continue
+                    self._installed.append((owner, name, original))
+                    setattr(owner, name, self._wrap(name, class_name or module_name, original))
+
+    def uninstall(self):
+        for owner, name, original in reversed(self._installed):
+            setattr(owner, name, original)
+        self._installed = []
+
+    def summary(self):
+        """
+        par étape : nombre d'appels, durée totale et maximale (secondes)
+        par pivot de chaque problème : durée de chacune des étapes de ITERATION_STEPS
+        """
+        steps = {}
+        iterations = {}
+        for event in self.events:
+            seconds = event["dur"] / 1e6
+            stats = steps.setdefault(event["name"], {"calls" : 0, "total" : 0.0, "max" : 0.0})
+            stats["calls"] += 1
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            if event["name"] in ITERATION_STEPS and "args" in event:
+                key = (event["args"]["problem"], event["args"]["iteration"])
+                iteration = iterations.setdefault(key, {"problem" : key[0], "iteration" : key[1], "steps" : {}})
+                iteration["steps"][event["name"]] = iteration["steps"].get(event["name"], 0.0) + seconds
+        return {
+            "steps" : dict(sorted(steps.items(), key=lambda item: -item[1]["total"])),
+            "iterations" : list(iterations.values()),
+            }
+
+    def write(self, filename):
+        """
+        trace au format Chrome (traceEvents), suivie du résumé
+        """
+        with open(filename, 'w') as f:
+            json.dump({"traceEvents" : self.events, "displayTimeUnit" : "ms", "summary" : self.summary()}, f)
+            f.write("\n")
+
+    def report(self):
+        """
+        tableau texte des étapes, de la plus coûteuse à la moins coûteuse
+        """
+        lines = [f"{'étape':24} {'appels':>8} {'total (s)':>10} {'max (ms)':>10}"]
+        for name, stats in self.summary()["steps"].items():
+            lines.append(f"{name:24} {stats['calls']:8} {stats['total']:10.3f} {stats['max'] * 1000:10.2f}")
+        return "\n".join(lines)
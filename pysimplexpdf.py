@@ -1,25 +1,176 @@
 
-import re
 import argparse
+import os
+import sys
 import time
 
-from simplex import load_from_json, multi_solve
+from branch_and_bound import SELECTIONS
+from loader import ENGINES, get_engine, load_from_json
+from lp_formats import read_mps, read_lp, write_mps, write_lp
+from pricing import PRICINGS
+
+# un fichier json contient une liste de problèmes, un fichier MPS ou LP un seul problème
+READERS = {
+    ".json" : load_from_json,
+    ".jsonl" : load_from_json,
+    ".mps" : lambda filename, engine: [read_mps(filename, engine=engine)],
+    ".lp" : lambda filename, engine: [read_lp(filename, engine=engine)],
+    }
+
+WRITERS = {
+    ".mps" : write_mps,
+    ".lp" : write_lp,
+    }
+
+# erreurs de lecture d'un problème : syntaxe (json ou expression), terme non linéaire, variable
+# libre ou borne inférieure négative
+INPUT_ERRORS = (SyntaxError, ValueError, NotImplementedError)
 
 parser = argparse.ArgumentParser(description="Générateur de solutions de programmes linéaires avec l'algorithme du simplexe, au format pdf.")
-parser.add_argument("--infile", "-i", help="fichier json contenant les programmes linéaires à résoudre.")
-parser.add_argument("--outfile", "-o", help="nom du fichier pdf de sortie", default=None)
+parser.add_argument("command", help="solve : résout les problèmes de --infile ; serve : démarre le serveur de résolution", nargs="?", choices=["solve", "serve"], default="solve")
+parser.add_argument("--infile", "-i", help="fichier json (ou MPS, LP) contenant les programmes linéaires à résoudre.")
+parser.add_argument("--outfile", "-o", help="nom du fichier pdf (ou json avec --format json) de sortie", default=None)
+parser.add_argument("--engine", "-e", help="moteur de calcul : symbolique (sympy) ou tableau numérique exact (fraction) ou flottant (float), exact sans fractions (integer), simplexe révisé creux (revised, revised-float)", choices=ENGINES, default="sympy")
+parser.add_argument("--format", "-f", help="pdf : correction détaillée ; json : solutions optimales seulement, sans rendu latex", choices=["pdf", "json"], default="pdf")
+parser.add_argument("--no-render", help="équivalent à --format json", action="store_true")
+parser.add_argument("--cache-dir", help="dossier du cache des sections déjà calculées", default=".simplex_cache")
+parser.add_argument("--no-cache", help="recalcule toutes les sections sans utiliser le cache", action="store_true")
+parser.add_argument("--export", help="écrit les programmes lus au format MPS ou LP (selon l'extension) sans les résoudre", default=None)
+parser.add_argument("--pricing", "-p", help="règle de choix de la variable entrante", choices=PRICINGS, default="dantzig")
+parser.add_argument("--compare-pricing", help="résout chaque problème avec chaque règle de pricing et compare le nombre de pivots (sortie json)", action="store_true")
+parser.add_argument("--sensitivity", help="ajoute l'analyse de sensibilité de la solution optimale (prix fictifs, coûts réduits, intervalles)", action="store_true")
+parser.add_argument("--no-dual-simplex", help="traite les seconds membres négatifs par la phase 1 même quand la base initiale est dual réalisable", action="store_true")
+parser.add_argument("--presolve", help="simplifie les problèmes avant le simplexe : bornes, contraintes redondantes ou en double, variables fixées", action="store_true")
+parser.add_argument("--node-selection", help="programmes en nombres entiers : nœud évalué ensuite dans la séparation et évaluation, de meilleure borne (best) ou en profondeur (depth)", choices=SELECTIONS, default="best")
+parser.add_argument("--bb-jobs", help="programmes en nombres entiers : nombre de processus évaluant les nœuds ouverts en parallèle", type=int, default=1)
+parser.add_argument("--max-nodes", help="programmes en nombres entiers : nombre maximal de nœuds évalués", type=int, default=None)
+parser.add_argument("--branch-tree", help="programmes en nombres entiers : détaille l'arbre de séparation dans le pdf", action="store_true")
+parser.add_argument("--batch", help="json : résout ensemble les problèmes de même taille, pivots menés en parallèle sur des tableaux numpy (moteurs fraction et float, règles dantzig et bland)", action="store_true")
+parser.add_argument("--jobs", "-j", help="nombre de processus utilisés pour résoudre les problèmes (0 : un par cœur)", type=int, default=1)
+parser.add_argument("--build-dir", help="dossier de travail de la compilation latex", default=".simplex_build")
+parser.add_argument("--split", help="compile chaque problème séparément, en parallèle avec --jobs, puis assemble les pdf", action="store_true")
+parser.add_argument("--stream", help="écrit le fichier .tex au fur et à mesure de la résolution, problème par problème, en affichant la progression", action="store_true")
+parser.add_argument("--no-format", help="compile le préambule latex à chaque fois, sans format précompilé", action="store_true")
+parser.add_argument("--profile", help="écrit dans ce fichier la durée de chaque étape (trace au format Chrome, avec un résumé) ; les problèmes sont alors résolus dans un seul processus", default=None)
+parser.add_argument("--host", help="serve : adresse d'écoute", default="127.0.0.1")
+parser.add_argument("--port", help="serve : port d'écoute", type=int, default=8765)
+parser.add_argument("--socket", help="serve : écoute sur cette socket unix plutôt qu'en tcp", default=None)
+parser.add_argument("--queue", help="serve : nombre maximal de requêtes en cours ou en attente", type=int, default=16)
+
+
+def main(args):
+
+    if args.command == "serve":
+        from server import serve
+
+        serve(host=args.host, port=args.port, socket_path=args.socket, workers=args.jobs or os.cpu_count(),
+              queue_size=args.queue, cache_dir=None if args.no_cache else args.cache_dir, build_dir=args.build_dir,
+              use_format=not args.no_format)
+        return
+
+    if args.profile:
+        from profiling import Profiler
+
+        # les processus de travail ne sont pas instrumentés
+        args.jobs = 1
+        profiler = Profiler()
+        profiler.install()
+        try:
+            solve_command(args)
+        finally:
+            profiler.uninstall()
+            profiler.write(args.profile)
+            print(profiler.report(), file=sys.stderr)
+    else:
+        solve_command(args)
+
+
+def solve_command(args):
+
+    if args.no_render:
+        args.format = "json"
+
+    stem, extension = os.path.splitext(args.infile)
+    assert extension in READERS
+
+    def load(pricing):
+        pl_list = READERS[extension](args.infile, engine=get_engine(args.engine, pricing=pricing))
+        for lin_prog in pl_list:
+            lin_prog.branching = {"selection" : args.node_selection, "workers" : args.bb_jobs, "max_nodes" : args.max_nodes}
+            lin_prog.allow_dual_simplex = not args.no_dual_simplex
+        if args.presolve:
+            from presolve import presolve
+
+            for lin_prog in pl_list:
+                presolve(lin_prog)
+        return pl_list
+
+    try:
+        data = load(args.pricing)
+    except INPUT_ERRORS as error:
+        sys.exit(f"{args.infile} : {error}")
+
+    if args.export:
+        export_stem, export_extension = os.path.splitext(args.export)
+        assert export_extension in WRITERS
+        for idx, lin_prog in enumerate(data, 1):
+            filename = args.export if len(data) == 1 else f"{export_stem}_{idx}{export_extension}"
+            WRITERS[export_extension](lin_prog, filename)
+
+    elif args.compare_pricing:
+        from solver import compare_pricing, dump_results
+
+        assert not args.outfile or args.outfile[-5:] == ".json"
+        dump_results(compare_pricing(load), args.outfile)
+
+    elif args.format == "json":
+        # pas de pylatex ni de latex dans ce mode
+        from solver import solve_all, dump_results
+
+        assert not args.outfile or args.outfile[-5:] == ".json"
+        if args.batch:
+            from batch import solve_batch
+
+            results, _ = solve_batch(data, sensitivity=args.sensitivity)
+        else:
+            results = solve_all(data, sensitivity=args.sensitivity)
+        dump_results(results, args.outfile)
+
+    else:
+        from simplex import multi_solve, default_template
+        from cache import FragmentCache
+        from compiler import LatexCompiler
+
+        assert not args.outfile or args.outfile[-4:] == ".pdf"
+
+        prefix = args.outfile[:-4] if args.outfile else stem
+        workers = args.jobs or os.cpu_count()
+        cache = None if args.no_cache else FragmentCache(args.cache_dir)
+        compiler = LatexCompiler(build_dir=args.build_dir, use_format=not args.no_format, workers=workers)
+        template = default_template()
+        if args.sensitivity:
+            template = dict(template, sensitivity=dict(template["sensitivity"], enabled=True))
+        if args.branch_tree:
+            template = dict(template, branch_and_bound=dict(template["branch_and_bound"], tree=True))
 
-args = parser.parse_args()
+        last_status = [""]
 
-data = load_from_json(args.infile)
+        def progress(idx, lin_prog):
+            status = f"[{idx + 1}/{len(data)}] {lin_prog.title} : {lin_prog.pricing.pivots} pivots"
+            if status != last_status[0]:
+                print(f"\r{status:<{len(last_status[0])}}", end="", file=sys.stderr, flush=True)
+                last_status[0] = status
 
-assert not args.outfile or args.outfile[-4:] == ".pdf"
-assert args.infile[-5:] == ".json"
+        start_time = time.time()
+        multi_solve(data, name=prefix, workers=workers, template=template, cache=cache, compiler=compiler, split=args.split,
+                    stream=args.stream, progress=progress if args.stream else None)
+        if args.stream:
+            print(file=sys.stderr)
+        delta_time = time.time() - start_time
 
-prefix = args.outfile[:-4] if args.outfile else args.infile[:-5]
+        print(f"PDF generated in {delta_time:.2f}s")
 
-start_time = time.time()
-multi_solve(data, name=prefix)
-delta_time = time.time() - start_time
 
-print(f"PDF generated in {delta_time:.2f}s")
+# le garde est nécessaire pour les processus de multi_solve (méthode spawn)
+if __name__ == "__main__":
+    main(parser.parse_args())
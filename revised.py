@@ -0,0 +1,425 @@
+"""
+simplexe révisé pour les grands problèmes creux
+
+seules les colonnes de A (creuses) et l'inverse de la base sont conservés. L'inverse est stocké
+sous forme produit : une suite de matrices élémentaires (fichier eta), une par pivot, reconstruite
+régulièrement à partir des colonnes de base (refactorisation). Le coût d'une itération dépend du
+nombre de coefficients non nuls, et non plus de la taille du tableau complet.
+Les lignes du tableau ne sont calculées que pour le rendu latex.
+"""
+
+from fractions import Fraction
+from math import inf
+
+from constraint import Constraint
+from linear_form import LinearForm, to_number
+from linear_program import split_bounds
+from tableau import TableauLinProg, RenderedConstraint
+
+
+class RevisedLinProg(TableauLinProg):
+    """
+    programme linéaire résolu par le simplexe révisé, même interface que LinProg
+    columns[j] est la colonne creuse {ligne: coefficient} de la variable j
+    refactor_every : nombre de pivots entre deux reconstructions du fichier eta
+    """
+
+    columns = []
+    rhs = []
+    cost = []
+    etas = []
+    slots = []
+    beta = []
+
+    def __init__(self, arithmetic="fraction", refactor_every=32, pricing="dantzig"):
+        super().__init__(arithmetic=arithmetic, pricing=pricing)
+        self.refactor_every = refactor_every
+
+    def _scalar(self, value):
+        value = to_number(value)
+        return Fraction(value) if self.arithmetic == "fraction" else float(value)
+
+    def from_dict(self, dictionnary):
+        self.problem = dictionnary
+        self.title = dictionnary.get("title", "")
+        self.description = dictionnary.get("description", "")
+        self.variables = [str(var) for var in dictionnary["variables"]]
+        self.decision_variables = list(self.variables)
+        self.optimizer = dictionnary["optimizer"]
+        self.initial_optimizer = self.optimizer
+
+        index = {var: j for j, var in enumerate(self.variables)}
+        utility = LinearForm.convert(dictionnary["utility"])
+        self.cost = [self._scalar(utility.coeff(var)) for var in self.variables]
+        self.z0 = self._scalar(utility.constant)
+
+        constraints, self.upper = split_bounds(dictionnary)
+        self.complemented = {}
+        self.integer = [str(var) for var in dictionnary.get("integer", [])]
+        self.columns = [{} for var in self.variables]
+        self.rhs = []
+        for idx, (l_part, comp, r_part) in enumerate(constraints):
+            form = LinearForm.convert(l_part) - LinearForm.convert(r_part)
+            for var, coeff in form.terms.items():
+                if var not in index:
+                    raise SyntaxError(f"undeclared variable {var}")
+                self.columns[index[var]][idx] = self._scalar(coeff)
+            self.rhs.append(self._scalar(-form.constant))
+
+        self.comps = [constraint[1] for constraint in constraints]
+        self.source = constraints
+        self.row_base = [None] * len(self.rhs)
+        self.deviation = [None] * len(self.rhs)
+        self.etas = []
+        self.slots = list(range(len(self.rhs)))
+        self.beta = list(self.rhs)
+        self.nb_pivots = 0
+        self.pending = None
+        self.base = None
+        self.out = None
+        self.artificials = []
+        self.objective_name = "z"
+        self.current_solution = {}
+        self.comments = "Forme initiale du problème."
+        self.standard = False
+
+    # inverse de la base sous forme produit : B^-1 = P E_k ... E_1
+    # les E_i sont les matrices élémentaires du fichier eta, P une permutation (slots) qui
+    # conserve l'ordre des lignes de la base à travers les refactorisations
+
+    def ftran(self, column):
+        """
+        B^-1 a pour une colonne creuse a, renvoie une liste dense
+        """
+        result = [self._scalar(0)] * len(self.rhs)
+        for row, value in column.items():
+            result[row] = value
+        for row, eta in self.etas:
+            pivot_value = result[row]
+            if pivot_value == 0:
+                continue
+            for idx, coeff in eta.items():
+                if idx == row:
+                    result[idx] = coeff * pivot_value
+                else:
+                    result[idx] += coeff * pivot_value
+        return [result[slot] for slot in self.slots]
+
+    def btran(self, vector):
+        """
+        y B^-1 pour un vecteur ligne dense
+        """
+        result = [self._scalar(0)] * len(vector)
+        for value, slot in zip(vector, self.slots):
+            result[slot] = value
+        for row, eta in reversed(self.etas):
+            result[row] = sum((result[idx] * coeff for idx, coeff in eta.items()), self._scalar(0))
+        return result
+
+    def _eta(self, alpha, row):
+        """
+        matrice élémentaire du pivot sur la ligne row, alpha = B^-1 a (ordre de la base)
+        """
+        pivot_value = alpha[row]
+        return self.slots[row], {self.slots[idx]: (1 / pivot_value if idx == row else -value / pivot_value) for idx, value in enumerate(alpha) if value != 0 or idx == row}
+
+    def refactor(self):
+        """
+        reconstruit le fichier eta à partir des colonnes de la base courante
+        les colonnes sont pivotées par nombre croissant de coefficients non nuls, sur le plus grand
+        pivot disponible ; les variables d'écart de base ne produisent pas de matrice élémentaire
+        """
+        size = len(self.row_base)
+        self.etas = []
+        self.slots = list(range(size))
+        slots = [None] * size
+        free_rows = set(range(size))
+
+        for idx in sorted(range(size), key=lambda idx: len(self.columns[self.row_base[idx]])):
+            alpha = self.ftran(self.columns[self.row_base[idx]])
+            best = max((row for row in free_rows if abs(alpha[row]) > self.tolerance), key=lambda row: (abs(alpha[row]), -row))
+            if any(value != (1 if row == best else 0) for row, value in enumerate(alpha)):
+                self.etas.append(self._eta(alpha, best))
+            slots[idx] = best
+            free_rows.remove(best)
+
+        self.slots = slots
+        self.beta = self.ftran(dict(enumerate(self.rhs)))
+
+    def _duals(self, heading=None):
+        heading = self.row_base if heading is None else heading
+        return self.btran([self.cost[column] for column in heading])
+
+    def _reduced_cost(self, duals, column):
+        return self.cost[column] - sum((duals[row] * coeff for row, coeff in self.columns[column].items()), self._scalar(0))
+
+    # rendu : lignes du tableau calculées à la demande
+
+    def _tableau_row(self, idx):
+        if self.row_base[idx] is None:
+            return [column.get(idx, self._scalar(0)) for column in self.columns], self.rhs[idx]
+        unit = [self._scalar(0)] * len(self.rhs)
+        unit[idx] = self._scalar(1)
+        row = self._tableau_row_combination(unit)
+        if self.pending is not None and self.pending[1] == idx:
+            pivot_value = self.pending[3][idx]
+            row = [value / pivot_value for value in row]
+        return row, self.beta[idx]
+
+    def _tableau_row_combination(self, vector):
+        rho = self.btran(vector)
+        return [sum((rho[row] * coeff for row, coeff in column.items()), self._scalar(0)) for column in self.columns]
+
+    def _tableau_column(self, variable):
+        column = self.variables.index(variable)
+        if getattr(self, "_entering", (None,))[0] == column:
+            return self._entering[1]
+        return self.ftran(self.columns[column])
+
+    def _objective_row(self):
+        if self.base is None:
+            return self.cost, self.z0
+        heading = list(self.row_base)
+        beta = list(self.beta)
+        if self.pending is not None:
+            column, idx, leaving, alpha = self.pending
+            heading[idx] = leaving
+            beta[idx] = beta[idx] * alpha[idx]
+        duals = self._duals(heading)
+        reduced = [self._reduced_cost(duals, column) for column in range(len(self.columns))]
+        return reduced, self.z0 + sum((self.cost[column] * value for column, value in zip(heading, beta)), self._scalar(0))
+
+    # étapes de l'algorithme
+
+    def canonical_form(self,
+                       to_max="Minimiser une fonction, c'est maximiser son inverse : on multiplie $z$ par -1.\n",
+                       comment="On transforme les $\\geq$ en $\\leq$ en multipliant chaque membre par -1.\n"
+                       ):
+        """
+        transform into canonical form
+        """
+        if self.optimizer == "min":
+            self.cost = [-value for value in self.cost]
+            self.z0 = -self.z0
+            self.optimizer = "max"
+            self.comments = to_max
+        else:
+            self.comments = ""
+
+        geq = {idx for idx, comp in enumerate(self.comps) if comp == "GEQ"}
+        for column in self.columns:
+            for idx in geq.intersection(column):
+                column[idx] = -column[idx]
+        for idx in geq:
+            self.rhs[idx] = -self.rhs[idx]
+        self.beta = list(self.rhs)
+        self.comps = ["LEQ" if comp == "GEQ" else comp for comp in self.comps]
+        self.source = None
+
+        self.comments += comment
+
+    def pre_standard_form(self, comment="On introduit les variables d'écart."):
+        for idx, comp in enumerate(self.comps):
+            if comp != "LEQ":
+                continue
+            new_var = self.get_new_var()
+            self.variables.append(new_var)
+            self.columns.append({idx: self._scalar(1)})
+            self.cost.append(self._scalar(0))
+            self.deviation[idx] = len(self.variables) - 1
+            self.comps[idx] = "EQ"
+
+        self.comments = comment
+
+    def _artificial_rows(self):
+        return [idx for idx, deviation in enumerate(self.deviation) if deviation is None or self.rhs[idx] < -self.tolerance]
+
+    def add_artificials(self, comment="On multiplie par -1 les contraintes dont le second membre est négatif, et on introduit une variable artificielle dans chaque contrainte sans variable de base."):
+        rows = self._artificial_rows()
+        negative = {idx for idx in rows if self.rhs[idx] < -self.tolerance}
+        for column in self.columns:
+            for idx in negative.intersection(column):
+                column[idx] = -column[idx]
+        for idx in negative:
+            self.rhs[idx] = -self.rhs[idx]
+        self.beta = list(self.rhs)
+
+        for idx in rows:
+            new_var = self.get_new_var("a")
+            self.variables.append(new_var)
+            self.artificials.append(new_var)
+            self.columns.append({idx: self._scalar(1)})
+            self.cost.append(self._scalar(0))
+            self.deviation[idx] = len(self.variables) - 1
+
+        self.comments = comment
+
+    def set_base(self, comment="On initialise la solution de base."):
+        if any(value < -self.tolerance for value in self.rhs) and not self.dual_simplex:
+            raise NotImplementedError("can't solve problems not satisfying 0 sol")
+
+        self.etas = []
+        self.slots = list(range(len(self.rhs)))
+        self.beta = list(self.rhs)
+        self.base = [self.variables[idx] for idx in self.row_base]
+        self.out = [var for var in self.variables if var not in self.base]
+        self.update_solution()
+        self.comments = comment
+
+    def update_solution(self):
+        self.current_solution = {var: self._scalar(0) for var in self.out}
+        for idx, base_idx in enumerate(self.row_base):
+            self.current_solution[self.variables[base_idx]] = to_number(self.beta[idx])
+        self._complemented_values()
+
+    def _utility_value(self):
+        return to_number(self._objective_row()[1])
+
+    # méthode des deux phases : les coûts sont conservés sous leur forme initiale, les coûts
+    # réduits étant recalculés à partir de la base, changer de fonction utilité est immédiat
+
+    def start_phase_one(self, comment="On maximise $w$, l'opposé de la somme des variables artificielles."):
+        self.phase_two_utility = (self.cost, self.z0)
+        self.cost = [self._scalar(-1 if var in self.artificials else 0) for var in self.variables]
+        self.z0 = self._scalar(0)
+        self.objective_name = "w"
+        self.comments = comment
+
+    def _set_utility(self, utility):
+        self.cost, self.z0 = utility
+
+    def _utility_data(self, utility):
+        return [self._scalar(utility.coeff(var)) for var in self.variables], self._scalar(utility.constant)
+
+    def _change_rhs(self, delta, utility):
+        # les seconds membres d'origine sont conservés : il suffit de recalculer B^-1 b
+        self.rhs = [value + self._scalar(change) for value, change in zip(self.rhs, delta)]
+        self.beta = self.ftran(dict(enumerate(self.rhs)))
+
+    def _drop_row(self, idx):
+        self.base.remove(self.variables[self.row_base[idx]])
+        self.columns = [{(row if row < idx else row - 1): value for row, value in column.items() if row != idx} for column in self.columns]
+        del self.rhs[idx], self.comps[idx], self.row_base[idx], self.deviation[idx]
+        self.refactor()
+
+    def _drop_artificials(self):
+        # les variables artificielles sont les dernières colonnes : les indices des autres sont inchangés
+        keep = [j for j, var in enumerate(self.variables) if var not in self.artificials]
+        self.columns = [self.columns[j] for j in keep]
+        self.cost = [self.cost[j] for j in keep]
+        self.phase_two_utility = ([self.phase_two_utility[0][j] for j in keep], self.phase_two_utility[1])
+        self.deviation = [deviation if deviation in keep else None for deviation in self.deviation]
+        for var in self.artificials:
+            self.variables.remove(var)
+            if var in self.out:
+                self.out.remove(var)
+
+    def _reduced_costs(self, variables):
+        """
+        coûts réduits calculés sur les colonnes creuses à partir des variables duales
+        """
+        duals = self._duals()
+        index = {var: j for j, var in enumerate(self.variables)}
+        return [self._reduced_cost(duals, index[var]) for var in variables]
+
+    def get_pivot_line(self, variable):
+        column = self.variables.index(variable)
+        alpha = self.ftran(self.columns[column])
+        self._entering = (column, alpha)
+
+        best_value = inf
+        best_index = -1
+        ratios = []
+        var_constraints, std_var_constraints = [], []
+        for idx, (coeff, scalar) in enumerate(zip(alpha, self.beta)):
+            var_constraints.append(RenderedConstraint(lambda coeff=coeff, scalar=scalar: Constraint(LinearForm(to_number(scalar), {variable: -to_number(coeff)}), "GEQ", 0)))
+            if coeff > self.tolerance:
+                ratio = scalar / coeff
+                ratios.append(ratio)
+                if ratio < best_value:
+                    best_value = ratio
+                    best_index = idx
+                std_var_constraints.append(RenderedConstraint(lambda ratio=ratio: Constraint(LinearForm.variable(variable), "LEQ", to_number(ratio))))
+            else:
+                ratios.append(inf)
+                std_var_constraints.append(RenderedConstraint(lambda: Constraint(LinearForm.variable(variable), "GEQ", 0)))
+
+        return var_constraints, std_var_constraints, self._bounded_row(variable, alpha, self.beta, ratios, best_index, var_constraints, std_var_constraints)
+
+    def _complement(self, variable, new_name, bound):
+        """
+        colonne j de variable = bound - new_name : rhs -= bound a_j, puis la colonne change de signe
+        hors base, B^-1 est inchangée ; en base, la colonne de B change de signe et on refactorise
+        """
+        j = self.variables.index(variable)
+        bound = self._scalar(bound)
+        alpha = None if j in self.row_base else self._tableau_column(variable)
+        for row, value in self.columns[j].items():
+            self.rhs[row] -= value * bound
+        self.columns[j] = {row: -value for row, value in self.columns[j].items()}
+        self.z0 = self.z0 + self.cost[j] * bound
+        self.cost = [-value if column == j else value for column, value in enumerate(self.cost)]
+        if self.phase_two_utility is not None:
+            cost, z0 = self.phase_two_utility
+            self.phase_two_utility = ([-value if column == j else value for column, value in enumerate(cost)], z0 + cost[j] * bound)
+        self._entering = (None,)
+        if alpha is None:
+            self.refactor()
+        else:
+            self.beta = [value - coeff * bound for value, coeff in zip(self.beta, alpha)]
+
+    def _append_row(self, coefficients, value, slack):
+        # colonnes d'origine : la ligne n'a pas à être exprimée en fonction des variables hors base
+        idx = len(self.rhs)
+        for column, coeff in zip(self.columns, coefficients):
+            if coeff != 0:
+                column[idx] = self._scalar(coeff)
+        self.row_base.append(len(self.columns))
+        self.columns.append({idx: self._scalar(1)})
+        self.cost.append(self._scalar(0))
+        self.rhs.append(self._scalar(value))
+        self.deviation.append(self.row_base[-1])
+        self.comps.append("EQ")
+        self._entering = (None,)
+        self.refactor()
+
+    def set_in_base(self, variable, idx, comment="\nOn fait entrer la variable ${variable}$ dans la base."):
+        if self.leaving_bound:
+            self.leaving_bound = False
+            self.complement(self._base_variable(idx))
+        self.pricing.update(self, variable, idx)
+        column = self.variables.index(variable)
+        if getattr(self, "_entering", (None,))[0] == column:
+            alpha = self._entering[1]
+        else:
+            alpha = self.ftran(self.columns[column])
+        leaving = self.row_base[idx]
+        out_var = self.variables[leaving]
+
+        self.beta[idx] = self.beta[idx] / alpha[idx]
+        self.row_base[idx] = column
+        self.pending = (column, idx, leaving, alpha)
+
+        self.comments = comment.format(variable=variable, idx=idx)
+        self.out.remove(variable)
+        self.out.append(out_var)
+        self.base.append(variable)
+        self.base.remove(out_var)
+        self.update_solution()
+
+    def apply_subs(self, comment="\nOn développe et on réduit."):
+        if self.pending is not None:
+            column, idx, leaving, alpha = self.pending
+            theta = self.beta[idx]
+            for row, value in enumerate(alpha):
+                if row != idx and value != 0:
+                    self.beta[row] -= value * theta
+            self.etas.append(self._eta(alpha, idx))
+            self.pending = None
+            self._entering = (None,)
+            self.nb_pivots += 1
+            if self.nb_pivots % self.refactor_every == 0:
+                self.refactor()
+
+        self.update_solution()
+        self.comments = comment
@@ -0,0 +1,234 @@
+"""
+serveur de résolution : un processus de longue durée qui répond en HTTP, sur localhost ou sur
+une socket unix, pour éviter à chaque requête le démarrage de python et l'import de sympy
+
+    POST /solve?engine=fraction&pricing=dantzig   -> résultats json (comme --format json)
+    POST /pdf?engine=fraction                     -> correction au format pdf
+    POST /pdf?format=tex                          -> source latex de la correction, sans compilation
+    GET  /health                                  -> état du serveur
+
+le corps d'une requête POST est un problème json (schéma de load_from_json) ou une liste de
+problèmes. Les requêtes sont exécutées par des processus de travail démarrés une fois pour toutes
+(sympy, pylatex et le template déjà chargés) ; au-delà de queue_size requêtes en cours ou en
+attente, le serveur répond 503.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import urlsplit, parse_qs
+import json
+import os
+import tempfile
+import threading
+import time
+
+from loader import ENGINES, get_engine, lin_prog_from_json
+from pricing import PRICINGS
+
+
+def warm_up():
+    """
+    initialisation des processus de travail : imports et template chargés avant la première requête
+    """
+    import sympy
+    import pylatex
+    import numpy
+    from simplex import default_template
+    default_template()
+
+
+def _lin_progs(problems, engine, pricing):
+    factory = get_engine(engine, pricing=pricing)
+    return [lin_prog_from_json(pl, engine=factory) for pl in problems]
+
+
+def solve_problems(problems, engine="sympy", pricing="dantzig"):
+    from solver import solve_all
+    return solve_all(_lin_progs(problems, engine, pricing))
+
+
+def render_problems(problems, engine="sympy", pricing="dantzig", output="pdf", cache_dir=None, build_dir=None, use_format=True):
+    """
+    correction des problèmes : octets du pdf, ou source latex si output vaut "tex"
+    la compilation passe par LatexCompiler, comme en ligne de commande : chaque processus de
+    travail a son propre dossier de travail (format précompilé et unités déjà compilées réutilisés
+    d'une requête à l'autre), sauf sans build_dir
+    """
+    from simplex import build_document
+    from cache import FragmentCache
+    from compiler import LatexCompiler
+
+    cache = FragmentCache(cache_dir) if cache_dir else None
+    doc = build_document(_lin_progs(problems, engine, pricing), cache=cache)
+    if output == "tex":
+        return doc.dumps().encode("utf-8")
+    with tempfile.TemporaryDirectory() as directory:
+        worker_dir = os.path.join(build_dir, f"worker-{os.getpid()}") if build_dir else os.path.join(directory, "build")
+        name = os.path.join(directory, "simplex")
+        LatexCompiler(build_dir=worker_dir, use_format=use_format).generate_pdf(doc, name)
+        with open(name + ".pdf", "rb") as f:
+            return f.read()
+
+
+class SolverService:
+    """
+    processus de travail et limite de requêtes simultanées
+    """
+
+    def __init__(self, workers=1, queue_size=16, cache_dir=None, build_dir=None, use_format=True):
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.cache_dir = cache_dir
+        self.build_dir = build_dir
+        self.use_format = use_format
+        self.started = time.time()
+        # compteurs mis à jour par les threads des requêtes
+        self.counters = threading.Lock()
+        self.served = 0
+        self.rejected = 0
+        # démarre les processus de travail sans attendre la première requête
+        for _ in range(workers):
+            self.executor.submit(int)
+
+    def run(self, function, *args, **kwargs):
+        """
+        exécute function dans un processus de travail, None si la file est pleine
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.counters:
+                self.rejected += 1
+            return None
+        try:
+            result = self.executor.submit(function, *args, **kwargs).result()
+            with self.counters:
+                self.served += 1
+            return result
+        finally:
+            self.slots.release()
+
+    def health(self):
+        with self.counters:
+            served, rejected = self.served, self.rejected
+        return {
+            "status" : "ok",
+            "workers" : self.workers,
+            "queue_size" : self.queue_size,
+            "served" : served,
+            "rejected" : rejected,
+            "uptime" : round(time.time() - self.started, 3),
+            }
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    # connexions persistantes : un client peut enchaîner les requêtes sans nouvelle connexion
+    protocol_version = "HTTP/1.1"
+    # écritures tamponnées : en-têtes et corps d'une petite réponse partent en une seule écriture,
+    # deux segments tcp sur une connexion persistante attendant l'acquittement retardé du client
+    # (~40 ms par requête)
+    wbufsize = 1 << 16
+    service = None
+
+    def address_string(self):
+        # une socket unix n'a pas d'adresse client
+        return self.client_address[0] if self.client_address else "unix"
+
+    def send_body(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = (json.dumps(body, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.wfile.flush()
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self.send_body(200, self.service.health())
+        else:
+            self.send_body(404, {"error" : "unknown path"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if url.path not in ("/solve", "/pdf"):
+            self.send_body(404, {"error" : "unknown path"})
+            return
+
+        engine = query.get("engine", "sympy")
+        pricing = query.get("pricing", "dantzig")
+        output = query.get("format", "pdf")
+        for name, value, choices in (("engine", engine, ENGINES), ("pricing", pricing, PRICINGS), ("format", output, ("pdf", "tex"))):
+            if value not in choices:
+                self.send_body(400, {"error" : f"unknown {name} {value}, expected one of {list(choices)}"})
+                return
+
+        try:
+            problems = json.loads(body)
+        except ValueError as error:
+            self.send_body(400, {"error" : f"invalid json: {error}"})
+            return
+        if isinstance(problems, dict):
+            problems = [problems]
+
+        try:
+            if url.path == "/solve":
+                result = self.service.run(solve_problems, problems, engine, pricing)
+            else:
+                result = self.service.run(render_problems, problems, engine, pricing, output, self.service.cache_dir,
+                                          self.service.build_dir, self.service.use_format)
+        except (SyntaxError, KeyError, TypeError, ValueError) as error:
+            self.send_body(400, {"error" : f"invalid problem: {error!r}"})
+            return
+        except Exception as error:
+            self.send_body(500, {"error" : repr(error)})
+            return
+
+        if result is None:
+            self.send_body(503, {"error" : "server busy, retry later"})
+        elif url.path == "/solve":
+            self.send_body(200, result)
+        else:
+            self.send_body(200, result, "application/x-tex" if output == "tex" else "application/pdf")
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+
+    daemon_threads = True
+
+
+def serve(host="127.0.0.1", port=8765, socket_path=None, workers=1, queue_size=16, cache_dir=None, build_dir=None, use_format=True):
+    """
+    démarre le serveur, jusqu'à interruption (Ctrl+C)
+    """
+    service = SolverService(workers=workers, queue_size=queue_size, cache_dir=cache_dir, build_dir=build_dir, use_format=use_format)
+    handler = type("Handler", (RequestHandler,), {"service" : service, "disable_nagle_algorithm" : not socket_path})
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, handler)
+        address = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        address = f"http://{host}:{port}"
+
+    print(f"Serving on {address} with {workers} worker(s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -1,220 +1,576 @@
 """
 petit script d'implémentation de la méthode du simplexe avec visualisation
 
+pylatex n'est importé que dans les fonctions de rendu, et le template par défaut n'est lu
+qu'à sa première utilisation
 """
 
-import re
-from itertools import chain, count
-from math import inf
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from fractions import Fraction
+from functools import lru_cache, partial
 import json
+from math import isinf
+import os
 
-import sympy
+from linear_form import latex_variable
+from linear_program import LinProg
+from loader import load_from_json, parse_linear_program
+from cache import fragment_key
 
-from pylatex import Document, Section, Subsection
-from pylatex.utils import NoEscape
-from pylatex.basic import NewLine
+# template par défaut, à côté des modules (et non dans le dossier courant)
+DEFAULT_TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
 
-from constraint import Constraint
-from linear_program import LinProg
 
+def load_template(filename):
+
+    with open(filename, 'r', encoding="utf-8") as f:
+        data = json.load(f)
+    return data
+
+@lru_cache(maxsize=None)
+def default_template():
+    return load_template(DEFAULT_TEMPLATE_FILE)
+
+def __getattr__(name):
+    # compatibilité : simplex.DEFAULT_TEMPLATE est lu à la demande
+    if name == "DEFAULT_TEMPLATE":
+        return default_template()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def load_from_json(filename):
+def lin_prog_latex(lin_prog, template=None):
     """
-    load lienar programs from json fils. Simple is json.pl
+    résout un programme linéaire et renvoie le code latex de sa section
+    utilisé par les processus de multi_solve : une chaîne se transmet sans difficulté entre processus
     """
-    all_pl = []
-    with open(filename, 'r') as f:
-        pl_data = json.load(f)
+    return "".join(lin_prog_fragments(lin_prog, template=template))
 
-    for pl in pl_data:
-        variables = [sympy.Symbol(v) for v in pl["variables"]]
-        utility = sympy.sympify(pl["utility"])
+def multi_solve(pl_list, doc=None, name="simplex_example", workers=1, template=None, cache=None, compiler=None, split=False, stream=False, progress=None):
+    """
+    résout tous les programmes de pl_list et génère un unique pdf
+    compiler : LatexCompiler utilisé pour la compilation (par défaut, dossier de travail .simplex_build)
+    avec split, chaque problème est compilé séparément (en parallèle) puis les pdf sont assemblés
+    avec stream, les problèmes sont résolus l'un après l'autre et le fichier .tex est écrit au fur
+    et à mesure (voir write_document), sans construire le document en mémoire
+    """
+    from pylatex.utils import dumps_list
+    from compiler import LatexCompiler
 
-        constraints = []
-        for c in pl["constraints"]:
-            if "<=" in c:
-                l_part, r_part = c.split("<=")
-                comp = "LEQ"
-            elif ">=" in c:
-                l_part, r_part = c.split(">=")
-                comp = "GEQ"
-            else:
-                l_part, r_part = c.split("=")
-                comp = "EQ"
-            l_part = sympy.sympify(l_part.strip())
-            r_part = sympy.sympify(r_part.strip())
-            constraint_variables = set(filter(lambda x:isinstance(x, sympy.Symbol), chain(l_part.atoms(), r_part.atoms())))
-            if constraint_variables.issubset(set(variables)):
-                constraints.append((l_part, comp, r_part))
-            else:
-                raise SyntaxError(f"undeclared variable found while parsing constraint on line {line}")
+    compiler = compiler or LatexCompiler(workers=workers)
 
-        optimizer = pl["optimizer"]
-        title = pl.get("title", "")
-        description = pl.get("description", "")
+    if stream and not split:
+        with open(name + ".tex", 'w', encoding="utf-8") as f:
+            write_document(pl_list, f, doc=doc, template=template, cache=cache, progress=progress)
+        compiler.compile_tex(name)
+        return
 
-        new_prog = LinProg()
-        new_prog.from_dict({
-            "title" : title,
-            "description": description,
-            "variables" : variables,
-            "utility" : utility,
-            "optimizer" : optimizer,
-            "constraints" : constraints,
-            })
-        all_pl.append(new_prog)
+    doc = build_document(pl_list, doc=doc, workers=workers, template=template, cache=cache)
 
-    return all_pl
+    units = None
+    if split and len(pl_list) > 1:
+        # le contenu déjà présent dans doc accompagne la première section
+        head = len(doc.data) - len(pl_list)
+        units = [dumps_list(doc.data[:head + 1])]
+        for idx, section in enumerate(doc.data[head + 1:], 1):
+            # numérotation des sections continue d'une unité à l'autre
+            units.append(f"\\setcounter{{section}}{{{idx}}}%\n" + dumps_list([section]))
 
+    compiler.generate_pdf(doc, name, units=units)
 
-def parse_linear_program(multiline_string):
+def build_document(pl_list, doc=None, workers=1, template=None, cache=None):
+    """
+    document latex (pylatex) des corrections de tous les programmes de pl_list
+    avec workers > 1, chaque problème est résolu dans un processus séparé, les sections
+    sont ensuite ajoutées au document dans l'ordre de pl_list
+    avec un cache (cache.FragmentCache), seuls les problèmes modifiés depuis le dernier appel sont résolus
+    """
+    from pylatex import Document
+    from pylatex.utils import NoEscape
 
-    variables = []
-    utility = None
-    optimizer = None
-    constraints = []
-    state = 'init'
-    for idx, line in enumerate(multiline_string.split('\n')):
+    template = template or default_template()
+    if doc is None:
+        doc = Document(geometry_options={"margin" : "1.5cm"})
 
-        if line.strip() == '':
-            continue
-        elif state == 'init':
-
-            if "var:" in line:
-                for variable in line.split("var:")[1].split(","):
-                    variables.append(sympy.Symbol(variable.strip()))
-            elif "max" in line:
-                utility = sympy.sympify(line.split("=")[1])
-                optimizer = "max"
-            elif "min" in line:
-                utility = sympy.sympify(line.split("=")[1])
-                optimizer = "min"
-            elif "sc" in line:
-                state = 'constraints'
-        else:
-            if "<=" in line:
-                l_part, r_part = line.split("<=")
-                comp = "LEQ"
-            elif ">=" in line:
-                l_part, r_part = line.split(">=")
-                comp = "GEQ"
-            else:
-                l_part, r_part = line.split("=")
-                comp = "EQ"
-            l_part = sympy.sympify(l_part.strip())
-            r_part = sympy.sympify(r_part.strip())
-            constraint_variables = set(filter(lambda x:isinstance(x, sympy.Symbol), chain(l_part.atoms(), r_part.atoms())))
+    if cache is not None:
+        keys = [fragment_key(pl, template) for pl in pl_list]
+        sections = [cache.get(key) for key in keys]
+    else:
+        sections = [None] * len(pl_list)
+    missing = [idx for idx, section in enumerate(sections) if section is None]
+
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            computed = executor.map(partial(lin_prog_latex, template=template), [pl_list[idx] for idx in missing])
+            for idx, section in zip(missing, computed):
+                sections[idx] = section
+    else:
+        for idx in missing:
+            sections[idx] = lin_prog_latex(pl_list[idx], template=template)
 
+    if cache is not None:
+        for idx in missing:
+            cache.put(keys[idx], sections[idx])
 
-            if constraint_variables.issubset(set(variables)):
-                constraints.append((l_part, comp, r_part))
-            else:
-                raise SyntaxError(f"undeclared variable found while parsing constraint on line {line}")
+    for section in sections:
+        doc.append(NoEscape(section))
 
-    return {
-        "variables" : variables,
-        "utility" : utility,
-        "optimizer" : optimizer,
-        "constraints" : constraints,
-        }
+    return doc
 
+class LatexStream:
+    """
+    latex écrit au fil de l'eau, identique à celui de sections pylatex imbriquées : les éléments
+    d'un conteneur sont séparés par "%\n" et les retours à la ligne qui terminent une section sont
+    remplacés par une ligne vide (Section.end_paragraph)
+    """
 
+    def __init__(self):
+        self._first = [True]
+        # retours à la ligne finaux retenus : une fin de section les remplace
+        self._newlines = ""
+
+    def _write(self, latex):
+        text = self._newlines + latex
+        stripped = text.rstrip("\n")
+        self._newlines = text[len(stripped):]
+        return stripped
+
+    def text(self, latex):
+        separator = "" if self._first[-1] else "%\n"
+        self._first[-1] = False
+        return self._write(separator + latex)
+
+    def open(self, section):
+        """
+        en-tête d'une section pylatex vide, les fragments suivants forment son contenu
+        """
+        fragment = self.text(section.dumps())
+        self._first.append(True)
+        return fragment
+
+    def close(self):
+        self._first.pop()
+        self._newlines = "\n\n"
+
+    def finish(self):
+        text, self._newlines = self._newlines, ""
+        return text
+
+def simplex_iterations(lin_prog, out, template=None, title="{i}e itération de l'algorithme"):
+    """
+    itérations du simplexe jusqu'à l'optimum de la fonction utilité courante, une sous-section par pivot
+    génère les fragments latex (out : LatexStream), la valeur de retour est False si le problème n'est pas borné
+    """
+    from pylatex import Subsection
 
+    template = template or default_template()
+    in_var = lin_prog.get_incoming_variable()
+    nb_iter = 0
 
-def multi_solve(pl_list, doc=None, name="simplex_example"):
-    if doc is None:
-        doc = Document(geometry_options={"margin" : "1.5cm"})
+    while in_var is not None:
+        nb_iter += 1
 
-    for pl in pl_list:
-        lin_prog_solve(pl, doc=doc)
+        yield out.open(Subsection(title.format(i=nb_iter)))
 
-    doc.generate_pdf(name, clean_tex=False)
+        yield out.text(template["in_var"].format(var=latex_variable(in_var)))
 
-def load_template(filename):
+        constraints, std_constraints, pivot_idx = lin_prog.get_pivot_line(in_var)
 
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    return data
+        prefix = r"""
+                \[
+                \begin{array}{lll}"""
 
-# TODO: déplacer ça et gérer autrement les valeurs par défaut
-DEFAULT_TEMPLATE = load_template("config.json")
+        suffix = r"""
+                \end{array}
+                \]"""
 
-def lin_prog_solve(lin_prog, doc=None, generate_pdf=False, template=DEFAULT_TEMPLATE):
+        yield out.text(prefix)
+        for constraint, std_constraint in zip(constraints, std_constraints):
+            yield out.text(constraint.latex() + r""" & \rightarrow & """ + std_constraint.latex() + r"""\\""")
+        yield out.text(suffix)
+
+        if pivot_idx is None:
+            # simplexe à variables bornées : la variable entrante atteint sa borne, sans pivot
+            bound = latex_number(lin_prog.bound(in_var))
+            new_name = lin_prog.complement(in_var, comment="")
+            yield out.text(template["bound_flip"].format(var=latex_variable(in_var), bound=bound, new=latex_variable(new_name)))
+            yield out.text(lin_prog.to_latex(comments=True))
+            out.close()
+            in_var = lin_prog.get_incoming_variable()
+            continue
 
-    if doc is None:
-        doc = Document(geometry_options={"margin" : "1.5cm"})
+        if pivot_idx < 0:
+            yield out.text(template["unbounded"].format(var=latex_variable(in_var)))
+            out.close()
+            return False
 
+        yield out.text(template["out_var"].format(pivot=std_constraints[pivot_idx].latex(), pivot_line=lin_prog.constraints[pivot_idx].latex()))
 
-    with doc.create(Section(lin_prog.title)):
+        if lin_prog.leaving_bound:
+            out_var = lin_prog._base_variable(pivot_idx)
+            yield out.text(template["leaving_bound"].format(var=latex_variable(out_var), bound=latex_number(lin_prog.bound(out_var))))
 
-        doc.append(NoEscape(lin_prog.description))
+        lin_prog.set_in_base(in_var, pivot_idx)
+        yield out.text(lin_prog.to_latex(comments=True))
 
-        # énoncé initial
-        with doc.create(Subsection(template["setup"])):
+        lin_prog.apply_subs(comment=template["subs"])
+        yield out.text(lin_prog.to_latex(comments=True))
 
-            latex = lin_prog.to_latex()
-            doc.append(NoEscape(latex))
+        out.close()
+        in_var = lin_prog.get_incoming_variable()
 
-        # passage sous forme canonique
-        with doc.create(Subsection(template["canonize"]["title"])):
-            lin_prog.canonical_form(to_max=template["canonize"]["to_max"], comment=template["canonize"]["description"])
-            latex = lin_prog.to_latex(comments=True)
-            doc.append(NoEscape(latex))
+    return True
 
-        with doc.create(Subsection(template["add_deviation"]["title"])):
-            lin_prog.pre_standard_form(comment=template["add_deviation"]["description"])
-            latex = lin_prog.to_latex(comments=True)
-            doc.append(NoEscape(latex))
+def dual_simplex_iterations(lin_prog, out, template=None):
+    """
+    itérations du simplexe dual jusqu'à une solution de base réalisable, une sous-section par pivot
+    génère les fragments latex (out : LatexStream), la valeur de retour est False si le problème
+    n'a pas de solution réalisable
+    """
+    from pylatex import Subsection
+
+    template = template or default_template()
+    dual = template["dual_simplex"]
+    nb_iter = 0
+
+    while True:
+        complemented = lin_prog.complement_over_bounds(comment="")
+        row = lin_prog.get_leaving_row()
+        if row is None and not complemented:
+            break
+        nb_iter += 1
+
+        yield out.open(Subsection(dual["iteration"].format(i=nb_iter)))
+
+        if complemented:
+            # variables bornées : les variables de base au-dessus de leur borne sont complémentées
+            for variable, new_name in complemented:
+                yield out.text(dual["bound"].format(var=latex_variable(variable), bound=latex_number(lin_prog.bound(new_name)), new=latex_variable(new_name)))
+            yield out.text(lin_prog.to_latex(comments=True))
+            if row is None:
+                out.close()
+                break
+
+        out_var = lin_prog._base_variable(row)
+        yield out.text(dual["out_var"].format(var=latex_variable(out_var), value=latex_number(lin_prog.current_solution[out_var])))
+
+        in_var, ratios = lin_prog.get_dual_entering(row)
+        if in_var is None:
+            yield out.text(dual["infeasible"].format(var=latex_variable(out_var)))
+            out.close()
+            return False
+
+        yield out.text(dual["ratios"].format(pivot_line=lin_prog.constraints[row].latex()))
+        yield out.text(r"""
+                \[
+                \begin{array}{lll}""")
+        for var, ratio in ratios.items():
+            yield out.text(latex_variable(var) + r""" & : & """ + latex_number(ratio) + r"""\\""")
+        yield out.text(r"""
+                \end{array}
+                \]""")
+        yield out.text(dual["in_var"].format(var=latex_variable(in_var)))
 
-        with doc.create(Subsection(template["standard_form"]["title"])):
-            lin_prog.standard_form(comment=template["standard_form"]["description"])
-            latex = lin_prog.to_latex(comments=True)
-            doc.append(NoEscape(latex))
+        lin_prog.set_in_base(in_var, row)
+        yield out.text(lin_prog.to_latex(comments=True))
 
-        with doc.create(Subsection(template["initial_base"]["title"])):
+        lin_prog.apply_subs(comment=template["subs"])
+        yield out.text(lin_prog.to_latex(comments=True))
 
-            lin_prog.set_base(comment=template["initial_base"]["description"])
-            doc.append(NoEscape(lin_prog.view_solution()))
+        out.close()
 
-        in_var = lin_prog.get_incoming_variable()
-        nb_iter = 0
+    yield out.text(dual["end"])
+    return True
 
-        while in_var is not None:
-            nb_iter += 1
+def latex_number(value):
+    """
+    code latex d'un nombre exact ou flottant, ou d'une borne infinie
+    """
+    import sympy
 
-            with doc.create(Subsection(template["iteration"]["title"].format(i=nb_iter))):
+    if isinf(value):
+        return r"+\infty" if value > 0 else r"-\infty"
+    if isinstance(value, Fraction):
+        return sympy.latex(sympy.Rational(value.numerator, value.denominator))
+    return sympy.latex(sympy.sympify(value))
 
-                doc.append(NoEscape(template["in_var"].format(var=sympy.latex(in_var))))
+def latex_interval(lower, upper):
+    return ("]" if isinf(lower) else "[") + f"{latex_number(lower)} ; {latex_number(upper)}" + ("[" if isinf(upper) else "]")
 
-                constraints, std_constraints, pivot_idx = lin_prog.get_pivot_line(in_var)
+def latex_table(header, rows):
+    lines = [r"\begin{tabular}{l" + "c" * (len(header) - 1) + "}", r"\hline", " & ".join(header) + r" \\", r"\hline"]
+    lines += [" & ".join(row) + r" \\" for row in rows]
+    lines += [r"\hline", r"\end{tabular}"]
+    return "\n".join(lines) + "\n"
 
-                prefix = r"""
-                \[
-                \begin{array}{lll}"""
+def sensitivity_latex(lin_prog, template):
+    """
+    tableaux de l'analyse de sensibilité (LinProg.sensitivity) d'un programme résolu
+    template : partie "sensitivity" du template
+    """
+    from constraint import Constraint
+
+    report = lin_prog.sensitivity()
+    problem = lin_prog.problem
+    if lin_prog.presolve is not None:
+        # contraintes et variables d'origine
+        report = lin_prog.presolve.postsolve_sensitivity(report, lin_prog.tolerance)
+        problem = lin_prog.presolve.problem
+    constraints = [[
+        f"${Constraint(*problem['constraints'][row['index']]).latex()}$",
+        f"${latex_number(row['slack'])}$",
+        f"${latex_number(row['shadow_price'])}$",
+        f"${latex_interval(*row['rhs_range'])}$",
+        ] for row in report["constraints"]]
+    variables = [[
+        f"${latex_variable(row['name'])}$",
+        f"${latex_number(row['value'])}$",
+        f"${latex_number(row['reduced_cost'])}$",
+        f"${latex_interval(*row['cost_range'])}$",
+        ] for row in report["variables"]]
+    return template["description"] + "\n" + latex_table(template["constraints"], constraints) + "\n" + latex_table(template["variables"], variables)
+
+def presolve_latex(result, template):
+    """
+    étapes d'une pré-résolution (presolve.Presolve), une par ligne
+    template : partie "presolve" du template
+    """
+    from constraint import Constraint, COMP
+
+    items = []
+    for kind, data in result.log:
+        fields = dict(data)
+        for key in ("constraint", "other"):
+            if key in fields:
+                fields[key] = Constraint(*result.problem["constraints"][fields[key]]).latex()
+        for key in ("var", "name"):
+            if key in fields:
+                fields[key] = latex_variable(fields[key])
+        if "value" in fields:
+            fields["value"] = latex_number(fields["value"])
+        if "comp" in fields:
+            fields["comp"] = COMP[fields["comp"]]
+        items.append(r"\item " + template[kind].format(**fields))
+
+    lines = [template["description"]]
+    if items:
+        lines += [r"\begin{itemize}"] + items + [r"\end{itemize}"]
+    if result.status == "reduced":
+        lines.append(template["reduced"])
+    return "\n".join(lines) + "\n"
+
+def branch_and_bound_latex(result, template):
+    """
+    séparation et évaluation (branch_and_bound.BranchAndBound) après la relaxation continue, avec
+    l'arbre des nœuds si le template l'active
+    template : partie "branch_and_bound" du template
+    """
+    from constraint import COMP
 
-                suffix = r"""
-                \end{array}
-                \]"""
+    def solution_latex():
+        return ", ".join(f"{latex_variable(var)} = {latex_number(value)}" for var, value in result.solution().items())
 
-                doc.append(NoEscape(prefix))
-                for constraint, std_constraint in zip(constraints, std_constraints):
-                    doc.append(NoEscape(constraint.latex() + r""" & \rightarrow & """ + std_constraint.latex() + r"""\\"""))
-                doc.append(NoEscape(suffix))
+    lines = [template["description"].format(variables=", ".join(latex_variable(var) for var in result.lin_prog.integer))]
+    if result.incumbent is result.nodes[0]:
+        lines.append(template["integral"])
+        return "\n".join(lines) + "\n"
 
-                doc.append(NoEscape(template["out_var"].format(pivot=std_constraints[pivot_idx].latex(), pivot_line=lin_prog.constraints[pivot_idx].latex())))
+    if template["tree"]:
+        items = []
+        for node in result.nodes:
+            if node.parent is None:
+                text = template["root"].format(index=node.index)
+            else:
+                var, comp, value = node.branch
+                text = template["child"].format(index=node.index, parent=node.parent.index, branch=f"{latex_variable(var)} {COMP[comp]} {value}")
+            if node.status == "branched":
+                text += template["branched"].format(objective=latex_number(node.objective), var=latex_variable(node.branching[0]), value=latex_number(node.branching[1]))
+            elif node.status == "integer":
+                solution = ", ".join(f"{latex_variable(var)} = {latex_number(node_value)}" for var, node_value in node.solution.items())
+                text += template["integer"].format(objective=latex_number(node.objective), solution=solution)
+                if node is result.incumbent:
+                    text += template["best"]
+            elif node.status == "pruned":
+                bound = node.objective if node.objective is not None else node.bound * result.sense
+                text += template["pruned"].format(bound=latex_number(bound))
+            else:
+                text += template[node.status]
+            items.append(r"\item " + text)
+        lines += [template["tree_title"], r"\begin{itemize}"] + items + [r"\end{itemize}"]
+
+    fields = {"nodes" : result.evaluated}
+    if result.incumbent is not None:
+        fields.update(solution=solution_latex(), objective=latex_number(result.incumbent.objective))
+    if result.status == "optimal":
+        lines.append(template["result"].format(**fields))
+    elif result.status == "infeasible":
+        lines.append(template["infeasible_result"].format(**fields))
+    elif result.incumbent is not None:
+        lines.append(template["node_limit"].format(bound=latex_number(result.bound()), gap=result.gap(), **fields))
+    else:
+        lines.append(template["node_limit_none"].format(**fields))
+    return "\n".join(lines) + "\n"
 
-                lin_prog.set_in_base(in_var, pivot_idx)
-                latex = lin_prog.to_latex(comments=True)
-                doc.append(NoEscape(latex))
+def lin_prog_fragments(lin_prog, template=None):
+    """
+    résout un programme linéaire et génère le code latex de sa section, fragment par fragment,
+    au fur et à mesure du calcul : la concaténation des fragments est la section complète
+    """
+    from pylatex import Section, Subsection
+
+    template = template or default_template()
+    out = LatexStream()
+
+    yield out.open(Section(lin_prog.title))
+
+    yield out.text(lin_prog.description)
+
+    # énoncé initial, puis pré-résolution si elle a été appliquée et si le template la détaille
+    # (toujours quand elle montre que le problème n'est pas réalisable)
+    presolve = lin_prog.presolve
+    narrate = presolve is not None and "presolve" in template and (template["presolve"]["enabled"] or presolve.status == "infeasible")
+    yield out.open(Subsection(template["setup"]))
+    yield out.text((presolve.original() if narrate else lin_prog).to_latex())
+    out.close()
+
+    if narrate:
+        yield out.open(Subsection(template["presolve"]["title"]))
+        yield out.text(presolve_latex(presolve, template["presolve"]))
+        if presolve.status == "reduced":
+            yield out.text(lin_prog.to_latex())
+        out.close()
+
+    if presolve is not None and presolve.status == "infeasible":
+        out.close()
+        yield out.finish()
+        return
+
+    # passage sous forme canonique
+    yield out.open(Subsection(template["canonize"]["title"]))
+    lin_prog.canonical_form(to_max=template["canonize"]["to_max"], comment=template["canonize"]["description"])
+    yield out.text(lin_prog.to_latex(comments=True))
+    out.close()
+
+    yield out.open(Subsection(template["add_deviation"]["title"]))
+    lin_prog.pre_standard_form(comment=template["add_deviation"]["description"])
+    yield out.text(lin_prog.to_latex(comments=True))
+    out.close()
+
+    # base initiale dual réalisable : simplexe dual, sans variables artificielles (si le template
+    # le détaille)
+    if "dual_simplex" in template and lin_prog.needs_dual_simplex():
+        lin_prog.start_dual_simplex()
+    elif lin_prog.needs_artificials():
+        yield out.open(Subsection(template["add_artificial"]["title"]))
+        lin_prog.add_artificials(comment=template["add_artificial"]["description"])
+        yield out.text(lin_prog.to_latex(comments=True))
+        out.close()
+
+    yield out.open(Subsection(template["standard_form"]["title"]))
+    lin_prog.standard_form(comment=template["standard_form"]["description"])
+    yield out.text(lin_prog.to_latex(comments=True))
+    out.close()
+
+    yield out.open(Subsection(template["initial_base"]["title"]))
+    lin_prog.set_base(comment=template["initial_base"]["description"])
+    yield out.text(lin_prog.view_solution())
+    out.close()
+
+    feasible = True
+    if lin_prog.dual_simplex:
+        yield out.open(Subsection(template["dual_simplex"]["title"]))
+        yield out.text(template["dual_simplex"]["description"])
+        out.close()
+
+        feasible = yield from dual_simplex_iterations(lin_prog, out, template)
+
+    elif lin_prog.artificials:
+        yield out.open(Subsection(template["phase_one"]["title"]))
+        lin_prog.start_phase_one(comment=template["phase_one"]["description"])
+        yield out.text(lin_prog.to_latex(comments=True))
+        out.close()
+
+        yield from simplex_iterations(lin_prog, out, template, title=template["phase_one"]["iteration"])
+
+        yield out.open(Subsection(template["phase_one_end"]["title"]))
+        feasible = lin_prog.end_phase_one(comment=template["phase_one_end"]["description"], infeasible=template["phase_one_end"]["infeasible"])
+        if feasible:
+            yield out.text(lin_prog.to_latex(comments=True))
+        else:
+            yield out.text(lin_prog.comments)
+        out.close()
+
+    if feasible and (yield from simplex_iterations(lin_prog, out, template, title=template["iteration"]["title"])):
+        yield out.text(template["end"])
+
+        # analyse de sensibilité, si le template l'active
+        if template.get("sensitivity", {}).get("enabled"):
+            yield out.open(Subsection(template["sensitivity"]["title"]))
+            yield out.text(sensitivity_latex(lin_prog, template["sensitivity"]))
+            out.close()
+
+        # programme en nombres entiers : séparation et évaluation à partir de la relaxation résolue
+        if lin_prog.integer and "branch_and_bound" in template:
+            from branch_and_bound import BranchAndBound
 
-                lin_prog.apply_subs(comment=template["subs"])
-                latex = lin_prog.to_latex(comments=True)
-                doc.append(NoEscape(latex))
+            result = BranchAndBound(lin_prog, **lin_prog.branching).run(solved=True)
+            yield out.open(Subsection(template["branch_and_bound"]["title"]))
+            yield out.text(branch_and_bound_latex(result, template["branch_and_bound"]))
+            out.close()
+
+    out.close()
+    yield out.finish()
+
+def lin_prog_solve(lin_prog, doc=None, generate_pdf=False, template=None):
+    from pylatex import Document
+    from pylatex.utils import NoEscape
+
+    if doc is None:
+        doc = Document(geometry_options={"margin" : "1.5cm"})
 
-                in_var = lin_prog.get_incoming_variable()
+    doc.append(NoEscape(lin_prog_latex(lin_prog, template=template)))
 
-        doc.append(NoEscape(template["end"]))
     if generate_pdf:
         doc.generate_pdf('simplex_example', clean_tex=False)
     else:
         return doc
+
+def write_document(pl_list, f, doc=None, template=None, cache=None, progress=None):
+    """
+    écrit dans le fichier f le document latex complet des corrections de pl_list, chaque fragment
+    dès qu'il est calculé : la mémoire utilisée ne dépend pas du nombre d'itérations
+    doc : document pylatex dont le préambule et le contenu précèdent les corrections
+    progress(idx, lin_prog) est appelée après chaque fragment du problème pl_list[idx]
+    """
+    from pylatex import Document
+    from pylatex.utils import NoEscape
+
+    template = template or default_template()
+    if doc is None:
+        doc = Document(geometry_options={"margin" : "1.5cm"})
+
+    # début et fin du document, autour des sections
+    marker = "%%SIMPLEX-SECTIONS%%"
+    doc.append(NoEscape(marker))
+    head, tail = doc.dumps().split(marker)
+    doc.data.pop()
+
+    f.write(head)
+    for idx, lin_prog in enumerate(pl_list):
+        if idx:
+            f.write("%\n")
+
+        key = fragment_key(lin_prog, template) if cache is not None else None
+        section = cache.get(key) if key is not None else None
+        if section is not None:
+            f.write(section)
+            continue
+
+        with (cache.writer(key) if key is not None else nullcontext()) as cache_file:
+            for fragment in lin_prog_fragments(lin_prog, template):
+                f.write(fragment)
+                if cache_file is not None:
+                    cache_file.write(fragment)
+                f.flush()
+                if progress is not None:
+                    progress(idx, lin_prog)
+    f.write(tail)
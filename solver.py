@@ -0,0 +1,206 @@
+"""
+résolution sans rendu : enchaîne les étapes du simplexe sans construire de document latex
+utilisé pour la correction en masse, où seule la solution optimale est utile
+"""
+
+import json
+from math import isinf
+
+from linear_form import to_number
+from pricing import PRICINGS
+
+
+def json_value(value):
+    """
+    convertit une valeur numérique en valeur json : entier, flottant ou fraction exacte "p/q"
+    """
+    value = to_number(value)
+    if isinstance(value, float):
+        return value
+    if value.denominator == 1:
+        return value.numerator
+    return str(value)
+
+
+def bound_value(value):
+    """
+    borne d'un intervalle en valeur json, None si elle est infinie
+    """
+    return None if isinf(value) else json_value(value)
+
+
+def sensitivity_summary(lin_prog):
+    """
+    analyse de sensibilité (LinProg.sensitivity) au format json, sur les contraintes et les
+    variables d'origine après une pré-résolution
+    """
+    report = lin_prog.sensitivity()
+    if lin_prog.presolve is not None:
+        report = lin_prog.presolve.postsolve_sensitivity(report, lin_prog.tolerance)
+    return {
+        "constraints" : [{
+            "index" : row["index"],
+            "slack" : json_value(row["slack"]),
+            "shadow_price" : json_value(row["shadow_price"]),
+            "rhs" : json_value(row["rhs"]),
+            "rhs_range" : [bound_value(value) for value in row["rhs_range"]],
+            } for row in report["constraints"]],
+        "variables" : [{
+            "name" : str(row["name"]),
+            "value" : json_value(row["value"]),
+            "reduced_cost" : json_value(row["reduced_cost"]),
+            "cost" : json_value(row["cost"]),
+            "cost_range" : [bound_value(value) for value in row["cost_range"]],
+            } for row in report["variables"]],
+        }
+
+
+def solution_summary(lin_prog, nb_iter, status="optimal", sensitivity=False):
+    """
+    résumé de l'état final d'un programme linéaire
+    avec sensitivity, le résumé d'une solution optimale contient son analyse de sensibilité, ou
+    l'erreur qui l'a empêchée
+    après une pré-résolution, la solution est donnée sur les variables d'origine
+    """
+    summary = {
+        "title" : lin_prog.title,
+        "status" : status,
+        "iterations" : nb_iter,
+        "pricing" : lin_prog.pricing.stats(),
+        }
+    if lin_prog.presolve is not None:
+        summary["presolve"] = lin_prog.presolve.stats()
+    if status == "optimal":
+        summary["objective"] = json_value(lin_prog.get_objective_value())
+        solution = {var : lin_prog.current_solution[var] for var in lin_prog.decision_variables}
+        if lin_prog.presolve is not None:
+            solution = lin_prog.presolve.postsolve(solution)
+        summary["solution"] = {str(var) : json_value(value) for var, value in solution.items()}
+        summary["basis"] = [str(var) for var in lin_prog.base]
+        if sensitivity:
+            try:
+                summary["sensitivity"] = sensitivity_summary(lin_prog)
+            except NotImplementedError as error:
+                # la solution optimale est gardée, sans son analyse de sensibilité
+                summary["sensitivity"] = {"error" : str(error)}
+    return summary
+
+
+def iterate(lin_prog):
+    """
+    itérations du simplexe jusqu'à l'optimum de la fonction utilité courante
+    renvoie le nombre de pivots et False si le problème n'est pas borné
+    """
+    nb_iter = 0
+    in_var = lin_prog.get_incoming_variable()
+    while in_var is not None:
+        _, _, pivot_idx = lin_prog.get_pivot_line(in_var)
+        nb_iter += 1
+        if pivot_idx is None:
+            # la variable entrante atteint sa borne supérieure avant toute variable de base
+            lin_prog.complement(in_var)
+            in_var = lin_prog.get_incoming_variable()
+            continue
+        if pivot_idx < 0:
+            return nb_iter - 1, False
+        lin_prog.set_in_base(in_var, pivot_idx)
+        lin_prog.apply_subs()
+        in_var = lin_prog.get_incoming_variable()
+    return nb_iter, True
+
+
+def prepare(lin_prog):
+    """
+    forme canonique, forme standard (avec variables artificielles si besoin) et solution de base
+    une base initiale dual réalisable mais pas réalisable est gardée pour le simplexe dual
+    """
+    lin_prog.canonical_form()
+    lin_prog.pre_standard_form()
+    if lin_prog.needs_dual_simplex():
+        lin_prog.start_dual_simplex()
+    elif lin_prog.needs_artificials():
+        lin_prog.add_artificials()
+    lin_prog.standard_form()
+    lin_prog.set_base()
+
+
+def solve(lin_prog, sensitivity=False, relaxation=False):
+    """
+    résout le programme linéaire sans rendu et renvoie le résumé de la solution
+    les problèmes sans solution de base évidente passent par la phase 1 (problème auxiliaire), ou
+    par le simplexe dual si la base initiale est dual réalisable
+    un problème à variables entières est résolu par séparation et évaluation, sauf avec
+    relaxation (relaxation continue seulement)
+    """
+    if lin_prog.presolve is not None and lin_prog.presolve.status == "infeasible":
+        return solution_summary(lin_prog, 0, status="infeasible")
+
+    if lin_prog.integer and not relaxation:
+        from branch_and_bound import BranchAndBound
+
+        return BranchAndBound(lin_prog, **lin_prog.branching).run().summary()
+
+    prepare(lin_prog)
+
+    nb_iter = 0
+    if lin_prog.dual_simplex:
+        nb_iter, feasible = lin_prog.dual_iterations()
+        if not feasible:
+            return solution_summary(lin_prog, nb_iter, status="infeasible")
+    elif lin_prog.artificials:
+        lin_prog.start_phase_one()
+        nb_iter, _ = iterate(lin_prog)
+        if not lin_prog.end_phase_one():
+            return solution_summary(lin_prog, nb_iter, status="infeasible")
+
+    phase_two_iter, bounded = iterate(lin_prog)
+    nb_iter += phase_two_iter
+    return solution_summary(lin_prog, nb_iter, status="optimal" if bounded else "unbounded", sensitivity=sensitivity)
+
+
+def solve_all(pl_list, sensitivity=False):
+    """
+    résout une liste de programmes, une erreur sur un problème n'interrompt pas les suivants
+    """
+    results = []
+    for pl in pl_list:
+        try:
+            results.append(solve(pl, sensitivity=sensitivity))
+        except NotImplementedError as error:
+            results.append({"title" : pl.title, "status" : "error", "error" : str(error)})
+    return results
+
+
+def compare_pricing(load, rules=tuple(PRICINGS)):
+    """
+    résout chaque problème avec chaque règle de pricing et compare les nombres de pivots
+    load(rule) renvoie une nouvelle liste de programmes utilisant la règle rule
+    """
+    reports = []
+    for rule in rules:
+        for idx, result in enumerate(solve_all(load(rule))):
+            if idx == len(reports):
+                reports.append({"title" : result["title"], "pricing" : {}})
+            stats = result.get("pricing", {})
+            reports[idx]["pricing"][rule] = {
+                "status" : result["status"],
+                "pivots" : stats.get("pivots"),
+                "degenerate_pivots" : stats.get("degenerate_pivots"),
+                "bland_pivots" : stats.get("bland_pivots"),
+                }
+    for report in reports:
+        solved = {rule: stats["pivots"] for rule, stats in report["pricing"].items() if stats["status"] == "optimal"}
+        report["fastest"] = min(solved, key=solved.get) if solved else None
+    return reports
+
+
+def dump_results(results, filename=None):
+    """
+    écrit les résultats au format json, sur la sortie standard si filename est None
+    """
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if filename is None:
+        print(text)
+    else:
+        with open(filename, 'w') as f:
+            f.write(text + "\n")
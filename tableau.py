@@ -0,0 +1,417 @@
+"""
+moteur numérique du simplexe
+
+le programme linéaire est stocké sous forme de tableau : une matrice A, un second membre b
+et les coefficients c de la fonction utilité. Les pivots sont des opérations vectorisées sur
+les lignes du tableau. Les expressions sympy ne sont construites que lors du rendu latex.
+"""
+
+from fractions import Fraction
+
+import numpy
+
+from constraint import Constraint
+from linear_form import LinearForm, to_number
+from linear_program import LinProg, split_bounds
+
+
+class RenderedConstraint:
+    """
+    contrainte dont l'expression sympy n'est construite qu'au moment du rendu
+    """
+
+    def __init__(self, build):
+        self._build = build
+
+    def latex(self):
+        return self._build().latex()
+
+
+class TableauLinProg(LinProg):
+    """
+    programme linéaire résolu par pivots sur un tableau numérique
+    les lignes sont de la forme A[i].x = b[i] et la fonction utilité z = z0 + c.x
+    arithmetic vaut "fraction" (calcul exact) ou "float" (float64)
+    """
+
+    ARITHMETICS = ("fraction", "float")
+
+    A = None
+    b = None
+    c = None
+    z0 = 0
+    comps = []
+    row_base = []
+    deviation = []
+    pending = None
+    source = None
+
+    def __init__(self, arithmetic="fraction", pricing="dantzig"):
+        super().__init__(pricing=pricing)
+        if arithmetic not in self.ARITHMETICS:
+            raise ValueError(f"unknown arithmetic {arithmetic}, expected one of {self.ARITHMETICS}")
+        self.arithmetic = arithmetic
+        # tolérance sur les comparaisons à 0 en calcul flottant
+        self.tolerance = 0 if arithmetic == "fraction" else 1e-9
+
+    def _array(self, values):
+        if self.arithmetic == "fraction":
+            return numpy.vectorize(Fraction, otypes=[object])(numpy.array(values, dtype=object))
+        return numpy.array(values, dtype=numpy.float64)
+
+    def _zeros(self, shape):
+        return self._array(numpy.zeros(shape, dtype=int))
+
+    def _scalar(self, value):
+        return float(value) if self.arithmetic == "float" else Fraction(value)
+
+    def _row_unit(self, idx):
+        """
+        coefficient 1 dans la ligne idx (variable d'écart ou artificielle)
+        """
+        return self._scalar(1)
+
+    def from_dict(self, dictionnary):
+        self.problem = dictionnary
+        self.title = dictionnary.get("title", "")
+        self.description = dictionnary.get("description", "")
+        self.variables = [str(var) for var in dictionnary["variables"]]
+        self.decision_variables = list(self.variables)
+        self.optimizer = dictionnary["optimizer"]
+        self.initial_optimizer = self.optimizer
+
+        c, z0 = self._coefficients(LinearForm.convert(dictionnary["utility"]))
+        constraints, self.upper = split_bounds(dictionnary)
+        self.complemented = {}
+        self.integer = [str(var) for var in dictionnary.get("integer", [])]
+        rows, rhs = [], []
+        for l_part, comp, r_part in constraints:
+            coefficients, scalar = self._coefficients(LinearForm.convert(l_part) - LinearForm.convert(r_part))
+            rows.append(coefficients)
+            rhs.append(-scalar)
+
+        self.A = self._array(rows) if rows else self._zeros((0, len(self.variables)))
+        self.b = self._array(rhs)
+        self.c = self._array(c)
+        self.z0 = self._scalar(z0)
+        self.comps = [constraint[1] for constraint in constraints]
+        self.source = constraints
+        self.row_base = [None] * len(rows)
+        self.deviation = [None] * len(rows)
+        self.pending = None
+        self.base = None
+        self.out = None
+        self.artificials = []
+        self.objective_name = "z"
+        self.current_solution = {}
+        self.comments = "Forme initiale du problème."
+        self.standard = False
+
+    # rendu : construction à la demande des contraintes attendues par LinProg.to_latex
+
+    def _coefficients(self, form):
+        unknown = [var for var in form.terms if var not in self.variables]
+        if unknown:
+            raise SyntaxError(f"undeclared variable {unknown[0]}")
+        return [form.coeff(var) for var in self.variables], form.constant
+
+    def _form(self, coefficients, scalar=0, skip=None):
+        return LinearForm(to_number(scalar), {
+            var : to_number(coeff) for j, (coeff, var) in enumerate(zip(coefficients, self.variables)) if coeff != 0 and j != skip
+            })
+
+    def _tableau_row(self, idx):
+        """
+        coefficients et second membre de la ligne idx du tableau courant
+        """
+        return self.A[idx], self.b[idx]
+
+    def _objective_row(self):
+        """
+        coefficients et constante de la fonction utilité courante
+        """
+        return self.c, self.z0
+
+    def _row_constraint(self, idx):
+        if self.source is not None:
+            constraint = Constraint(*self.source[idx])
+        elif self.row_base[idx] is None:
+            coefficients, rhs = self._tableau_row(idx)
+            constraint = Constraint(self._form(coefficients), self.comps[idx], to_number(rhs))
+        else:
+            base_idx = self.row_base[idx]
+            coefficients, rhs = self._tableau_row(idx)
+            constraint = Constraint(LinearForm.variable(self.variables[base_idx]), "EQ", self._form([-coeff for coeff in coefficients], rhs, skip=base_idx))
+            if self.pending is not None and self.pending[1] != idx:
+                constraint.subs(self.variables[self.pending[0]], self._row_constraint(self.pending[1]).r_form)
+        constraint.set_variables(self.variables)
+        return constraint
+
+    @property
+    def constraints(self):
+        return [self._row_constraint(idx) for idx in range(len(self.comps))]
+
+    @property
+    def utility(self):
+        return self._form(*self._objective_row())
+
+    @property
+    def utility_constraint(self):
+        constraint = Constraint(LinearForm.variable("z"), "EQ", self.utility)
+        constraint.set_variables(self.variables)
+        if self.pending is not None:
+            constraint.subs(self.variables[self.pending[0]], self._row_constraint(self.pending[1]).r_form)
+        return constraint
+
+    # étapes de l'algorithme
+
+    def canonical_form(self,
+                       to_max="Minimiser une fonction, c'est maximiser son inverse : on multiplie $z$ par -1.\n",
+                       comment="On transforme les $\\geq$ en $\\leq$ en multipliant chaque membre par -1.\n"
+                       ):
+        """
+        transform into canonical form
+        """
+        if self.optimizer == "min":
+            self.c = -self.c
+            self.z0 = -self.z0
+            self.optimizer = "max"
+            self.comments = to_max
+        else:
+            self.comments = ""
+
+        geq = numpy.array([comp == "GEQ" for comp in self.comps], dtype=bool)
+        self.A[geq] = -self.A[geq]
+        self.b[geq] = -self.b[geq]
+        self.comps = ["LEQ" if comp == "GEQ" else comp for comp in self.comps]
+        self.source = None
+
+        self.comments += comment
+
+    def pre_standard_form(self, comment="On introduit les variables d'écart."):
+        leq = [idx for idx, comp in enumerate(self.comps) if comp == "LEQ"]
+        deviation = self._zeros((len(self.b), len(leq)))
+        for column, idx in enumerate(leq):
+            new_var = self.get_new_var()
+            self.variables.append(new_var)
+            deviation[idx, column] = self._row_unit(idx)
+            self.deviation[idx] = len(self.variables) - 1
+            self.comps[idx] = "EQ"
+
+        self.A = numpy.hstack([self.A, deviation])
+        self.c = numpy.concatenate([self.c, self._zeros(len(leq))])
+        self.comments = comment
+
+    def _artificial_rows(self):
+        return [idx for idx, deviation in enumerate(self.deviation) if deviation is None or self.b[idx] < -self.tolerance]
+
+    def _equality_rows(self):
+        return [idx for idx, deviation in enumerate(self.deviation) if deviation is None]
+
+    def add_artificials(self, comment="On multiplie par -1 les contraintes dont le second membre est négatif, et on introduit une variable artificielle dans chaque contrainte sans variable de base."):
+        rows = self._artificial_rows()
+        negative = [idx for idx in rows if self.b[idx] < -self.tolerance]
+        self.A[negative] = -self.A[negative]
+        self.b[negative] = -self.b[negative]
+
+        artificial = self._zeros((len(self.b), len(rows)))
+        for column, idx in enumerate(rows):
+            new_var = self.get_new_var("a")
+            self.variables.append(new_var)
+            self.artificials.append(new_var)
+            artificial[idx, column] = self._row_unit(idx)
+            self.deviation[idx] = len(self.variables) - 1
+
+        self.A = numpy.hstack([self.A, artificial])
+        self.c = numpy.concatenate([self.c, self._zeros(len(rows))])
+        self.comments = comment
+
+    def standard_form(self, comment="On passe les variables d'écart sur la partie gauche : ce sont les variables de base.\nLes autres membres sont sur la partie droite : ce sont les scalaires et les variables hors base."):
+        if any(deviation is None for deviation in self.deviation):
+            raise NotImplementedError("can't put in base a constraint without deviation variable")
+        self.row_base = list(self.deviation)
+        self.standard = True
+        self.comments = comment
+
+    def set_base(self, comment="On initialise la solution de base."):
+        if (self.b < -self.tolerance).any() and not self.dual_simplex:
+            raise NotImplementedError("can't solve problems not satisfying 0 sol")
+
+        self.base = [self.variables[idx] for idx in self.row_base]
+        self.out = [var for var in self.variables if var not in self.base]
+        self.update_solution()
+        self.comments = comment
+
+    def update_solution(self):
+        self.current_solution = dict.fromkeys(self.out, self._scalar(0))
+        # tolist : scalaires python, sans conversion élément par élément des scalaires numpy
+        for base_idx, value in zip(self.row_base, self.b.tolist()):
+            self.current_solution[self.variables[base_idx]] = to_number(value)
+        self._complemented_values()
+
+    def _utility_value(self):
+        return to_number(self.z0)
+
+    # méthode des deux phases
+
+    def _reduce(self, cost, z0):
+        """
+        exprime la fonction utilité z0 + cost.x en fonction des variables hors base
+        """
+        factors = cost[self.row_base]
+        return cost - factors.dot(self.A), z0 + factors.dot(self.b)
+
+    def start_phase_one(self, comment="On maximise $w$, l'opposé de la somme des variables artificielles."):
+        self.phase_two_utility = (self.c, self.z0)
+        cost = self._zeros(len(self.variables))
+        cost[[self.variables.index(var) for var in self.artificials]] = self._scalar(-1)
+        self.c, self.z0 = self._reduce(cost, self._scalar(0))
+        self.objective_name = "w"
+        self.comments = comment
+
+    def _set_utility(self, utility):
+        self.c, self.z0 = self._reduce(*utility)
+
+    def _utility_data(self, utility):
+        c, z0 = self._coefficients(utility)
+        return self._array(c), self._scalar(z0)
+
+    def _shift_rhs(self, shift, utility_shift):
+        self.b = self.b + self._array(shift)
+        self.z0 = self.z0 + self._scalar(utility_shift)
+
+    def _drop_row(self, idx):
+        self.base.remove(self.variables[self.row_base[idx]])
+        self.A = numpy.delete(self.A, idx, axis=0)
+        self.b = numpy.delete(self.b, idx)
+        del self.comps[idx], self.row_base[idx], self.deviation[idx]
+
+    def _drop_artificials(self):
+        # les variables artificielles sont les dernières colonnes : les indices des autres sont inchangés
+        keep = [j for j, var in enumerate(self.variables) if var not in self.artificials]
+        self.A = self.A[:, keep]
+        self.c = self.c[keep]
+        self.phase_two_utility = (self.phase_two_utility[0][keep],) + tuple(self.phase_two_utility[1:])
+        self.deviation = [deviation if deviation in keep else None for deviation in self.deviation]
+        for var in self.artificials:
+            self.variables.remove(var)
+            if var in self.out:
+                self.out.remove(var)
+
+    def _reduced_costs(self, variables):
+        index = {var: j for j, var in enumerate(self.variables)}
+        return self.c[[index[var] for var in variables]]
+
+    def _base_variable(self, idx):
+        return self.variables[self.row_base[idx]]
+
+    def _tableau_column(self, variable):
+        return self.A[:, self.variables.index(variable)]
+
+    def _tableau_row_combination(self, vector):
+        return numpy.dot(vector, self.A)
+
+    def _rhs(self):
+        """
+        seconds membres du tableau courant
+        """
+        return self.b
+
+    def get_pivot_line(self, variable):
+        column = self._tableau_column(variable)
+        rhs = self._rhs()
+        positive = column > self.tolerance
+        ratios = numpy.full(len(rhs), numpy.inf, dtype=rhs.dtype)
+        ratios[positive] = rhs[positive] / column[positive]
+        best_index = int(numpy.argmin(ratios)) if positive.any() else -1
+
+        var_constraints, std_var_constraints = [], []
+        for idx in range(len(rhs)):
+            coeff, scalar = column[idx], rhs[idx]
+            var_constraints.append(RenderedConstraint(lambda coeff=coeff, scalar=scalar: Constraint(LinearForm(to_number(scalar), {variable: -to_number(coeff)}), "GEQ", 0)))
+            if positive[idx]:
+                std_var_constraints.append(RenderedConstraint(lambda ratio=ratios[idx]: Constraint(LinearForm.variable(variable), "LEQ", to_number(ratio))))
+            else:
+                std_var_constraints.append(RenderedConstraint(lambda: Constraint(LinearForm.variable(variable), "GEQ", 0)))
+
+        return var_constraints, std_var_constraints, self._bounded_row(variable, column, rhs, ratios, best_index, var_constraints, std_var_constraints)
+
+    def _complement(self, variable, new_name, bound):
+        """
+        colonne j de variable = bound - new_name : b -= bound A[:, j], puis la colonne change de signe
+        """
+        j = self.variables.index(variable)
+        bound = self._scalar(bound)
+        self.b = self.b - self.A[:, j] * bound
+        self.A[:, j] = -self.A[:, j]
+        self.z0 = self.z0 + self.c[j] * bound
+        self.c = self.c.copy()
+        self.c[j] = -self.c[j]
+        if j in self.row_base:
+            # la variable de base garde un coefficient 1 dans sa ligne
+            idx = self.row_base.index(j)
+            self.A[idx] = -self.A[idx]
+            self.b[idx] = -self.b[idx]
+        if self.phase_two_utility is not None:
+            c, z0 = self.phase_two_utility[:2]
+            c = c.copy()
+            z0 = z0 + c[j] * bound
+            c[j] = -c[j]
+            self.phase_two_utility = (c, z0) + tuple(self.phase_two_utility[2:])
+
+    def _append_row(self, coefficients, value, slack):
+        coefficients, value = self._reduced_row(coefficients, value)
+        column = len(self.variables)
+        self.A = numpy.vstack([numpy.hstack([self.A, self._zeros((len(self.b), 1))]), self._array([coefficients + [1]])])
+        self.b = numpy.append(self.b, self._scalar(value))
+        self.c = numpy.append(self.c, self._scalar(0))
+        self.row_base.append(column)
+        self.deviation.append(column)
+        self.comps.append("EQ")
+
+    def set_in_base(self, variable, idx, comment="\nOn fait entrer la variable ${variable}$ dans la base."):
+        if self.leaving_bound:
+            self.leaving_bound = False
+            self.complement(self._base_variable(idx))
+        self.pricing.update(self, variable, idx)
+        column = self.variables.index(variable)
+        out_var = self.variables[self.row_base[idx]]
+
+        self._scale_row(idx, column)
+        self.row_base[idx] = column
+        self.pending = (column, idx)
+
+        self.comments = comment.format(variable=variable, idx=idx)
+        self.out.remove(variable)
+        self.out.append(out_var)
+        self.base.append(variable)
+        self.base.remove(out_var)
+        self.update_solution()
+
+    def _scale_row(self, idx, column):
+        """
+        divise la ligne idx par son coefficient dans la colonne du pivot
+        """
+        pivot = self.A[idx, column]
+        self.A[idx] = self.A[idx] / pivot
+        self.b[idx] = self.b[idx] / pivot
+
+    def _eliminate(self, column, idx):
+        """
+        élimine la colonne du pivot des autres lignes et de la fonction utilité
+        """
+        factors = self.A[:, column].copy()
+        factors[idx] = 0
+        self.A -= numpy.outer(factors, self.A[idx])
+        self.b -= factors * self.b[idx]
+        factor = self.c[column]
+        self.z0 += factor * self.b[idx]
+        self.c = self.c - factor * self.A[idx]
+
+    def apply_subs(self, comment="\nOn développe et on réduit."):
+        if self.pending is not None:
+            self._eliminate(*self.pending)
+            self.pending = None
+
+        self.update_solution()
+        self.comments = comment
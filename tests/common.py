@@ -0,0 +1,50 @@
+"""
+outils communs aux tests : chaque moteur est comparé au moteur symbolique (sympy) sur des
+problèmes json (schéma de load_from_json) dont la solution optimale est unique
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from loader import ENGINES, get_engine, lin_prog_from_json
+import solver
+
+# moteurs comparés au moteur de référence
+OTHER_ENGINES = [engine for engine in ENGINES if engine != "sympy"]
+
+
+def load(problem, engine="sympy", **options):
+    return lin_prog_from_json(problem, engine=get_engine(engine, **options))
+
+
+def solve(problem, engine="sympy", **options):
+    return solver.solve(load(problem, engine, **options))
+
+
+def _number(value):
+    return float(Fraction(value)) if isinstance(value, str) else float(value)
+
+
+def assert_same_result(result, reference):
+    """
+    même statut, et pour une solution optimale même objectif et même solution (aux erreurs
+    d'arrondi près pour les moteurs flottants)
+    """
+    assert result["status"] == reference["status"]
+    if reference["status"] != "optimal":
+        return
+    assert _number(result["objective"]) == pytest.approx(_number(reference["objective"]), abs=1e-7)
+    assert result["solution"].keys() == reference["solution"].keys()
+    for var, value in reference["solution"].items():
+        assert _number(result["solution"][var]) == pytest.approx(_number(value), abs=1e-7), var
+
+
+def assert_same_values(values, reference):
+    """
+    mêmes valeurs (None pour une borne infinie), aux erreurs d'arrondi près
+    """
+    assert [value is None for value in values] == [value is None for value in reference]
+    for value, expected in zip(values, reference):
+        if expected is not None:
+            assert _number(value) == pytest.approx(_number(expected), abs=1e-7)
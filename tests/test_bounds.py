@@ -0,0 +1,91 @@
+"""
+simplexe à variables bornées : même résultat que le problème dont les bornes sont des
+contraintes, et analyse de sensibilité d'une solution dont des variables sont à leur borne
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, assert_same_values, load, solve
+from presolve import presolve
+import solver
+
+# x_1 et x_2 sont à leur borne supérieure, x_3 en base entre ses bornes
+BOUNDED = {
+    "title" : "bornes",
+    "optimizer" : "max",
+    "utility" : "3*x_1 + 2*x_2 + x_3",
+    "constraints" : ["x_1 + x_2 + x_3 <= 10", "x_1 + 2*x_3 <= 8"],
+    "variables" : ["x_1", "x_2", "x_3"],
+    "bounds" : {"x_1" : [0, 4], "x_2" : [0, 3], "x_3" : [1, 5]},
+    }
+
+# une variable de base atteint sa borne et sort de la base
+LEAVING = {
+    "title" : "sortie",
+    "optimizer" : "min",
+    "utility" : "-2*x_1 - 3*x_2",
+    "constraints" : ["x_1 + x_2 <= 6", "x_2 - x_1 <= 2"],
+    "variables" : ["x_1", "x_2"],
+    "bounds" : {"x_1" : [0, 5], "x_2" : [0, 3]},
+    }
+
+
+def as_rows(problem):
+    """
+    même problème, bornes écrites comme des contraintes
+    """
+    rows = [f"{var} <= {upper}" for var, (_, upper) in problem["bounds"].items()]
+    rows += [f"{var} >= {lower}" for var, (lower, _) in problem["bounds"].items() if lower]
+    return {key : value for key, value in dict(problem, constraints=problem["constraints"] + rows).items() if key != "bounds"}
+
+
+ROWS = as_rows(BOUNDED)
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("problem", [BOUNDED, LEAVING], ids=["bornes", "sortie"])
+def test_bounds_match_constraints(engine, problem):
+    result = solve(problem, engine)
+    assert_same_result(result, solve(as_rows(problem)))
+    assert_same_result(result, solve(problem))
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_sensitivity_with_bounds(engine):
+    report = solver.solve(load(BOUNDED, engine), sensitivity=True)["sensitivity"]
+    rows = solver.solve(load(ROWS), sensitivity=True)["sensitivity"]
+
+    # prix fictifs des contraintes du problème, coûts réduits des variables à leur borne
+    # supérieure : ceux des contraintes de borne
+    for row, expected in zip(report["constraints"], rows["constraints"]):
+        assert_same_values([row["shadow_price"]], [expected["shadow_price"]])
+        assert_same_values(row["rhs_range"], expected["rhs_range"])
+    assert_same_values([row["reduced_cost"] for row in report["variables"]], [Fraction(5, 2), 2, 0])
+    assert_same_values([row["cost_range"][0] for row in report["variables"]], [Fraction(1, 2), 0, 0])
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_presolve_sensitivity_keeps_the_solution(engine):
+    # les contraintes à une variable deviennent des bornes
+    lin_prog = load(ROWS, engine)
+    presolve(lin_prog)
+    assert lin_prog.problem.get("bounds")
+
+    result = solver.solve(lin_prog, sensitivity=True)
+    assert_same_result(result, solve(ROWS))
+    reference = solver.solve(load(ROWS), sensitivity=True)["sensitivity"]
+    assert_same_values([row["shadow_price"] for row in result["sensitivity"]["constraints"]], [row["shadow_price"] for row in reference["constraints"]])
+
+
+def test_sensitivity_error_keeps_the_solution(monkeypatch):
+    lin_prog = load(BOUNDED)
+
+    def sensitivity():
+        raise NotImplementedError("not supported")
+
+    monkeypatch.setattr(lin_prog, "sensitivity", sensitivity)
+    result = solver.solve(lin_prog, sensitivity=True)
+    assert_same_result(result, solve(BOUNDED))
+    assert result["sensitivity"] == {"error" : "not supported"}
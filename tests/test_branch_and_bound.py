@@ -0,0 +1,95 @@
+"""
+séparation et évaluation : chaque moteur trouve la solution entière du moteur symbolique, quels
+que soient l'ordre d'exploration, les bornes et la pré-résolution
+"""
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, load, solve
+from presolve import presolve
+import solver
+
+# relaxation continue en (15/4, 9/4), optimum entier unique en (5, 0)
+KNAPSACK = {
+    "title" : "sac à dos",
+    "optimizer" : "max",
+    "utility" : "8*x_1 + 5*x_2",
+    "constraints" : ["x_1 + x_2 <= 6", "9*x_1 + 5*x_2 <= 45"],
+    "variables" : ["x_1", "x_2"],
+    "integer" : ["x_1", "x_2"],
+    }
+
+# optimum entier unique en (3, 1, 1)
+BOUNDED = {
+    "title" : "bornes entières",
+    "optimizer" : "max",
+    "utility" : "3*x_1 + 2*x_2 + 4*x_3",
+    "constraints" : ["2*x_1 + 2*x_2 + 3*x_3 <= 11", "x_1 + 3*x_3 <= 7"],
+    "variables" : ["x_1", "x_2", "x_3"],
+    "bounds" : {"x_1" : [0, 3], "x_2" : [0, 4], "x_3" : [0, 5]},
+    "integer" : ["x_1", "x_2", "x_3"],
+    }
+
+# mêmes bornes écrites comme des contraintes, dont une borne non entière : la pré-résolution
+# les ramène aux bornes entières
+ROWS = dict(BOUNDED, constraints=BOUNDED["constraints"] + ["x_1 <= 3", "x_2 <= 4", "2*x_3 <= 5"])
+del ROWS["bounds"]
+
+# relaxation réalisable, sans solution entière
+NO_INTEGER = {
+    "title" : "sans solution entière",
+    "optimizer" : "min",
+    "utility" : "x_1 + x_2",
+    "constraints" : ["2*x_1 + 2*x_2 = 3"],
+    "variables" : ["x_1", "x_2"],
+    "integer" : ["x_1", "x_2"],
+    }
+
+PROBLEMS = [KNAPSACK, BOUNDED, ROWS, NO_INTEGER]
+
+EXPECTED = {
+    "sac à dos" : {"x_1" : 5, "x_2" : 0},
+    "bornes entières" : {"x_1" : 3, "x_2" : 1, "x_3" : 1},
+    }
+
+
+def branch_and_bound(problem, engine="sympy", **branching):
+    lin_prog = load(problem, engine)
+    lin_prog.branching = branching
+    return lin_prog
+
+
+@pytest.mark.parametrize("problem", [KNAPSACK, BOUNDED], ids=["sac à dos", "bornes"])
+def test_reference_solution(problem):
+    result = solve(problem)
+    assert result["status"] == "optimal"
+    assert result["solution"] == EXPECTED[problem["title"]]
+    # la relaxation continue n'est pas entière : la séparation a lieu
+    assert result["branch_and_bound"]["nodes"] > 1
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("selection", ["best", "depth"])
+@pytest.mark.parametrize("problem", PROBLEMS, ids=[problem["title"] for problem in PROBLEMS])
+def test_branch_and_bound_matches_sympy(engine, selection, problem):
+    result = solver.solve(branch_and_bound(problem, engine, selection=selection))
+    assert_same_result(result, solve(problem))
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_branch_and_bound_after_presolve(engine):
+    lin_prog = branch_and_bound(ROWS, engine)
+    presolve(lin_prog)
+    assert_same_result(solver.solve(lin_prog), solve(ROWS))
+
+
+def test_parallel_evaluation_matches_serial():
+    result = solver.solve(branch_and_bound(KNAPSACK, workers=2))
+    assert_same_result(result, solve(KNAPSACK))
+
+
+def test_node_limit_keeps_the_relaxation_bound():
+    result = solver.solve(branch_and_bound(KNAPSACK, max_nodes=1))
+    assert result["status"] == "node_limit"
+    assert result["branch_and_bound"]["nodes"] == 1
+    assert result["branch_and_bound"]["bound"] == "165/4"
@@ -0,0 +1,50 @@
+"""
+simplexe dual : une base initiale dual réalisable est résolue sans phase 1, avec le même
+résultat et la même analyse de sensibilité que par la phase 1
+"""
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, assert_same_values, load
+import solver
+
+COVER = {
+    "title" : "couverture",
+    "optimizer" : "min",
+    "utility" : "3*x_1 + 2*x_2",
+    "constraints" : ["x_1 + x_2 >= 4", "x_1 + 3*x_2 >= 6", "x_1 >= 1"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+INFEASIBLE = {
+    "title" : "irréalisable",
+    "optimizer" : "min",
+    "utility" : "x_1 + x_2",
+    "constraints" : ["x_1 + x_2 >= 5", "x_1 + x_2 <= 3"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+
+def solved(problem, engine="sympy", dual_simplex=True, sensitivity=False):
+    lin_prog = load(problem, engine)
+    lin_prog.allow_dual_simplex = dual_simplex
+    result = solver.solve(lin_prog, sensitivity=sensitivity)
+    assert lin_prog.dual_simplex == dual_simplex
+    assert not lin_prog.artificials or not dual_simplex
+    return result
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("problem", [COVER, INFEASIBLE], ids=["couverture", "irréalisable"])
+def test_dual_simplex_matches_phase_one(engine, problem):
+    assert_same_result(solved(problem, engine), solved(problem, dual_simplex=False))
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_sensitivity_after_dual_simplex(engine):
+    report = solved(COVER, engine, sensitivity=True)["sensitivity"]
+    reference = solved(COVER, dual_simplex=False, sensitivity=True)["sensitivity"]
+    for row, expected in zip(report["constraints"], reference["constraints"]):
+        assert_same_values([row["shadow_price"], *row["rhs_range"]], [expected["shadow_price"], *expected["rhs_range"]])
+    for row, expected in zip(report["variables"], reference["variables"]):
+        assert_same_values([row["reduced_cost"], *row["cost_range"]], [expected["reduced_cost"], *expected["cost_range"]])
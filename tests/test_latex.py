@@ -0,0 +1,82 @@
+"""
+rendu latex des tableaux : une ligne n'est recalculée que si son code latex change
+"""
+
+import pytest
+
+from common import OTHER_ENGINES, load
+from constraint import Constraint
+import solver
+
+# x_3 entre en base à la place de la variable d'écart de la première contrainte, qui la suit
+# dans l'ordre des variables : les deux autres lignes ne changent pas
+PROBLEM = {
+    "title" : "rendu",
+    "optimizer" : "max",
+    "utility" : "x_1 + x_2 + 3*x_3",
+    "constraints" : ["x_1 + x_3 <= 2", "x_1 + x_2 <= 5", "x_2 <= 4"],
+    "variables" : ["x_1", "x_2", "x_3"],
+    }
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """
+    lignes de la forme standard effectivement calculées (std_latex_array)
+    """
+    rows = []
+    std_latex_array = Constraint.std_latex_array
+
+    def recorded(constraint, out_var=None):
+        rows.append(str(constraint.l_form))
+        return std_latex_array(constraint, out_var)
+
+    monkeypatch.setattr(Constraint, "std_latex_array", recorded)
+    return rows
+
+
+def pivots(lin_prog):
+    """
+    rendus successifs du tableau : avant chaque pivot, avec les substitutions en attente, puis après
+    """
+    yield lin_prog.to_latex()
+    in_var = lin_prog.get_incoming_variable()
+    while in_var is not None:
+        _, _, idx = lin_prog.get_pivot_line(in_var)
+        lin_prog.set_in_base(in_var, idx)
+        yield lin_prog.to_latex()
+        lin_prog.apply_subs()
+        yield lin_prog.to_latex()
+        in_var = lin_prog.get_incoming_variable()
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_rows_untouched_by_a_pivot_are_cached(engine, rendered):
+    lin_prog = load(PROBLEM, engine)
+    solver.prepare(lin_prog)
+    lin_prog.to_latex()
+    del rendered[:]
+
+    assert lin_prog.get_incoming_variable() == "x_3"
+    _, _, idx = lin_prog.get_pivot_line("x_3")
+    lin_prog.set_in_base("x_3", idx)
+    lin_prog.apply_subs()
+    lin_prog.to_latex()
+    assert rendered == ["x_3"]
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_cached_rendering_matches_a_fresh_one(engine, rendered):
+    lin_prog = load(PROBLEM, engine)
+    solver.prepare(lin_prog)
+    previous = None
+    for latex in pivots(lin_prog):
+        rows = [line for line in latex.split("\n") if line.endswith(r"\\")]
+        if previous is not None:
+            # seules les lignes dont le code change sont recalculées
+            assert len(rendered) == sum(row != old for row, old in zip(rows, previous))
+        del rendered[:]
+        lin_prog._latex_lines = None
+        assert lin_prog.to_latex() == latex
+        del rendered[:]
+        previous = rows
@@ -0,0 +1,85 @@
+"""
+formats MPS et LP : les mots-clés de section ne sont reconnus que comme mots entiers, et un
+programme écrit puis relu est le même
+"""
+
+from fractions import Fraction
+import io
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, load, solve
+from linear_form import LinearForm
+from loader import get_engine
+from lp_formats import read_lp, read_mps, write_lp, write_mps
+import solver
+
+# noms de variables qui commencent par un mot-clé de section (st, gen, bin)
+KEYWORD_NAMES = """\\ mots-clés
+Maximize
+ obj: 2 steel + 3 gen1 + 2 bin_x
+Subject To
+ c1: steel + 3 gen1 <= 6
+ c2: gen1 + bin_x <= 5
+Bounds
+ steel <= 3
+General
+ gen1
+Binary
+ bin_x
+End
+"""
+
+
+def read(text, engine="sympy"):
+    return read_lp(io.StringIO(text), engine=get_engine(engine))
+
+
+def round_trip(lin_prog, write, read, engine="sympy"):
+    f = io.StringIO()
+    write(lin_prog, f)
+    f.seek(0)
+    return read(f, engine=get_engine(engine))
+
+
+def test_keywords_are_whole_words():
+    lin_prog = read(KEYWORD_NAMES)
+    assert lin_prog.problem["variables"] == ["steel", "gen1", "bin_x"]
+    assert len(lin_prog.problem["constraints"]) == 2
+    assert lin_prog.problem["bounds"] == {"steel" : (0, 3), "bin_x" : (0, 1)}
+    assert lin_prog.problem["integer"] == ["gen1", "bin_x"]
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_keyword_names_solve(engine):
+    result = solver.solve(read(KEYWORD_NAMES, engine))
+    assert_same_result(result, {"status" : "optimal", "objective" : 11, "solution" : {"steel" : 3, "gen1" : 1, "bin_x" : 1}})
+
+
+# 1/3 n'a pas d'écriture décimale finie, 1/8 si
+THIRDS = {
+    "title" : "tiers",
+    "optimizer" : "max",
+    "utility" : "x_1 + x_2/8",
+    "constraints" : ["x_1/3 + x_2 <= 5/3", "x_1 + x_2/8 <= 4"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+FORMATS = [(write_mps, read_mps), (write_lp, read_lp)]
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("write, read", FORMATS, ids=["mps", "lp"])
+def test_round_trip_is_exact(engine, write, read):
+    lin_prog = round_trip(load(THIRDS), write, read, engine)
+    # la première contrainte est multipliée par 3, la seconde est écrite en décimal
+    rows = [constraint.l_form - constraint.r_form for constraint in lin_prog.constraints]
+    assert rows[0] == LinearForm(-5, {"x_1" : 1, "x_2" : 3})
+    assert rows[1] == LinearForm(-4, {"x_1" : 1, "x_2" : Fraction(1, 8)})
+    assert_same_result(solver.solve(lin_prog), solve(THIRDS))
+
+
+@pytest.mark.parametrize("write, read", FORMATS, ids=["mps", "lp"])
+def test_inexact_objective_is_an_error(write, read):
+    with pytest.raises(ValueError):
+        round_trip(load(dict(THIRDS, utility="x_1 + x_2/3")), write, read)
@@ -0,0 +1,74 @@
+"""
+pré-résolution : la solution et l'analyse de sensibilité, ramenées au problème d'origine, sont
+celles du problème résolu sans pré-résolution
+"""
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, assert_same_values, load, solve
+from presolve import presolve
+import solver
+
+# la première contrainte est le double de la deuxième, plus faible : elle est supprimée
+DUPLICATE = {
+    "title" : "doublon",
+    "optimizer" : "max",
+    "utility" : "3*x_1 + 2*x_2",
+    "constraints" : ["2*x_1 + 2*x_2 <= 10", "x_1 + x_2 <= 4", "x_1 + 3*x_2 <= 6", "x_1 - x_2 >= -5"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+# x_1 >= 1 devient un changement de variable, liant à l'optimum
+SHIFT = {
+    "title" : "borne",
+    "optimizer" : "min",
+    "utility" : "2*x_1 + 3*x_2 + x_3",
+    "constraints" : ["x_1 + x_2 + x_3 >= 6", "x_1 >= 1", "x_2 + x_3 >= 2", "x_1 - x_3 <= 3"],
+    "variables" : ["x_1", "x_2", "x_3"],
+    }
+
+# x_3 n'apparaît que dans une contrainte à une variable, supprimée : elle est fixée à sa borne
+COLUMN = {
+    "title" : "colonne",
+    "optimizer" : "max",
+    "utility" : "2*x_1 + x_2 + x_3",
+    "constraints" : ["x_1 + 2*x_2 <= 8", "x_2 >= 1", "x_1 + x_2 <= 6", "x_3 <= 2"],
+    "variables" : ["x_1", "x_2", "x_3"],
+    }
+
+PROBLEMS = [DUPLICATE, SHIFT, COLUMN]
+
+
+def presolved(problem, engine):
+    lin_prog = load(problem, engine)
+    presolve(lin_prog)
+    return lin_prog
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("problem", PROBLEMS, ids=[problem["title"] for problem in PROBLEMS])
+def test_presolve_matches_plain_solve(engine, problem):
+    lin_prog = presolved(problem, engine)
+    assert len(lin_prog.problem["constraints"]) < len(problem["constraints"])
+    assert_same_result(solver.solve(lin_prog), solve(problem))
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("problem", PROBLEMS, ids=[problem["title"] for problem in PROBLEMS])
+def test_sensitivity_on_original_constraints(engine, problem):
+    report = solver.solve(presolved(problem, engine), sensitivity=True)["sensitivity"]
+    reference = solver.solve(load(problem), sensitivity=True)["sensitivity"]
+
+    assert [row["index"] for row in report["constraints"]] == list(range(len(problem["constraints"])))
+    assert_same_values([row["shadow_price"] for row in report["constraints"]], [row["shadow_price"] for row in reference["constraints"]])
+    assert_same_values([row["reduced_cost"] for row in report["variables"]], [row["reduced_cost"] for row in reference["variables"]])
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("problem", [DUPLICATE, SHIFT], ids=["doublon", "borne"])
+def test_rhs_ranges_on_original_constraints(engine, problem):
+    report = solver.solve(presolved(problem, engine), sensitivity=True)["sensitivity"]
+    reference = solver.solve(load(problem), sensitivity=True)["sensitivity"]
+
+    for row, expected in zip(report["constraints"], reference["constraints"]):
+        assert_same_values(row["rhs_range"], expected["rhs_range"])
@@ -0,0 +1,74 @@
+"""
+résolution à partir de la base optimale (LinProg.resolve) : même résultat qu'une résolution
+complète du problème modifié
+"""
+
+import pytest
+
+from common import OTHER_ENGINES, assert_same_result, load, solve
+import solver
+
+PROBLEM = {
+    "title" : "resolve",
+    "optimizer" : "max",
+    "utility" : "3*x_1 + 2*x_2",
+    "constraints" : ["x_1 + x_2 <= 4", "x_1 + 3*x_2 <= 6", "x_1 <= 3"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+# (arguments de resolve, problème modifié)
+CHANGES = [
+    ({"new_rhs" : [2]}, {"constraints" : ["x_1 + x_2 <= 2", "x_1 + 3*x_2 <= 6", "x_1 <= 3"]}),
+    ({"new_rhs" : {1 : 2}}, {"constraints" : ["x_1 + x_2 <= 4", "x_1 + 3*x_2 <= 2", "x_1 <= 3"]}),
+    ({"new_rhs" : [-1]}, {"constraints" : ["x_1 + x_2 <= -1", "x_1 + 3*x_2 <= 6", "x_1 <= 3"]}),
+    ({"new_utility" : "x_1 + 4*x_2"}, {"utility" : "x_1 + 4*x_2"}),
+    ({"new_rhs" : [None, 9], "new_utility" : "x_1 + 4*x_2"}, {"constraints" : ["x_1 + x_2 <= 4", "x_1 + 3*x_2 <= 9", "x_1 <= 3"], "utility" : "x_1 + 4*x_2"}),
+    ]
+
+# base des variables d'écart dual réalisable : résolu par le simplexe dual, ou par la phase 1
+DUAL = {
+    "title" : "resolve dual",
+    "optimizer" : "min",
+    "utility" : "4*x_1 + 4*x_2",
+    "constraints" : ["x_1 >= 14", "x_1 + 2*x_2 >= 6"],
+    "variables" : ["x_1", "x_2"],
+    }
+
+DUAL_CHANGES = [
+    ({"new_rhs" : [-5]}, {"constraints" : ["x_1 >= -5", "x_1 + 2*x_2 >= 6"]}),
+    ({"new_rhs" : {1 : 20}}, {"constraints" : ["x_1 >= 14", "x_1 + 2*x_2 >= 20"]}),
+    ({"new_rhs" : [None, -1]}, {"constraints" : ["x_1 >= 14", "x_1 + 2*x_2 >= -1"]}),
+    ({"new_rhs" : [2], "new_utility" : "x_1 + 3*x_2"}, {"constraints" : ["x_1 >= 2", "x_1 + 2*x_2 >= 6"], "utility" : "x_1 + 3*x_2"}),
+    ]
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("changes, modified", CHANGES)
+def test_resolve_matches_cold_solve(engine, changes, modified):
+    lin_prog = load(PROBLEM, engine)
+    assert solver.solve(lin_prog)["status"] == "optimal"
+
+    result = lin_prog.resolve(**changes)
+    assert_same_result(result, solve(dict(PROBLEM, **modified)))
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+def test_resolve_stats_describe_the_resolve_only(engine):
+    lin_prog = load(PROBLEM, engine)
+    solver.solve(lin_prog)
+    for changes, _ in CHANGES[:2]:
+        result = lin_prog.resolve(**changes)
+        assert result["pricing"]["pivots"] == result["iterations"]
+
+
+@pytest.mark.parametrize("engine", ["sympy"] + OTHER_ENGINES)
+@pytest.mark.parametrize("dual_simplex", [True, False], ids=["dual", "primal"])
+@pytest.mark.parametrize("changes, modified", DUAL_CHANGES)
+def test_resolve_after_a_dual_start(engine, dual_simplex, changes, modified):
+    lin_prog = load(DUAL, engine)
+    lin_prog.allow_dual_simplex = dual_simplex
+    assert solver.solve(lin_prog)["status"] == "optimal"
+    assert lin_prog.dual_simplex == dual_simplex
+
+    result = lin_prog.resolve(**changes)
+    assert_same_result(result, solve(dict(DUAL, **modified)))